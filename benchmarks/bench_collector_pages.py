@@ -0,0 +1,138 @@
+"""Micro-benchmark: collector page processing with page-level include indexes.
+
+Compares the previous per-tweet media index rebuild against the current
+`_index_page_includes` + shared filter context path on synthetic
+100-tweet / 400-media pages.
+
+    python benchmarks/bench_collector_pages.py
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from x_legal_stuff_webscrapper.collector_x import (  # noqa: E402
+    _build_filter_context,
+    _build_post_row,
+    _extract_hashtags,
+    _index_page_includes,
+)
+
+TWEETS_PER_PAGE = 100
+MEDIA_PER_PAGE = 400
+FILTERS = {"tag_filters": ["ICT", "MENTORSHIP"], "text_filters": ["LECTURE #1"], "match_mode": "any", "content_mode": "mixed"}
+
+
+def synthetic_page() -> dict:
+    media = [
+        {
+            "media_key": f"3_{idx}",
+            "type": "photo",
+            "url": f"https://pbs.twimg.com/media/{idx}.jpg",
+            "width": 1200,
+            "height": 675,
+            "alt_text": None,
+        }
+        for idx in range(MEDIA_PER_PAGE)
+    ]
+    per_tweet = MEDIA_PER_PAGE // TWEETS_PER_PAGE
+    tweets = [
+        {
+            "id": str(1_800_000_000_000_000_000 + idx),
+            "text": f"LECTURE #{idx} notes #ICT",
+            "author_id": "42",
+            "created_at": "2026-01-01T00:00:00.000Z",
+            "entities": {"hashtags": [{"tag": "ICT"}]},
+            "attachments": {"media_keys": [f"3_{idx * per_tweet + k}" for k in range(per_tweet)]},
+            "lang": "en",
+            "public_metrics": {"like_count": idx},
+        }
+        for idx in range(TWEETS_PER_PAGE)
+    ]
+    return {
+        "data": tweets,
+        "includes": {"media": media, "users": [{"id": "42", "username": "demo", "name": "Demo"}]},
+    }
+
+
+def legacy_page_rows(payload: dict) -> list[dict]:
+    """Pre-change behaviour: media/users/filter context rebuilt for every tweet."""
+    includes = payload.get("includes", {})
+    users_by_id = {u.get("id"): u for u in includes.get("users", [])}
+    rows = []
+    for tweet in payload["data"]:
+        author = users_by_id.get(tweet.get("author_id"), {})
+        media_by_key = {m.get("media_key"): m for m in includes.get("media", [])}
+        images = []
+        for key in (tweet.get("attachments") or {}).get("media_keys") or []:
+            media = media_by_key.get(key)
+            if media and media.get("type") in {"photo", "animated_gif", "video"}:
+                images.append(
+                    {
+                        "image_id": key,
+                        "source_url": media.get("url") or media.get("preview_image_url"),
+                        "file_path": None,
+                        "media_type": media.get("type"),
+                        "width": media.get("width"),
+                        "height": media.get("height"),
+                        "alt_text": media.get("alt_text"),
+                    }
+                )
+        rows.append(
+            {
+                "post_id": tweet.get("id"),
+                "author_handle": author.get("username"),
+                "text": tweet.get("text", ""),
+                "hashtags": _extract_hashtags(tweet),
+                "filter_context": {
+                    "tag_filters": FILTERS["tag_filters"] or [],
+                    "text_filters": FILTERS["text_filters"] or [],
+                    "match_mode": FILTERS["match_mode"],
+                    "content_mode": FILTERS["content_mode"],
+                },
+                "images": images,
+            }
+        )
+    return rows
+
+
+def current_page_rows(payload: dict) -> list[dict]:
+    media_by_key, users_by_id = _index_page_includes(payload.get("includes", {}))
+    filter_context = _build_filter_context(**FILTERS)
+    rows = []
+    for tweet in payload["data"]:
+        author = users_by_id.get(tweet.get("author_id"), {})
+        rows.append(
+            _build_post_row(
+                tweet=tweet,
+                media_by_key=media_by_key,
+                author_handle=author.get("username") or "demo",
+                author_name=author.get("name"),
+                source_backend="x-api-search-recent",
+                scraped_at="2026-01-01T00:00:00+00:00",
+                filter_context=filter_context,
+            )
+        )
+    return rows
+
+
+def main() -> None:
+    payload = synthetic_page()
+    assert [r["images"] for r in legacy_page_rows(payload)] == [r["images"] for r in current_page_rows(payload)]
+    repeats = 200
+    legacy = min(timeit.repeat(lambda: legacy_page_rows(payload), number=repeats, repeat=5)) / repeats
+    current = min(timeit.repeat(lambda: current_page_rows(payload), number=repeats, repeat=5)) / repeats
+    print(f"page: {TWEETS_PER_PAGE} tweets / {MEDIA_PER_PAGE} media")
+    print(f"legacy per-tweet index : {legacy * 1e3:8.3f} ms/page")
+    print(f"page-level index       : {current * 1e3:8.3f} ms/page")
+    print(f"speedup                : {legacy / current:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
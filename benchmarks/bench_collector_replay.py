@@ -0,0 +1,136 @@
+"""Offline collector throughput benchmark against the local X API replay server.
+
+Builds a synthetic cassette (or loads one written by `collect --record-cassette`),
+serves it through `ReplayServer` with rate-limit headers, optional latency and
+injected failures, and times `iter_public_posts` end to end (HTTP transport,
+pagination, include expansion, scheduler and backoff) per concurrency level.
+A rate limit below the request count makes the scheduler wait for window
+resets; `--fail-every` injects 503s to exercise retry backoff; `--process-ms` with
+`--prefetch` shows how much of the per-page work hides the next request.
+
+    python benchmarks/bench_collector_replay.py --handles 8 --pages 3 --latency-ms 20
+    python benchmarks/bench_collector_replay.py --rate-limit 5 --window-seconds 2 --fail-every 7
+    python benchmarks/bench_collector_replay.py --pages 5 --latency-ms 50 --process-ms 30 --prefetch
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from x_legal_stuff_webscrapper import collector_x  # noqa: E402
+from x_legal_stuff_webscrapper.x_rate_limit import BearerTokenPool, RateLimitScheduler  # noqa: E402
+from x_legal_stuff_webscrapper.x_replay import ReplayServer, load_cassette  # noqa: E402
+
+TWEETS_PER_PAGE = 100
+
+
+def synthetic_cassette(handles: list[str], pages: int) -> list[dict]:
+    entries = []
+    for handle_idx, handle in enumerate(handles):
+        query = collector_x.build_x_search_query(
+            handle=handle, tag_filters=None, text_filters=None, match_mode="any", content_mode="mixed"
+        )
+        for page in range(pages):
+            base_id = 1_900_000_000_000_000_000 - (handle_idx * pages + page) * TWEETS_PER_PAGE
+            tweets = [
+                {
+                    "id": str(base_id - idx),
+                    "text": f"LECTURE #{idx} notes #ICT by @{handle}",
+                    "author_id": str(handle_idx),
+                    "created_at": "2026-01-01T00:00:00.000Z",
+                    "entities": {"hashtags": [{"tag": "ICT"}]},
+                    "attachments": {"media_keys": [f"3_{base_id - idx}"]},
+                    "lang": "en",
+                    "public_metrics": {"like_count": idx},
+                }
+                for idx in range(TWEETS_PER_PAGE)
+            ]
+            media = [
+                {"media_key": f"3_{base_id - idx}", "type": "photo", "url": f"https://pbs.twimg.com/media/{base_id - idx}.jpg"}
+                for idx in range(TWEETS_PER_PAGE)
+            ]
+            meta = {"result_count": TWEETS_PER_PAGE, "newest_id": tweets[0]["id"], "oldest_id": tweets[-1]["id"]}
+            if page + 1 < pages:
+                meta["next_token"] = f"{handle}-p{page + 1}"
+            params = {"query": query}
+            if page:
+                params["next_token"] = f"{handle}-p{page}"
+            entries.append(
+                {
+                    "path": "/2/tweets/search/recent",
+                    "params": params,
+                    "status": 200,
+                    "body": {
+                        "data": tweets,
+                        "includes": {"media": media, "users": [{"id": str(handle_idx), "username": handle, "name": handle}]},
+                        "meta": meta,
+                    },
+                }
+            )
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", help="Replay a recorded cassette instead of synthetic data (needs --account)")
+    parser.add_argument("--account", dest="accounts", action="append", help="Handles present in --cassette")
+    parser.add_argument("--handles", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=3, help="Synthetic pages (100 posts each) per handle")
+    parser.add_argument("--concurrency", type=int, action="append", help="Levels to compare (default: 1 4)")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rate-limit", type=int, default=450)
+    parser.add_argument("--window-seconds", type=float, default=900.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--prefetch", action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument("--process-ms", type=float, default=0.0, help="Simulated per-page processing time")
+    args = parser.parse_args()
+
+    if args.cassette:
+        entries = load_cassette(Path(args.cassette))
+        handles = args.accounts or []
+        limit = 10_000
+    else:
+        handles = [f"bench_account_{idx}" for idx in range(args.handles)]
+        entries = synthetic_cassette(handles, args.pages)
+        limit = args.pages * TWEETS_PER_PAGE
+
+    print(f"{len(handles)} handles, {len(entries)} recorded responses, latency {args.latency_ms:.0f} ms")
+    for concurrency in args.concurrency or [1, 4]:
+        with ReplayServer(
+            entries,
+            rate_limit=args.rate_limit,
+            window_seconds=args.window_seconds,
+            fail_every=args.fail_every,
+            latency_seconds=args.latency_ms / 1000,
+        ) as server:
+            collector_x.configure_x_api(base_url=server.base_url)
+            token_pool = BearerTokenPool(["bench-token"], schedulers=[RateLimitScheduler()])
+            started = time.perf_counter()
+            rows = []
+            for page in collector_x.iter_public_posts(
+                handles,
+                limit_per_account=limit,
+                backend="recent",
+                token_pool=token_pool,
+                concurrency=concurrency,
+                prefetch=args.prefetch,
+            ):
+                rows.extend(page.rows)
+                # Stand-in for persisting the page (JSONL appends, dedup index, job checkpoint).
+                time.sleep(args.process_ms / 1000)
+            elapsed = time.perf_counter() - started
+        print(
+            f"concurrency={concurrency:<3} posts={len(rows):<6} {elapsed:7.2f}s {len(rows) / elapsed:9.0f} posts/s "
+            f"server={server.stats}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Micro-benchmark: local tag/text filtering with many filters.
+
+Compares the previous `_matches_filters` (lowercase filter lists and haystack
+per post, one substring scan per filter) against `CompiledPostFilters` (one
+trie regex compiled per run, all matches in one pass) on synthetic posts.
+
+    python benchmarks/bench_post_filters.py
+    python benchmarks/bench_post_filters.py --filters 50 --posts 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from x_legal_stuff_webscrapper.post_filters import compile_post_filters  # noqa: E402
+
+WORDS = ["ict", "mentorship", "lecture", "market", "structure", "liquidity", "fvg", "order", "block", "silver", "bullet", "killzone", "london", "new", "york", "session", "daily", "bias", "premium", "discount"]
+
+
+def legacy_matches_filters(post: dict, *, tag_filters: list[str], text_filters: list[str], match_mode: str) -> bool:
+    tag_filters = [x.lower() for x in (tag_filters or [])]
+    text_filters = [x.lower() for x in (text_filters or [])]
+    if not tag_filters and not text_filters:
+        return True
+    haystack = f"{post.get('text', '')} {' '.join(post.get('hashtags', []))}".lower()
+    checks: list[bool] = []
+    checks.extend(tag in haystack for tag in tag_filters)
+    checks.extend(term in haystack for term in text_filters)
+    return all(checks) if match_mode == "all" else any(checks)
+
+
+def synthetic_filters(rng: random.Random, count: int) -> tuple[list[str], list[str]]:
+    tags = [f"{rng.choice(WORDS).upper()}{idx}" for idx in range(count // 2)]
+    texts = [" ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" #{idx}" for idx in range(count - count // 2)]
+    return tags, texts
+
+
+def synthetic_posts(rng: random.Random, count: int) -> list[dict]:
+    return [
+        {
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))),
+            "hashtags": [rng.choice(WORDS).upper() for _ in range(rng.randint(0, 4))],
+        }
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filters", type=int, action="append", help="Filter counts to compare (default: 20 200 800)")
+    parser.add_argument("--posts", type=int, default=3000)
+    args = parser.parse_args()
+
+    rng = random.Random(2026)
+    posts = synthetic_posts(rng, args.posts)
+    for filter_count in args.filters or [20, 200, 800]:
+        tags, texts = synthetic_filters(rng, filter_count)
+        for mode in ("any", "all"):
+            kwargs = {"tag_filters": tags, "text_filters": texts, "match_mode": mode}
+            started = time.perf_counter()
+            legacy = [legacy_matches_filters(post, **kwargs) for post in posts]
+            legacy_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            matcher = compile_post_filters(**kwargs)
+            compiled = [matcher.matches(post) for post in posts]
+            compiled_seconds = time.perf_counter() - started
+
+            assert legacy == compiled
+            print(
+                f"filters={filter_count:<4} mode={mode:<3} posts={len(posts)} "
+                f"legacy={legacy_seconds * 1e3:8.1f} ms compiled={compiled_seconds * 1e3:8.1f} ms "
+                f"speedup={legacy_seconds / compiled_seconds:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
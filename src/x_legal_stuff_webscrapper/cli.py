@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import argparse
 import logging
+import time
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 from .classifier import classify_posts
-from .collector_x import collect_public_posts
+from .collect_budget import BudgetLedger, CollectBudget
+from .collect_cursors import CollectCursorStore
+from .collect_jobs import CollectJob
+from .collector_x import BackfillPlan, configure_x_api, iter_public_posts
 from .config import AppConfig
 from .exporter import export_dataset
+from .http_transport import configure_default_transport, log_transport_stats
+from .image_index import ImageUrlIndex
+from .image_store import ImageStore
 from .knowledge_gate import (
     default_export_gate_policy,
     evaluate_run_export_gate,
@@ -18,9 +26,15 @@ from .knowledge_library_export import export_knowledge_library_streams
 from .knowledge_quality import run_quality_gates_for_knowledge_records
 from .knowledge_schema import canonical_knowledge_record_json_schema
 from .llm_enrichment import enrich_posts
-from .media_downloader import download_images_for_posts
-from .storage import append_jsonl, ensure_dir, read_jsonl, write_json, write_jsonl
+from .media_downloader import DownloadLimits, DownloadThrottle, download_images_for_posts
+from .media_maintenance import collect_image_references, fsck_image_store, gc_image_store
+from .perceptual_hash import DEFAULT_MAX_DISTANCE
+from .post_index import PostIdIndex
+from .storage import JsonlAppender, append_jsonl, ensure_dir, read_jsonl, write_json, write_jsonl
 from .vision_ocr import DEFAULT_OCR_PROMPT, process_posts_for_ocr
+from .x_rate_limit import BearerTokenPool
+from .x_replay import CassetteRecorder, ReplayServer, load_cassette
+from .x_user_cache import XUserCache
 
 
 def _configure_logging(level: str) -> None:
@@ -34,6 +48,13 @@ def _paths(data_dir: Path) -> dict[str, Path]:
     return {
         "raw_posts": data_dir / "raw" / "posts.jsonl",
         "image_manifest": data_dir / "index" / "images_manifest.jsonl",
+        "collect_cursors": data_dir / "index" / "collect_cursors.json",
+        "backfill_checkpoints": data_dir / "index" / "backfill",
+        "collect_jobs": data_dir / "index" / "collect_jobs",
+        "post_id_index": data_dir / "index" / "post_ids.sqlite",
+        "image_url_index": data_dir / "index" / "image_urls.sqlite",
+        "x_user_cache": data_dir / "index" / "x_users.json",
+        "x_api_budget": data_dir / "index" / "x_api_budget.json",
         "ocr": data_dir / "processed" / "ocr_results.jsonl",
         "knowledge": data_dir / "processed" / "knowledge_extract.jsonl",
         "knowledge_canonical": data_dir / "processed" / "knowledge_extract_canonical.jsonl",
@@ -54,51 +75,337 @@ def _paths(data_dir: Path) -> dict[str, Path]:
     }
 
 
+def _parse_utc_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _collect_params(args: argparse.Namespace, config: AppConfig) -> dict:
+    use_filters = args.mode == "filtered"
+    backfill_end = args.backfill_end
+    if args.backfill_start and not backfill_end:
+        # Pinned at job creation so a resumed backfill reuses the same shards.
+        # X rejects end_time values less than ~10s in the past.
+        backfill_end = (datetime.now(UTC) - timedelta(seconds=30)).isoformat()
+    return {
+        "handles": args.accounts or config.x_source_accounts,
+        "limit_per_account": args.limit,
+        "backend": args.backend if args.backend != "auto" else config.x_collect_backend,
+        "mode": args.mode,
+        "tag_filters": (args.tags or config.x_filter_tags) if use_filters else None,
+        "text_filters": (args.queries or config.x_filter_keywords) if use_filters else None,
+        "match_mode": args.match_mode,
+        "content_mode": args.content_mode,
+        "download_images": args.download_images,
+        "download_concurrency": args.download_concurrency,
+        "refresh_images": args.refresh_images,
+        "collect_concurrency": args.collect_concurrency,
+        "batch_search": args.batch_search,
+        "max_query_length": args.max_query_length,
+        "field_profile": args.field_profile,
+        "prefetch": args.prefetch,
+        "max_requests": args.max_requests,
+        "max_posts_read": args.max_posts_read,
+        "budget_scope": args.budget_scope,
+        "incremental": args.incremental,
+        "dedup": args.dedup,
+        "backfill_start": args.backfill_start,
+        "backfill_end": backfill_end,
+        "backfill_shard_days": args.backfill_shard_days,
+        "backfill_concurrency": args.backfill_concurrency,
+    }
+
+
+def _backfill_plan(params: dict, paths: dict[str, Path]) -> BackfillPlan | None:
+    if not params.get("backfill_start"):
+        return None
+    return BackfillPlan(
+        start_time=_parse_utc_datetime(params["backfill_start"]),
+        end_time=_parse_utc_datetime(params["backfill_end"]),
+        shard_days=params["backfill_shard_days"],
+        concurrency=params["backfill_concurrency"],
+        checkpoint_dir=paths["backfill_checkpoints"],
+    )
+
+
+def _log_token_usage(logger: logging.Logger, token_pool: BearerTokenPool | None) -> None:
+    if token_pool is None:
+        return
+    for usage in token_pool.usage():
+        if usage["requests"]:
+            logger.info(
+                "X API %s: requests=%s rate_limited=%s families=%s",
+                usage["token"],
+                usage["requests"],
+                usage["rate_limited"],
+                usage["families"],
+            )
+
+
 def cmd_collect(args: argparse.Namespace, config: AppConfig) -> int:
     logger = logging.getLogger("collect")
     paths = _paths(config.data_dir)
-    handles = args.accounts or config.x_source_accounts
-    if not handles:
-        logger.error("No source accounts provided. Use --account or X_SOURCE_ACCOUNTS.")
-        return 2
-
-    tag_filters = args.tags or config.x_filter_tags
-    text_filters = args.queries or config.x_filter_keywords
-    use_filters = args.mode == "filtered"
-    backend = args.backend if args.backend != "auto" else config.x_collect_backend
+    if args.resume:
+        try:
+            job = CollectJob.load(paths["collect_jobs"], args.resume)
+        except FileNotFoundError as exc:
+            logger.error("%s", exc)
+            return 2
+        if job.payload.get("status") == "completed":
+            logger.info("Collect job %s already completed; nothing to resume", job.job_id)
+            return 0
+        params = job.params
+        logger.info("Resuming collect job %s", job.job_id)
+    else:
+        params = _collect_params(args, config)
+        if not params["handles"]:
+            logger.error("No source accounts provided. Use --account or X_SOURCE_ACCOUNTS.")
+            return 2
+        job = CollectJob.create(paths["collect_jobs"], params)
+        logger.info("Started collect job %s", job.job_id)
+
+    handles = params["handles"]
+    backend = params["backend"]
+    bearer_tokens = [token for token in [config.x_api_bearer_token, *config.x_api_bearer_tokens] if token]
+    token_pool = BearerTokenPool(bearer_tokens) if bearer_tokens else None
+    cursor_store = CollectCursorStore(paths["collect_cursors"]) if params["incremental"] else None
+    user_cache = XUserCache(paths["x_user_cache"], ttl_seconds=config.x_user_cache_ttl_hours * 3600)
+    budget = CollectBudget(
+        max_requests=params.get("max_requests"),
+        max_posts_read=params.get("max_posts_read"),
+        ledger=BudgetLedger(paths["x_api_budget"]),
+        scope=params.get("budget_scope", "run"),
+    )
+    recorder = CassetteRecorder(Path(args.record_cassette)) if args.record_cassette else None
+    if recorder is not None:
+        configure_x_api(recorder=recorder)
 
+    # Token usage and the recording are reported on every exit, including failed and budget-cut runs.
     try:
-        posts = collect_public_posts(
-            handles=handles,
-            limit_per_account=args.limit,
-            backend=backend,
-            x_api_bearer_token=config.x_api_bearer_token,
-            tag_filters=tag_filters if use_filters else None,
-            text_filters=text_filters if use_filters else None,
-            match_mode=args.match_mode,
-            content_mode=args.content_mode,
+        post_count = 0
+        duplicate_count = 0
+        image_count = 0
+        post_index: PostIdIndex | None = None
+        url_index: ImageUrlIndex | None = None
+        throttle = DownloadThrottle(
+            DownloadLimits(
+                requests_per_second=config.media_requests_per_second_per_host or None,
+                bytes_per_second=config.media_bytes_per_second_per_host or None,
+                max_attempts=config.media_max_attempts,
+                max_retry_after_seconds=config.media_max_retry_after_seconds or None,
+            )
         )
-    except Exception as exc:
-        logger.error("Collect failed: %s", exc)
-        return 1
+        try:
+            if params.get("dedup", True):
+                post_index = PostIdIndex(paths["post_id_index"])
+                post_index.ensure_bootstrapped("raw", paths["raw_posts"])
+                post_index.ensure_bootstrapped("processed", paths["processed_posts"])
+            if params["download_images"]:
+                url_index = ImageUrlIndex(paths["image_url_index"])
+                url_index.ensure_bootstrapped(paths["image_manifest"])
+            pages = iter_public_posts(
+                handles=handles,
+                limit_per_account=params["limit_per_account"],
+                backend=backend,
+                token_pool=token_pool,
+                tag_filters=params["tag_filters"],
+                text_filters=params["text_filters"],
+                match_mode=params["match_mode"],
+                content_mode=params["content_mode"],
+                concurrency=params["collect_concurrency"],
+                cursor_store=cursor_store,
+                backfill=_backfill_plan(params, paths),
+                resume_state=job.handle_states if args.resume else None,
+                batch_search=params.get("batch_search", False),
+                max_query_length=params.get("max_query_length", 512),
+                user_cache=user_cache,
+                field_profile=params.get("field_profile", "full"),
+                budget=budget,
+                prefetch=params.get("prefetch", False),
+            )
+            # Each page is persisted as soon as it arrives and checkpointed right
+            # after, so a failure late in a long pagination keeps everything
+            # collected before it and `--resume` continues from the next page.
+            with (
+                JsonlAppender(paths["raw_posts"]) as raw_writer,
+                JsonlAppender(paths["processed_posts"]) as processed_writer,
+                JsonlAppender(paths["image_manifest"]) as manifest_writer,
+            ):
+                for page in pages:
+                    raw_posts = page.rows
+                    processed_posts = page.rows
+                    if post_index is not None:
+                        raw_posts = post_index.filter_new("raw", page.rows)
+                        processed_posts = post_index.filter_new("processed", page.rows)
+                        duplicate_count += len(page.rows) - len(raw_posts)
+                    if params["download_images"]:
+                        # Same dicts in both lists, so image metadata lands in both stores.
+                        new_ids = {id(post) for post in raw_posts} | {id(post) for post in processed_posts}
+                        _, image_manifest = download_images_for_posts(
+                            [post for post in page.rows if id(post) in new_ids],
+                            data_dir=config.data_dir,
+                            concurrency=params.get("download_concurrency", 1),
+                            max_per_host=config.http_pool_size_per_host,
+                            url_index=url_index,
+                            revalidate=params.get("refresh_images", False),
+                            throttle=throttle,
+                        )
+                        image_count += manifest_writer.write_many(image_manifest)
+                    raw_writer.write_many(raw_posts)
+                    processed_writer.write_many(processed_posts)
+                    for writer in (raw_writer, processed_writer, manifest_writer):
+                        writer.flush()
+                    if post_index is not None:
+                        post_index.commit()
+                    job.record(page.checkpoints())
+                    budget.save()
+                    post_count += len(raw_posts)
+        except Exception as exc:
+            if post_index is not None:
+                post_index.rollback()
+                post_index.close()
+            if url_index is not None:
+                url_index.close()
+            user_cache.save()
+            budget.save()
+            job.finish("failed")
+            logger.error("Collect failed after writing %s posts: %s", post_count, exc)
+            logger.error("Resume with: collect --resume %s", job.job_id)
+            return 1
+
+        budget.save()
+        if budget.stopped:
+            job.finish("budget_exhausted")
+            logger.warning(
+                "X API budget reached before %s accounts finished (used requests=%s posts_read=%s)",
+                len(budget.cut),
+                budget.used["requests"],
+                budget.used["posts_read"],
+            )
+            logger.warning("Resume with: collect --resume %s", job.job_id)
+        else:
+            job.finish("completed")
+        user_cache.save()
+        if post_index is not None:
+            post_index.close()
+            if duplicate_count:
+                logger.info("Skipped %s posts already stored (post_id index)", duplicate_count)
+        if url_index is not None:
+            url_index.close()
+        if params["download_images"]:
+            logger.info("Downloaded/processed %s images", image_count)
+            stats = throttle.stats()
+            if stats["throttled_seconds"] or stats["retries"]:
+                logger.info(
+                    "Image downloads: %s requests, %s bytes, throttled %.1fs, %s retries (%s rate-limited), backoff %.1fs",
+                    stats["requests"],
+                    stats["bytes"],
+                    stats["throttled_seconds"],
+                    stats["retries"],
+                    stats["rate_limited"],
+                    stats["backoff_seconds"],
+                )
+        if cursor_store:
+            cursor_store.save()
+        logger.info(
+            "Collected %s posts from %s accounts (job=%s, backend=%s, mode=%s, content_mode=%s, tags=%s, queries=%s, match=%s)",
+            post_count,
+            len(handles),
+            job.job_id,
+            backend,
+            params["mode"],
+            params["content_mode"],
+            params["tag_filters"] or [],
+            params["text_filters"] or [],
+            params["match_mode"],
+        )
+        return 0
+    finally:
+        _log_token_usage(logger, token_pool)
+        if recorder is not None:
+            configure_x_api(recorder=None)
+            logger.info("Recorded %s X API responses to %s", recorder.count, recorder.path)
+        log_transport_stats(logger)
+
+
+def cmd_replay_server(args: argparse.Namespace, _: AppConfig) -> int:
+    logger = logging.getLogger("replay")
+    server = ReplayServer(
+        load_cassette(Path(args.cassette)),
+        rate_limit=args.rate_limit,
+        window_seconds=args.window_seconds,
+        fail_every=args.fail_every,
+        latency_seconds=args.latency_ms / 1000,
+        port=args.port,
+    )
+    logger.info("Run collect with X_API_BASE_URL=%s", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    logger.info("Replay server stats: %s", server.stats)
+    return 0
+
+
+def cmd_migrate_images(args: argparse.Namespace, config: AppConfig) -> int:
+    logger = logging.getLogger("migrate_images")
+    paths = _paths(config.data_dir)
+    moved = ImageStore.for_data_dir(config.data_dir).migrate_flat_layout(dry_run=args.dry_run)
+    if args.dry_run:
+        logger.info("Would move %s flat images into by_sha256/<aa>/<bb>/", len(moved))
+        return 0
+    if moved and paths["image_url_index"].exists():
+        with ImageUrlIndex(paths["image_url_index"]) as url_index:
+            relocated = url_index.relocate(
+                {
+                    old.relative_to(config.data_dir).as_posix(): new.relative_to(config.data_dir).as_posix()
+                    for old, new in moved.items()
+                }
+            )
+        logger.info("Updated %s image URL index entries", relocated)
+    logger.info("Moved %s flat images into by_sha256/<aa>/<bb>/ (older manifest paths still resolve)", len(moved))
+    return 0
 
-    if args.download_images:
-        posts, image_manifest = download_images_for_posts(posts, data_dir=config.data_dir)
-        append_jsonl(paths["image_manifest"], image_manifest)
-        logger.info("Downloaded/processed %s images", len(image_manifest))
 
-    append_jsonl(paths["raw_posts"], posts)
-    append_jsonl(paths["processed_posts"], posts)
+def cmd_media_fsck(args: argparse.Namespace, config: AppConfig) -> int:
+    logger = logging.getLogger("media_fsck")
+    started = time.perf_counter()
+    report = fsck_image_store(ImageStore.for_data_dir(config.data_dir), workers=args.workers, repair=args.repair)
+    elapsed = time.perf_counter() - started
     logger.info(
-        "Collected %s posts from %s accounts (backend=%s, mode=%s, content_mode=%s, tags=%s, queries=%s, match=%s)",
-        len(posts),
-        len(handles),
-        backend,
-        "filtered" if use_filters else "all",
-        args.content_mode,
-        tag_filters if use_filters else [],
-        text_filters if use_filters else [],
-        args.match_mode,
+        "Checked %s images (%.1f MB) in %.1fs: corrupt=%s unreadable=%s removed=%s",
+        report.checked,
+        report.bytes_checked / 1e6,
+        elapsed,
+        len(report.corrupt),
+        len(report.unreadable),
+        report.removed,
+    )
+    if report.corrupt and not args.repair:
+        logger.warning("Delete corrupt images with: media-fsck --repair (they are downloaded again by collect)")
+    return 0 if report.ok else 1
+
+
+def cmd_media_gc(args: argparse.Namespace, config: AppConfig) -> int:
+    logger = logging.getLogger("media_gc")
+    paths = _paths(config.data_dir)
+    references = collect_image_references(
+        manifest_paths=[paths["image_manifest"]],
+        posts_paths=[paths["raw_posts"], paths["processed_posts"]],
+    )
+    report = gc_image_store(
+        ImageStore.for_data_dir(config.data_dir),
+        references,
+        min_age_seconds=args.min_age_hours * 3600,
+        dry_run=args.dry_run,
+    )
+    logger.info(
+        "%s %s of %s images (%.1f MB) not referenced by posts or images_manifest.jsonl, %s stale temp files",
+        "Would remove" if args.dry_run else "Removed",
+        len(report.orphaned),
+        report.scanned,
+        report.bytes_freed / 1e6,
+        report.stale_temp_files,
     )
     return 0
 
@@ -110,6 +417,7 @@ def cmd_ocr(args: argparse.Namespace, config: AppConfig) -> int:
     backend = args.backend
     if backend == "auto":
         backend = "openai-vision" if config.openai_api_key else "placeholder"
+    previous_results = read_jsonl(paths["ocr"]) if args.reuse_duplicates and paths["ocr"].exists() else []
     try:
         results = process_posts_for_ocr(
             posts,
@@ -118,12 +426,18 @@ def cmd_ocr(args: argparse.Namespace, config: AppConfig) -> int:
             openai_api_key=config.openai_api_key,
             openai_model=args.model or config.openai_ocr_model,
             openai_prompt=args.prompt or DEFAULT_OCR_PROMPT,
+            previous_results=previous_results,
+            reuse_duplicates=args.reuse_duplicates,
+            reuse_near_duplicates=args.reuse_near_duplicates,
+            near_duplicate_distance=args.near_duplicate_distance,
         )
     except Exception as exc:
         logger.error("OCR failed: %s", exc)
         return 1
     append_jsonl(paths["ocr"], results)
-    logger.info("Generated %s OCR records (backend=%s)", len(results), backend)
+    reused = sum(1 for row in results if row.get("reused_from"))
+    logger.info("Generated %s OCR records (backend=%s, reused from duplicates=%s)", len(results), backend, reused)
+    log_transport_stats(logger)
     return 0
 
 
@@ -162,6 +476,7 @@ def cmd_extract_knowledge(args: argparse.Namespace, config: AppConfig) -> int:
         return 1
     append_jsonl(paths["knowledge"], records)
     logger.info("Generated %s knowledge extraction records (backend=%s)", len(records), backend)
+    log_transport_stats(logger)
     return 0
 
 
@@ -365,6 +680,119 @@ def build_parser() -> argparse.ArgumentParser:
         default=False,
         help="Download image assets and store deduplicated files under data/raw/images",
     )
+    collect.add_argument(
+        "--download-concurrency",
+        type=int,
+        default=8,
+        help="Parallel image downloads with --download-images (per host capped by HTTP_POOL_SIZE_PER_HOST)",
+    )
+    collect.add_argument(
+        "--refresh-images",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Re-check already downloaded images with conditional requests (ETag/Last-Modified, HEAD probe) instead of reusing them",
+    )
+    collect.add_argument(
+        "--collect-concurrency",
+        type=int,
+        default=1,
+        help="Number of accounts collected in parallel (shares one X API rate-limit budget)",
+    )
+    collect.add_argument(
+        "--batch-search",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Pack several accounts into one (from:a OR from:b ...) query for backends recent/all",
+    )
+    collect.add_argument(
+        "--max-query-length",
+        type=int,
+        default=512,
+        help="X search query length limit used by --batch-search (512 basic, 1024 pro, 4096 full-archive/enterprise)",
+    )
+    collect.add_argument(
+        "--field-profile",
+        choices=["full", "lean"],
+        default="full",
+        help="X API fields to request; lean skips public_metrics, lang and media size/alt text",
+    )
+    collect.add_argument(
+        "--prefetch",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Request the next X API page while the current one is filtered and saved (off by default)",
+    )
+    collect.add_argument("--max-requests", type=int, help="Cap on X API page requests (split fairly across accounts)")
+    collect.add_argument(
+        "--max-posts-read",
+        type=int,
+        help="Cap on posts returned by the X API (billing unit for full-archive search), split fairly across accounts",
+    )
+    collect.add_argument(
+        "--budget-scope",
+        choices=["run", "month"],
+        default="run",
+        help="Apply --max-requests/--max-posts-read to this run or to the calendar month in data/index/x_api_budget.json",
+    )
+    collect.add_argument(
+        "--incremental",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Only fetch posts newer than the since_id cursor stored per account/backend/query",
+    )
+    collect.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip posts whose post_id is already in raw/processed posts.jsonl (index: data/index/post_ids.sqlite)",
+    )
+    collect.add_argument(
+        "--resume",
+        metavar="JOB_ID",
+        help="Resume an interrupted collect job from its checkpoint (other collect options are taken from the job)",
+    )
+    collect.add_argument(
+        "--backfill-start",
+        help="Full-archive backfill start (ISO date/datetime, UTC); enables time-sharded pagination for backend 'all'",
+    )
+    collect.add_argument("--backfill-end", help="Full-archive backfill end (ISO date/datetime, UTC; default: now)")
+    collect.add_argument("--backfill-shard-days", type=int, default=30, help="Days per backfill time shard")
+    collect.add_argument(
+        "--backfill-concurrency",
+        type=int,
+        default=4,
+        help="Backfill shards paginated in parallel per account (newest first; none started once --limit is reached)",
+    )
+    collect.add_argument(
+        "--record-cassette",
+        metavar="PATH",
+        help="Append every successful X API response to a JSONL cassette for offline replay",
+    )
+
+    replay = subparsers.add_parser("replay-server", help="Serve a recorded X API cassette locally (set X_API_BASE_URL)")
+    replay.add_argument("--cassette", required=True, help="JSONL cassette written by collect --record-cassette")
+    replay.add_argument("--port", type=int, default=8787)
+    replay.add_argument("--rate-limit", type=int, default=450, help="Requests per token, endpoint family and window")
+    replay.add_argument("--window-seconds", type=float, default=900.0, help="Rate-limit window length")
+    replay.add_argument("--fail-every", type=int, default=0, help="Answer every N-th request with a 503 (0 disables)")
+    replay.add_argument("--latency-ms", type=float, default=0.0, help="Artificial latency per response")
+
+    migrate = subparsers.add_parser(
+        "migrate-images", help="Move images stored flat in data/raw/images/by_sha256/ into the sharded layout"
+    )
+    migrate.add_argument("--dry-run", action="store_true", help="Only count the images that would move")
+
+    fsck = subparsers.add_parser("media-fsck", help="Re-hash stored images and report files that no longer match their SHA256 name")
+    fsck.add_argument("--workers", type=int, help="Parallel hashing threads (default: CPU count)")
+    fsck.add_argument("--repair", action="store_true", help="Delete corrupt images so the next collect downloads them again")
+    gc = subparsers.add_parser("media-gc", help="Delete stored images not referenced by posts.jsonl or images_manifest.jsonl")
+    gc.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    gc.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=1.0,
+        help="Keep unreferenced images newer than this (protects a collect running at the same time)",
+    )
 
     ocr = subparsers.add_parser("ocr", help="Run OCR pipeline for collected images")
     ocr.add_argument(
@@ -375,6 +803,26 @@ def build_parser() -> argparse.ArgumentParser:
     )
     ocr.add_argument("--model", help="Override OpenAI OCR model")
     ocr.add_argument("--prompt", help="Override OCR extraction prompt")
+    ocr.add_argument(
+        "--reuse-duplicates",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Reuse OCR text of byte-identical (sha256) images instead of a new OCR call",
+    )
+    ocr.add_argument(
+        "--reuse-near-duplicates",
+        action="store_true",
+        help=(
+            "Also reuse OCR text of near-identical (dHash) images. Off by default: slides from one "
+            "template can fall within the distance and would silently get another slide's text"
+        ),
+    )
+    ocr.add_argument(
+        "--near-duplicate-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help="Max Hamming distance between 64-bit dHashes treated as the same image (with --reuse-near-duplicates)",
+    )
     extract = subparsers.add_parser("extract-knowledge", help="Generate AI-ready semantic knowledge JSON from post+OCR")
     extract.add_argument(
         "--backend",
@@ -414,6 +862,11 @@ def main(argv: list[str] | None = None) -> int:
     config = AppConfig.from_env()
     _configure_logging(config.log_level)
     ensure_dir(config.data_dir)
+    configure_default_transport(
+        pool_size_per_host=config.http_pool_size_per_host,
+        connect_timeout_seconds=config.http_connect_timeout_seconds,
+    )
+    configure_x_api(base_url=config.x_api_base_url)
 
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -427,6 +880,10 @@ def main(argv: list[str] | None = None) -> int:
         "export-knowledge-library": cmd_export_knowledge_library,
         "classify": cmd_classify,
         "export": cmd_export,
+        "replay-server": cmd_replay_server,
+        "migrate-images": cmd_migrate_images,
+        "media-fsck": cmd_media_fsck,
+        "media-gc": cmd_media_gc,
     }
     return handlers[args.command](args, config)
 
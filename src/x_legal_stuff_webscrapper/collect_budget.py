@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Literal
+
+from .storage import write_json
+
+LOGGER = logging.getLogger("collect_budget")
+
+BudgetScope = Literal["run", "month"]
+
+
+def _month_key(now: datetime | None = None) -> str:
+    return (now or datetime.now(UTC)).strftime("%Y-%m")
+
+
+class BudgetLedger:
+    """
+    Persisted X API consumption per calendar month (UTC) and backend.
+
+    `data/index/x_api_budget.json` holds `{"months": {"2026-10": {"all":
+    {"requests": 12, "posts_read": 1200}}}}`. Full-archive search is billed
+    per post read, so `posts_read` counts every post returned by the API,
+    including ones later dropped by local filters or limits.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._months: dict[str, dict[str, dict[str, int]]] = {}
+        if path.exists():
+            self._months = json.loads(path.read_text(encoding="utf-8")).get("months", {})
+
+    def record(self, backend: str, *, requests: int, posts_read: int) -> None:
+        with self._lock:
+            entry = self._months.setdefault(_month_key(), {}).setdefault(backend, {"requests": 0, "posts_read": 0})
+            entry["requests"] += requests
+            entry["posts_read"] += posts_read
+
+    def month_usage(self, backend: str, month: str | None = None) -> dict[str, int]:
+        with self._lock:
+            entry = (self._months.get(month or _month_key()) or {}).get(backend) or {}
+            return {"requests": entry.get("requests", 0), "posts_read": entry.get("posts_read", 0)}
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"version": 1, "months": json.loads(json.dumps(self._months))}
+        write_json(self.path, payload)
+
+
+class _FairShare:
+    """
+    Split a capped total evenly across consumers.
+
+    Each consumer draws from its own share first, then from a common pool fed
+    by refunds and by the unused share of consumers that finished early.
+    """
+
+    def __init__(self, total: int, consumers: list[str]) -> None:
+        count = max(1, len(consumers))
+        base, extra = divmod(max(0, total), count)
+        self.quota = {consumer: base + (1 if idx < extra else 0) for idx, consumer in enumerate(consumers)}
+        self.pool = 0 if consumers else max(0, total)
+
+    def grant(self, consumer: str, wanted: int) -> int:
+        own = self.quota.get(consumer, 0)
+        from_own = min(wanted, own)
+        from_pool = min(wanted - from_own, self.pool)
+        self.quota[consumer] = own - from_own
+        self.pool -= from_pool
+        return from_own + from_pool
+
+    def refund(self, consumer: str, amount: int) -> None:
+        if amount > 0:
+            self.quota[consumer] = self.quota.get(consumer, 0) + amount
+
+    def release(self, consumer: str) -> None:
+        self.pool += self.quota.pop(consumer, 0)
+
+    def remaining(self) -> int:
+        return self.pool + sum(self.quota.values())
+
+
+class CollectBudget:
+    """
+    Request / posts-read caps for one `collect` run, shared fairly by accounts.
+
+    Every page request first `reserve()`s one request and up to `wanted`
+    posts from the caller's fair share, then `settle()`s with the number of
+    posts actually returned so the unread remainder flows back. When its
+    share and the common pool cannot cover a minimum page, `reserve()`
+    returns 0: that consumer ends its pagination without being marked done,
+    lands in `cut` and the collect job stays resumable. Other consumers
+    keep paging on their own shares. With
+    `scope="month"` the caps also count what the ledger already recorded
+    for this backend in the current month.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_requests: int | None = None,
+        max_posts_read: int | None = None,
+        ledger: BudgetLedger | None = None,
+        scope: BudgetScope = "run",
+    ) -> None:
+        self.backend: str | None = None
+        self.ledger = ledger
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._limits = {"requests": max_requests, "posts_read": max_posts_read}
+        self.used = {"requests": 0, "posts_read": 0}
+        self.cut: set[str] = set()
+        self._shares: dict[str, _FairShare] = {}
+
+    def allocate(self, consumers: list[str], *, backend: str) -> None:
+        """Split what is left of the caps across `consumers` (handles, or batch keys)."""
+        with self._lock:
+            self.backend = backend
+            already_used = dict(self.used)
+            if self.scope == "month" and self.ledger is not None:
+                already_used = self.ledger.month_usage(backend)
+            self._shares = {
+                name: _FairShare(cap - already_used[name], consumers)
+                for name, cap in self._limits.items()
+                if cap is not None
+            }
+
+    def reserve(self, consumer: str, *, wanted_posts: int, min_posts: int = 1) -> int:
+        """Reserve one request and up to `wanted_posts` posts; 0 means stop paginating."""
+        with self._lock:
+            requests = self._shares.get("requests")
+            posts = self._shares.get("posts_read")
+            if requests is not None and requests.grant(consumer, 1) < 1:
+                return self._stop(consumer, "requests")
+            granted = wanted_posts if posts is None else posts.grant(consumer, wanted_posts)
+            if granted < min(min_posts, wanted_posts):
+                if posts is not None:
+                    posts.refund(consumer, granted)
+                if requests is not None:
+                    requests.refund(consumer, 1)
+                return self._stop(consumer, "posts_read")
+            return granted
+
+    def _stop(self, consumer: str, limit_name: str) -> int:
+        LOGGER.warning(
+            "X API budget share exhausted for %s (%s cap, backend=%s, run usage=%s); stopping its pagination",
+            consumer,
+            limit_name,
+            self.backend,
+            self.used,
+        )
+        self.cut.add(consumer)
+        return 0
+
+    @property
+    def stopped(self) -> bool:
+        """True once any consumer was cut short by the budget."""
+        return bool(self.cut)
+
+    def settle(self, consumer: str, *, reserved_posts: int, posts_read: int) -> None:
+        with self._lock:
+            posts = self._shares.get("posts_read")
+            if posts is not None:
+                posts.refund(consumer, reserved_posts - posts_read)
+            self.used["requests"] += 1
+            self.used["posts_read"] += posts_read
+        if self.ledger is not None:
+            self.ledger.record(self.backend or "unknown", requests=1, posts_read=posts_read)
+
+    def charge_request(self, consumer: str) -> bool:
+        """Count a request that reads no posts (user lookups); False when the consumer's requests are used up."""
+        with self._lock:
+            requests = self._shares.get("requests")
+            if requests is not None and requests.grant(consumer, 1) < 1:
+                self._stop(consumer, "requests")
+                return False
+            self.used["requests"] += 1
+        if self.ledger is not None:
+            self.ledger.record(self.backend or "unknown", requests=1, posts_read=0)
+        return True
+
+    def unreserve(self, consumer: str, *, reserved_posts: int) -> None:
+        """Return a reservation whose request was never sent."""
+        with self._lock:
+            posts = self._shares.get("posts_read")
+            requests = self._shares.get("requests")
+            if posts is not None:
+                posts.refund(consumer, reserved_posts)
+            if requests is not None:
+                requests.refund(consumer, 1)
+
+    def release(self, consumer: str) -> None:
+        """Hand a finished consumer's unused share to the others."""
+        with self._lock:
+            for share in self._shares.values():
+                share.release(consumer)
+
+    def save(self) -> None:
+        if self.ledger is not None:
+            self.ledger.save()
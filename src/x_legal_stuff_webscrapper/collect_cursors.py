@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+from .storage import write_json
+
+
+def cursor_key(*, handle: str, backend: str, query: str) -> str:
+    return f"{handle.lower()}|{backend}|{query}"
+
+
+def _post_id_int(post_id: str | int | None) -> int | None:
+    if post_id is None:
+        return None
+    value = str(post_id).strip()
+    return int(value) if value.isdigit() else None
+
+
+class CollectCursorStore:
+    """
+    Persisted `since_id` cursors for incremental collection.
+
+    One entry per (handle, backend, query) holds the newest post id seen by a
+    completed fetch. The next run passes it as `since_id`, so only the delta is
+    paged. Posts older than the newest fetched one but newer than the previous
+    cursor are not revisited when `--limit` cut a run short.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._cursors: dict[str, dict] = {}
+        if path.exists():
+            self._cursors = json.loads(path.read_text(encoding="utf-8")).get("cursors", {})
+
+    def get_since_id(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._cursors.get(key)
+        return entry.get("since_id") if entry else None
+
+    def advance(self, key: str, newest_id: str | None) -> None:
+        newest = _post_id_int(newest_id)
+        if newest is None:
+            return
+        with self._lock:
+            current = _post_id_int((self._cursors.get(key) or {}).get("since_id"))
+            if current is not None and current >= newest:
+                return
+            self._cursors[key] = {
+                "since_id": str(newest),
+                "updated_at": datetime.now(UTC).isoformat(),
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"version": 1, "cursors": dict(sorted(self._cursors.items()))}
+        write_json(self.path, payload)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterable
+
+from .storage import ensure_dir, write_json
+
+
+def new_job_id() -> str:
+    return f"{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:6]}"
+
+
+@dataclass(slots=True)
+class HandleCheckpoint:
+    """Progress of one handle after a persisted page."""
+
+    handle: str
+    rows_written: int
+    next_token: str | None = None
+    newest_id: str | None = None
+    done: bool = False
+    until_id: str | None = None
+
+
+class CollectJob:
+    """
+    Checkpoint file for one `collect` run (`data/index/collect_jobs/<job_id>.json`).
+
+    Stores the run parameters and, per handle, the pagination token of the next
+    unread page (or, for batched search, the `until_id` read past so far),
+    rows written so far and whether the handle is finished. The
+    file is rewritten after every persisted page, so `collect --resume <job_id>`
+    continues from the last completed page.
+    """
+
+    def __init__(self, path: Path, payload: dict) -> None:
+        self.path = path
+        self.payload = payload
+
+    @classmethod
+    def create(cls, jobs_dir: Path, params: dict) -> "CollectJob":
+        job_id = new_job_id()
+        now = datetime.now(UTC).isoformat()
+        payload = {
+            "job_id": job_id,
+            "status": "running",
+            "created_at": now,
+            "updated_at": now,
+            "params": params,
+            "handles": {
+                handle: {"next_token": None, "newest_id": None, "rows_written": 0, "done": False}
+                for handle in params.get("handles", [])
+            },
+        }
+        job = cls(ensure_dir(jobs_dir) / f"{job_id}.json", payload)
+        job.save()
+        return job
+
+    @classmethod
+    def load(cls, jobs_dir: Path, job_id: str) -> "CollectJob":
+        path = jobs_dir / f"{job_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Collect job checkpoint not found: {path}")
+        return cls(path, json.loads(path.read_text(encoding="utf-8")))
+
+    @property
+    def job_id(self) -> str:
+        return self.payload["job_id"]
+
+    @property
+    def params(self) -> dict:
+        return self.payload["params"]
+
+    @property
+    def handle_states(self) -> dict[str, dict]:
+        return self.payload["handles"]
+
+    def record_page(self, *, handle: str, rows_written: int, next_token: str | None, newest_id: str | None, done: bool) -> None:
+        self.record([HandleCheckpoint(handle, rows_written, next_token, newest_id, done)])
+
+    def record(self, checkpoints: Iterable[HandleCheckpoint]) -> None:
+        """Apply the checkpoints of one persisted page and rewrite the file once."""
+        for checkpoint in checkpoints:
+            state = self.handle_states.setdefault(
+                checkpoint.handle, {"next_token": None, "newest_id": None, "rows_written": 0, "done": False}
+            )
+            state["rows_written"] += checkpoint.rows_written
+            state["next_token"] = None if checkpoint.done else checkpoint.next_token
+            state["newest_id"] = state.get("newest_id") or checkpoint.newest_id
+            state["done"] = checkpoint.done
+            if checkpoint.until_id is not None:
+                state["until_id"] = checkpoint.until_id
+        self.save()
+
+    def finish(self, status: str) -> None:
+        self.payload["status"] = status
+        self.save()
+
+    def save(self) -> None:
+        self.payload["updated_at"] = datetime.now(UTC).isoformat()
+        tmp_path = self.path.with_suffix(".json.tmp")
+        write_json(tmp_path, self.payload)
+        tmp_path.replace(self.path)
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import math
+import queue
+import threading
 import time
-from datetime import UTC, datetime
-from typing import Literal
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Literal
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote, urlencode
-from urllib.request import Request, urlopen
+
+from .collect_budget import CollectBudget
+from .collect_cursors import CollectCursorStore, cursor_key
+from .collect_jobs import HandleCheckpoint
+from .http_transport import get_default_transport
+from .post_filters import compile_post_filters
+from .storage import ensure_dir, read_jsonl, write_jsonl
+from .x_rate_limit import BearerTokenPool, endpoint_family
+from .x_replay import CassetteRecorder
+from .x_user_cache import XUserCache
 
 X_API_BASE_URL = "https://api.x.com/2"
 LOGGER = logging.getLogger("collector_x")
+_CASSETTE_RECORDER: CassetteRecorder | None = None
 
 CollectBackend = Literal[
     "placeholder",
@@ -25,6 +44,14 @@ CollectBackend = Literal[
 ContentMode = Literal["with-images", "only-text", "mixed"]
 
 
+def configure_x_api(*, base_url: str | None = None, recorder: CassetteRecorder | None = None) -> None:
+    """Point collector requests at `base_url` (e.g. a `ReplayServer`); `recorder=None` stops recording."""
+    global X_API_BASE_URL, _CASSETTE_RECORDER
+    if base_url:
+        X_API_BASE_URL = base_url.rstrip("/")
+    _CASSETTE_RECORDER = recorder
+
+
 def _normalize_backend(backend: str) -> str:
     aliases = {
         "x-api-recent-search": "recent",
@@ -34,25 +61,6 @@ def _normalize_backend(backend: str) -> str:
     return aliases.get(backend, backend)
 
 
-def _matches_filters(
-    post: dict,
-    *,
-    tag_filters: list[str] | None,
-    text_filters: list[str] | None,
-    match_mode: Literal["any", "all"],
-) -> bool:
-    tag_filters = [x.lower() for x in (tag_filters or [])]
-    text_filters = [x.lower() for x in (text_filters or [])]
-    if not tag_filters and not text_filters:
-        return True
-
-    haystack = f"{post.get('text', '')} {' '.join(post.get('hashtags', []))}".lower()
-    checks: list[bool] = []
-    checks.extend(tag in haystack for tag in tag_filters)
-    checks.extend(term in haystack for term in text_filters)
-    return all(checks) if match_mode == "all" else any(checks)
-
-
 def _matches_content_mode(post: dict, content_mode: ContentMode) -> bool:
     has_images = bool(post.get("images"))
     if content_mode == "mixed":
@@ -70,15 +78,14 @@ def _quote_phrase(value: str) -> str:
     return '"' + value.strip().replace('"', '\\"') + '"'
 
 
-def build_x_search_query(
+def _search_query_filters(
     *,
-    handle: str,
     tag_filters: list[str] | None,
     text_filters: list[str] | None,
     match_mode: Literal["any", "all"],
     content_mode: ContentMode,
-) -> str:
-    parts = [f"from:{handle}"]
+) -> list[str]:
+    parts: list[str] = []
     if content_mode == "with-images":
         parts.append("has:images")
     elif content_mode == "only-text":
@@ -101,35 +108,119 @@ def build_x_search_query(
             parts.extend(filter_terms)
         else:
             parts.append("(" + " OR ".join(filter_terms) + ")")
+    return parts
 
-    return " ".join(parts)
 
+def build_x_search_query(
+    *,
+    handle: str,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+) -> str:
+    return build_x_batch_search_query(
+        handles=[handle],
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
 
-def _http_get_json(url: str, *, bearer_token: str, timeout_seconds: int = 30) -> dict:
-    max_attempts = 4
-    req = Request(
-        url,
-        headers={
-            "Authorization": f"Bearer {bearer_token}",
-            "Accept": "application/json",
-            "User-Agent": "x-legal-stuff-webscrapper/0.1.0",
-        },
-        method="GET",
+
+def build_x_batch_search_query(
+    *,
+    handles: list[str],
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+) -> str:
+    """Search query for several accounts at once: `(from:a OR from:b) <filters>`."""
+    if not handles:
+        raise ValueError("build_x_batch_search_query requires at least one handle")
+    sources = [f"from:{handle}" for handle in handles]
+    source_part = sources[0] if len(sources) == 1 else "(" + " OR ".join(sources) + ")"
+    filters = _search_query_filters(
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
     )
+    return " ".join([source_part, *filters])
+
+
+def pack_search_handle_batches(
+    handles: list[str],
+    *,
+    max_query_length: int,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+) -> list[list[str]]:
+    """
+    Greedily pack handles (in order) into batches whose OR-query fits `max_query_length`.
+
+    A handle whose single-account query already exceeds the limit still gets a
+    batch of its own; X reports the error for that query.
+    """
+    query_kwargs = {
+        "tag_filters": tag_filters,
+        "text_filters": text_filters,
+        "match_mode": match_mode,
+        "content_mode": content_mode,
+    }
+    batches: list[list[str]] = []
+    current: list[str] = []
+    for handle in handles:
+        candidate = [*current, handle]
+        if current and len(build_x_batch_search_query(handles=candidate, **query_kwargs)) > max_query_length:
+            batches.append(current)
+            candidate = [handle]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _http_get_json(
+    url: str,
+    *,
+    token_pool: BearerTokenPool,
+    timeout_seconds: int = 30,
+) -> dict:
+    max_attempts = 4
+    family = endpoint_family(url)
+    transport = get_default_transport()
     for attempt in range(1, max_attempts + 1):
+        lease = token_pool.acquire(family)
+        scheduler = lease.scheduler
+        request_headers = {
+            "Authorization": f"Bearer {lease.token}",
+            "Accept": "application/json",
+        }
+        released = False
         try:
-            with urlopen(req, timeout=timeout_seconds) as response:
-                headers = response.headers
-                LOGGER.info(
-                    "X API response %s (limit=%s remaining=%s reset=%s)",
-                    response.status,
-                    headers.get("x-rate-limit-limit"),
-                    headers.get("x-rate-limit-remaining"),
-                    headers.get("x-rate-limit-reset"),
-                )
-                return json.loads(response.read().decode("utf-8"))
+            response = transport.request("GET", url, headers=request_headers, timeout_seconds=timeout_seconds)
+            headers = response.headers
+            scheduler.release(family, headers)
+            released = True
+            LOGGER.info(
+                "X API response %s (limit=%s remaining=%s reset=%s)",
+                response.status,
+                headers.get("x-rate-limit-limit"),
+                headers.get("x-rate-limit-remaining"),
+                headers.get("x-rate-limit-reset"),
+            )
+            payload = json.loads(response.body.decode("utf-8"))
+            if _CASSETTE_RECORDER is not None:
+                _CASSETTE_RECORDER.record(url, status=response.status, headers=headers, body=payload)
+            return payload
         except HTTPError as exc:
             headers = exc.headers or {}
+            scheduler.release(family, headers)
+            released = True
             body = ""
             try:
                 body = exc.read().decode("utf-8", errors="replace")
@@ -137,10 +228,11 @@ def _http_get_json(url: str, *, bearer_token: str, timeout_seconds: int = 30) ->
                 body = ""
 
             LOGGER.warning(
-                "X API HTTPError %s on attempt %s/%s (limit=%s remaining=%s reset=%s) url=%s",
+                "X API HTTPError %s on attempt %s/%s (%s limit=%s remaining=%s reset=%s) url=%s",
                 exc.code,
                 attempt,
                 max_attempts,
+                lease.label,
                 headers.get("x-rate-limit-limit"),
                 headers.get("x-rate-limit-remaining"),
                 headers.get("x-rate-limit-reset"),
@@ -154,19 +246,24 @@ def _http_get_json(url: str, *, bearer_token: str, timeout_seconds: int = 30) ->
                     f"Body preview: {body[:300]}"
                 ) from exc
 
-            reset_value = headers.get("x-rate-limit-reset")
-            sleep_seconds = min(2 ** (attempt - 1), 30)
-            if reset_value and str(reset_value).isdigit():
-                reset_epoch = int(str(reset_value))
-                wait_until_reset = max(0, reset_epoch - int(time.time()))
-                if wait_until_reset > 0:
-                    sleep_seconds = min(wait_until_reset + 1, 60)
-            time.sleep(sleep_seconds)
+            if exc.code == 429:
+                # Park this token's endpoint family until reset; the retry rotates to
+                # another token, or waits for the reset when every token is exhausted.
+                retry_after = float(min(2 ** (attempt - 1), 30))
+                reset_value = headers.get("x-rate-limit-reset")
+                if reset_value and str(reset_value).isdigit():
+                    retry_after = max(0.0, int(str(reset_value)) - time.time())
+                token_pool.record_rate_limited(lease, family, retry_after_seconds=retry_after)
+                continue
+            time.sleep(min(2 ** (attempt - 1), 30))
         except URLError as exc:
             LOGGER.warning("X API URLError on attempt %s/%s: %s", attempt, max_attempts, exc)
             if attempt == max_attempts:
                 raise RuntimeError(f"X API network request failed: {exc}") from exc
             time.sleep(min(2 ** (attempt - 1), 15))
+        finally:
+            if not released:
+                scheduler.release(family)
 
     raise RuntimeError("Unreachable X API request state")
 
@@ -180,9 +277,31 @@ def _extract_hashtags(tweet: dict) -> list[str]:
     return out
 
 
-def _extract_images(tweet: dict, includes: dict) -> list[dict]:
-    media_keys = ((tweet.get("attachments") or {}).get("media_keys") or [])
+def _index_page_includes(includes: dict) -> tuple[dict[str, dict], dict[str, dict]]:
+    """Build the media and user lookups for one API page (once, not per tweet)."""
     media_by_key = {m.get("media_key"): m for m in includes.get("media", [])}
+    users_by_id = {u.get("id"): u for u in includes.get("users", [])}
+    return media_by_key, users_by_id
+
+
+def _build_filter_context(
+    *,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+) -> dict:
+    # Built once per fetch and shared by every row it produces; treat as read-only.
+    return {
+        "tag_filters": list(tag_filters or []),
+        "text_filters": list(text_filters or []),
+        "match_mode": match_mode,
+        "content_mode": content_mode,
+    }
+
+
+def _extract_images(tweet: dict, media_by_key: dict[str, dict]) -> list[dict]:
+    media_keys = ((tweet.get("attachments") or {}).get("media_keys") or [])
     images: list[dict] = []
     for key in media_keys:
         media = media_by_key.get(key)
@@ -208,15 +327,12 @@ def _extract_images(tweet: dict, includes: dict) -> list[dict]:
 def _build_post_row(
     *,
     tweet: dict,
-    includes: dict,
+    media_by_key: dict[str, dict],
     author_handle: str,
     author_name: str | None,
     source_backend: str,
     scraped_at: str,
-    tag_filters: list[str] | None,
-    text_filters: list[str] | None,
-    match_mode: Literal["any", "all"],
-    content_mode: ContentMode,
+    filter_context: dict,
     x_query: str | None = None,
 ) -> dict:
     row = {
@@ -231,19 +347,187 @@ def _build_post_row(
         "lang": tweet.get("lang"),
         "public_metrics": tweet.get("public_metrics", {}),
         "source_backend": source_backend,
-        "filter_context": {
-            "tag_filters": tag_filters or [],
-            "text_filters": text_filters or [],
-            "match_mode": match_mode,
-            "content_mode": content_mode,
-        },
-        "images": _extract_images(tweet, includes),
+        "filter_context": filter_context,
+        "images": _extract_images(tweet, media_by_key),
     }
     if x_query is not None:
         row["x_query"] = x_query
     return row
 
 
+FieldProfile = Literal["full", "lean"]
+
+
+def _tweet_has_media(tweet: dict) -> bool:
+    return bool((tweet.get("attachments") or {}).get("media_keys"))
+
+
+def _request_fields(*, content_mode: ContentMode, field_profile: FieldProfile, include_author: bool) -> dict[str, str]:
+    """
+    Project X API fields/expansions onto what the collected rows need.
+
+    `only-text` runs never keep media, so the media expansion is dropped; the
+    `attachments` tweet field stays so media posts can still be recognised
+    (and skipped) from their `media_keys`. The `lean` profile also drops
+    fields nothing downstream reads (`public_metrics`, `lang`, media size and
+    alt text); rows keep the same keys with empty values.
+    """
+    tweet_fields = ["id", "text", "created_at", "entities", "attachments"]
+    if include_author:
+        tweet_fields.append("author_id")
+    media_fields = ["media_key", "type", "url", "preview_image_url"]
+    if field_profile == "full":
+        tweet_fields += ["lang", "public_metrics"]
+        media_fields += ["width", "height", "alt_text"]
+    expansions = [] if content_mode == "only-text" else ["attachments.media_keys"]
+    if include_author:
+        expansions.append("author_id")
+
+    fields = {"tweet.fields": ",".join(tweet_fields)}
+    if expansions:
+        fields["expansions"] = ",".join(expansions)
+    if content_mode != "only-text":
+        fields["media.fields"] = ",".join(media_fields)
+    if include_author:
+        fields["user.fields"] = "id,username,name"
+    return fields
+
+
+@dataclass(slots=True)
+class _PageSizer:
+    """
+    Pick `max_results` from the remaining row budget and the observed hit rate.
+
+    The hit rate is rows kept / posts returned so far (local filters, content
+    mode, limits); a sparse filter asks for bigger pages instead of paging in
+    tens, while a nearly satisfied limit asks for a small final page.
+    """
+
+    min_size: int = 10
+    max_size: int = 100
+    returned: int = 0
+    kept: int = 0
+
+    def observe(self, *, returned: int, kept: int) -> None:
+        self.returned += returned
+        self.kept += kept
+
+    def hit_rate(self) -> float:
+        return self.kept / self.returned if self.returned else 1.0
+
+    def size(self, remaining: int) -> int:
+        wanted = math.ceil(remaining / max(self.hit_rate(), 0.05))
+        return min(max(wanted, self.min_size), self.max_size)
+
+
+class _PagePipeline:
+    """
+    Issue page requests for one pagination walk, optionally one page ahead.
+
+    `fetch_page(max_results, next_token)` performs the request. With
+    `prefetch`, `prefetch()` starts the next request on a background thread
+    as soon as the current page's `next_token` is known, so it is in flight
+    while the current page is parsed, filtered and persisted; `fetch()` then
+    returns its result. Budget reservations happen on the calling thread
+    before a request is issued.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int, str | None], dict],
+        *,
+        page_sizer: _PageSizer,
+        budget: CollectBudget | None,
+        budget_key: str,
+        prefetch: bool,
+    ) -> None:
+        self._fetch_page = fetch_page
+        self._page_sizer = page_sizer
+        self._budget = budget
+        self._budget_key = budget_key
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") if prefetch else None
+        self._pending: Future | None = None
+        self._pending_reserved = 0
+        self.prefetched = 0
+
+    def _reserve(self, remaining: int) -> int:
+        max_results = self._page_sizer.size(remaining)
+        if self._budget is None:
+            return max_results
+        return self._budget.reserve(self._budget_key, wanted_posts=max_results, min_posts=self._page_sizer.min_size)
+
+    def _request(self, max_results: int, next_token: str | None) -> dict:
+        payload = self._fetch_page(max_results, next_token)
+        if self._budget is not None:
+            self._budget.settle(
+                self._budget_key, reserved_posts=max_results, posts_read=len(payload.get("data", []))
+            )
+        return payload
+
+    def fetch(self, remaining: int, next_token: str | None) -> dict | None:
+        """Return the next page (prefetched if available); None when the budget cuts the walk."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            return pending.result()
+        max_results = self._reserve(remaining)
+        if not max_results:
+            return None
+        return self._request(max_results, next_token)
+
+    def prefetch(self, *, remaining: int, page_returned: int, next_token: str | None) -> None:
+        """
+        Start fetching the page after the current one while it is processed.
+
+        Skipped when the current page alone could satisfy `remaining`, so a
+        walk about to finish never reads (or pays for) an unneeded page.
+        """
+        if self._executor is None or not next_token or not page_returned or page_returned >= remaining:
+            return
+        expected_remaining = remaining - math.floor(page_returned * self._page_sizer.hit_rate())
+        max_results = self._reserve(max(expected_remaining, 1))
+        if not max_results:
+            return
+        self._pending = self._executor.submit(self._request, max_results, next_token)
+        self._pending_reserved = max_results
+        self.prefetched += 1
+
+    def close(self) -> None:
+        # A prefetch that never started hands its reservation back to the budget.
+        if self._pending is not None and self._pending.cancel() and self._budget is not None:
+            self._budget.unreserve(self._budget_key, reserved_posts=self._pending_reserved)
+        self._pending = None
+        if self._executor is not None:
+            # A request already in flight must settle before the caller releases its budget share,
+            # or the refund lands on a released consumer and never reaches the shared pool.
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+@dataclass(slots=True)
+class CollectPage:
+    """
+    Rows produced by one X API page for one account.
+
+    `next_token` points at the following page and `done` marks the last page
+    for the account, which is what a collect job checkpoint needs to resume.
+    A batched search page holds the rows of every account in the batch:
+    `handle` names the batch (its first account) and `handle_checkpoints`
+    carries the progress of each account.
+    """
+
+    handle: str
+    rows: list[dict]
+    next_token: str | None = None
+    newest_id: str | None = None
+    done: bool = False
+    handle_checkpoints: list[HandleCheckpoint] | None = None
+
+    def checkpoints(self) -> list[HandleCheckpoint]:
+        """Per-handle progress to record in the collect job once the rows are persisted."""
+        if self.handle_checkpoints is not None:
+            return self.handle_checkpoints
+        return [HandleCheckpoint(self.handle, len(self.rows), self.next_token, self.newest_id, self.done)]
+
+
 def _search_endpoint_path(search_backend: str) -> str:
     if search_backend == "recent":
         return "/tweets/search/recent"
@@ -252,17 +536,25 @@ def _search_endpoint_path(search_backend: str) -> str:
     raise ValueError(f"Unsupported search backend: {search_backend}")
 
 
-def _fetch_x_search_posts_for_handle(
+def _iter_x_search_pages_for_handle(
     *,
     search_backend: Literal["recent", "all"],
     handle: str,
     limit_per_account: int,
-    bearer_token: str,
+    token_pool: BearerTokenPool,
     tag_filters: list[str] | None,
     text_filters: list[str] | None,
     match_mode: Literal["any", "all"],
     content_mode: ContentMode,
-) -> list[dict]:
+    cursor_store: CollectCursorStore | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    start_token: str | None = None,
+    start_newest_id: str | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+    prefetch: bool = False,
+) -> Iterator[CollectPage]:
     query = build_x_search_query(
         handle=handle,
         tag_filters=tag_filters,
@@ -270,134 +562,669 @@ def _fetch_x_search_posts_for_handle(
         match_mode=match_mode,
         content_mode=content_mode,
     )
-    rows: list[dict] = []
-    next_token: str | None = None
-    page_size = min(max(limit_per_account, 10), 100)
+    key = cursor_key(handle=handle, backend=search_backend, query=query)
+    # An explicit time window replaces the incremental cursor; X rejects both together.
+    windowed = start_time is not None or end_time is not None
+    since_id = cursor_store.get_since_id(key) if cursor_store and not windowed else None
+    newest_id = start_newest_id
+    collected = 0
+    next_token = start_token
+    page_sizer = _PageSizer()
+    request_fields = _request_fields(content_mode=content_mode, field_profile=field_profile, include_author=True)
     scraped_at = datetime.now(UTC).isoformat()
+    filter_context = _build_filter_context(
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
     endpoint_path = _search_endpoint_path(search_backend)
 
-    while len(rows) < limit_per_account:
+    def fetch_page(max_results: int, page_token: str | None) -> dict:
         params = {
             "query": query,
-            "max_results": str(page_size),
-            "tweet.fields": "id,text,created_at,author_id,entities,attachments,lang,public_metrics",
-            "expansions": "attachments.media_keys,author_id",
-            "media.fields": "media_key,type,url,preview_image_url,width,height,alt_text",
-            "user.fields": "id,username,name",
+            "max_results": str(max_results),
+            **request_fields,
         }
+        if since_id:
+            params["since_id"] = since_id
+        if start_time is not None:
+            params["start_time"] = _x_api_time(start_time)
+        if end_time is not None:
+            params["end_time"] = _x_api_time(end_time)
+        if page_token:
+            params["next_token"] = page_token
+        return _http_get_json(f"{X_API_BASE_URL}{endpoint_path}?{urlencode(params)}", token_pool=token_pool)
+
+    pipeline = _PagePipeline(fetch_page, page_sizer=page_sizer, budget=budget, budget_key=handle, prefetch=prefetch)
+    budget_cut = False
+    try:
+        while collected < limit_per_account:
+            payload = pipeline.fetch(limit_per_account - collected, next_token)
+            if payload is None:
+                budget_cut = True
+                break
+            meta = payload.get("meta") or {}
+            pipeline.prefetch(
+                remaining=limit_per_account - collected,
+                page_returned=len(payload.get("data", [])),
+                next_token=meta.get("next_token"),
+            )
+            media_by_key, users_by_id = _index_page_includes(payload.get("includes", {}))
+
+            rows: list[dict] = []
+            for tweet in payload.get("data", []):
+                if content_mode == "only-text" and _tweet_has_media(tweet):
+                    continue
+                author = users_by_id.get(tweet.get("author_id"), {})
+                row = _build_post_row(
+                    tweet=tweet,
+                    media_by_key=media_by_key,
+                    author_handle=author.get("username") or handle,
+                    author_name=author.get("name"),
+                    source_backend=f"x-api-search-{search_backend}",
+                    scraped_at=scraped_at,
+                    filter_context=filter_context,
+                    x_query=query,
+                )
+                if _matches_content_mode(row, content_mode):
+                    rows.append(row)
+                if collected + len(rows) >= limit_per_account:
+                    break
+
+            page_sizer.observe(returned=len(payload.get("data", [])), kept=len(rows))
+            collected += len(rows)
+            newest_id = newest_id or meta.get("newest_id")
+            next_token = meta.get("next_token")
+            done = not next_token or not payload.get("data") or collected >= limit_per_account
+            yield CollectPage(handle=handle, rows=rows, next_token=next_token, newest_id=newest_id, done=done)
+            if done:
+                break
+    finally:
+        pipeline.close()
+
+    # A budget cut leaves the account unfinished; its cursor moves once a later run completes it.
+    if cursor_store and not windowed and not budget_cut:
+        cursor_store.advance(key, newest_id)
+
+
+def _fetch_x_search_posts_for_handle(**kwargs: Any) -> list[dict]:
+    return [row for page in _iter_x_search_pages_for_handle(**kwargs) for row in page.rows]
+
+
+def _iter_x_search_pages_for_batch(
+    *,
+    search_backend: Literal["recent", "all"],
+    handles: list[str],
+    limits: dict[str, int],
+    token_pool: BearerTokenPool,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+    cursor_store: CollectCursorStore | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+    until_ids: dict[str, str] | None = None,
+    start_newest_ids: dict[str, str] | None = None,
+) -> Iterator[CollectPage]:
+    """
+    Page one OR-query covering several accounts and route rows back by author.
+
+    Rows are assigned to handles through the expanded `author_id` (username).
+    Each API page yields one `CollectPage` with the rows of every account and
+    a checkpoint per account. An account is finished once it reaches its
+    limit or once the page reads below its incremental `since_id`; it is then
+    dropped from the query, and pagination restarts with the re-packed query
+    and `until_id` set below the last page, so the remaining accounts
+    continue where they were without re-reading posts. Pagination tokens
+    belong to the batch query, so checkpoints carry no `next_token`; instead
+    each reports the `until_id` the query has read past for its account. A
+    resumed job re-batches the unfinished handles and passes those back as
+    `until_ids`: the query starts below the newest of them and rows at or
+    above a handle's own `until_id` are dropped, so posts already written are
+    neither re-read for the limit nor counted twice.
+    The batch draws on the `budget` share of its first handle.
+    """
+    query_kwargs = {
+        "tag_filters": tag_filters,
+        "text_filters": text_filters,
+        "match_mode": match_mode,
+        "content_mode": content_mode,
+    }
+    remaining = {handle: limits[handle] for handle in handles if limits.get(handle, 0) > 0}
+    by_username = {handle.lower(): handle for handle in remaining}
+    # Cursors stay keyed by the single-account query, so batching can be toggled between runs.
+    keys = {
+        handle: cursor_key(
+            handle=handle,
+            backend=search_backend,
+            query=build_x_search_query(handle=handle, **query_kwargs),
+        )
+        for handle in remaining
+    }
+    since_ids = {handle: cursor_store.get_since_id(keys[handle]) if cursor_store else None for handle in remaining}
+    newest_ids: dict[str, str] = {
+        handle: newest_id for handle, newest_id in (start_newest_ids or {}).items() if handle in remaining and newest_id
+    }
+    positions = {handle: until_id for handle, until_id in (until_ids or {}).items() if handle in remaining and until_id}
+    scraped_at = datetime.now(UTC).isoformat()
+    filter_context = _build_filter_context(**query_kwargs)
+    endpoint_path = _search_endpoint_path(search_backend)
+
+    page_sizer = _PageSizer()
+    request_fields = _request_fields(content_mode=content_mode, field_profile=field_profile, include_author=True)
+
+    def id_key(post_id: str | None) -> tuple[int, str]:
+        return _post_id_sort_key({"post_id": post_id})
+
+    active = list(remaining)
+    budget_key = active[0] if active else ""
+    budget_cut = False
+    next_token: str | None = None
+    # Resume below the newest stored position; handles further down drop the overlap per row.
+    until_id: str | None = None
+    if active and all(handle in positions for handle in active):
+        until_id = max((positions[handle] for handle in active), key=id_key)
+    while active:
+        query = build_x_batch_search_query(handles=active, **query_kwargs)
+        active_since = [since_ids[handle] for handle in active]
+        # One since_id per query: use the oldest cursor and drop older rows per handle below.
+        batch_since_id = min(active_since, key=id_key) if all(active_since) else None
+        max_results = page_sizer.size(sum(remaining[handle] for handle in active))
+        if budget is not None:
+            max_results = budget.reserve(budget_key, wanted_posts=max_results, min_posts=page_sizer.min_size)
+            if not max_results:
+                budget_cut = True
+                break
+        params = {
+            "query": query,
+            "max_results": str(max_results),
+            **request_fields,
+        }
+        if batch_since_id:
+            params["since_id"] = batch_since_id
+        if until_id:
+            params["until_id"] = until_id
         if next_token:
             params["next_token"] = next_token
 
         url = f"{X_API_BASE_URL}{endpoint_path}?{urlencode(params)}"
-        payload = _http_get_json(url, bearer_token=bearer_token)
-        includes = payload.get("includes", {})
-        users_by_id = {u.get("id"): u for u in includes.get("users", [])}
+        payload = _http_get_json(url, token_pool=token_pool)
+        if budget is not None:
+            budget.settle(budget_key, reserved_posts=max_results, posts_read=len(payload.get("data", [])))
+        media_by_key, users_by_id = _index_page_includes(payload.get("includes", {}))
 
+        rows_by_handle: dict[str, list[dict]] = {handle: [] for handle in active}
         for tweet in payload.get("data", []):
             author = users_by_id.get(tweet.get("author_id"), {})
+            handle = by_username.get(str(author.get("username") or "").lower())
+            if handle not in rows_by_handle:
+                LOGGER.debug("Skipping post %s: author %s is not in the batch", tweet.get("id"), author.get("username"))
+                continue
+            newest_ids.setdefault(handle, tweet.get("id"))
+            since_id = since_ids[handle]
+            if since_id and id_key(tweet.get("id")) <= id_key(since_id):
+                continue
+            if handle in positions and id_key(tweet.get("id")) >= id_key(positions[handle]):
+                continue
+            if len(rows_by_handle[handle]) >= remaining[handle]:
+                continue
+            if content_mode == "only-text" and _tweet_has_media(tweet):
+                continue
             row = _build_post_row(
                 tweet=tweet,
-                includes=includes,
+                media_by_key=media_by_key,
                 author_handle=author.get("username") or handle,
                 author_name=author.get("name"),
                 source_backend=f"x-api-search-{search_backend}",
                 scraped_at=scraped_at,
-                tag_filters=tag_filters,
-                text_filters=text_filters,
-                match_mode=match_mode,
-                content_mode=content_mode,
+                filter_context=filter_context,
                 x_query=query,
             )
             if _matches_content_mode(row, content_mode):
-                rows.append(row)
-            if len(rows) >= limit_per_account:
-                break
+                rows_by_handle[handle].append(row)
 
+        page_sizer.observe(
+            returned=len(payload.get("data", [])),
+            kept=sum(len(rows) for rows in rows_by_handle.values()),
+        )
         meta = payload.get("meta") or {}
         next_token = meta.get("next_token")
-        if not next_token or not payload.get("data"):
+        exhausted = not next_token or not payload.get("data")
+        page_oldest_id = None
+        if payload.get("data"):
+            page_oldest_id = meta.get("oldest_id") or min((tweet.get("id") for tweet in payload["data"]), key=id_key)
+        finished: list[str] = []
+        checkpoints: list[HandleCheckpoint] = []
+        for handle in active:
+            rows = rows_by_handle[handle]
+            remaining[handle] -= len(rows)
+            since_id = since_ids[handle]
+            # Below its since_id the query holds nothing new for the handle; more pages would be discarded reads.
+            caught_up = bool(since_id and page_oldest_id and id_key(page_oldest_id) <= id_key(since_id))
+            done = exhausted or caught_up or remaining[handle] <= 0
+            if done:
+                finished.append(handle)
+            if page_oldest_id:
+                positions[handle] = min(positions.get(handle, page_oldest_id), page_oldest_id, key=id_key)
+            # Handles without rows still checkpoint how far the query has read for them.
+            checkpoints.append(
+                HandleCheckpoint(
+                    handle,
+                    len(rows),
+                    newest_id=newest_ids.get(handle),
+                    done=done,
+                    until_id=positions.get(handle),
+                )
+            )
+        yield CollectPage(
+            handle=budget_key,
+            rows=[row for handle in active for row in rows_by_handle[handle]],
+            done=len(finished) == len(active),
+            handle_checkpoints=checkpoints,
+        )
+        if exhausted:
             break
+        if finished:
+            active = [handle for handle in active if handle not in finished]
+            until_id = page_oldest_id
+            next_token = None
 
-    return rows
+    if budget is not None:
+        budget.release(budget_key)
+    if cursor_store:
+        for handle, newest_id in newest_ids.items():
+            if budget_cut and handle in active:
+                continue
+            cursor_store.advance(keys[handle], newest_id)
 
 
-def _get_x_user_by_username(*, handle: str, bearer_token: str) -> dict:
+def _iter_x_search_batches(
+    handles: list[str],
+    *,
+    search_backend: Literal["recent", "all"],
+    limit_per_account: int,
+    max_query_length: int,
+    concurrency: int,
+    token_pool: BearerTokenPool,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+    cursor_store: CollectCursorStore | None = None,
+    resume_state: dict[str, dict] | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+) -> Iterator[CollectPage]:
+    limits: dict[str, int] = {}
+    until_ids: dict[str, str] = {}
+    start_newest_ids: dict[str, str] = {}
+    for handle in handles:
+        state = (resume_state or {}).get(handle) or {}
+        if state.get("done"):
+            continue
+        limits[handle] = limit_per_account - int(state.get("rows_written") or 0)
+        if state.get("until_id"):
+            until_ids[handle] = state["until_id"]
+        if state.get("newest_id"):
+            start_newest_ids[handle] = state["newest_id"]
+    pending = [handle for handle in handles if limits.get(handle, 0) > 0]
+    batches = pack_search_handle_batches(
+        pending,
+        max_query_length=max_query_length,
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
+    if not batches:
+        return
+    LOGGER.info("Packed %s accounts into %s search queries (max %s chars)", len(pending), len(batches), max_query_length)
+    batches_by_id = {str(idx): batch for idx, batch in enumerate(batches)}
+    if budget is not None:
+        budget.allocate([batch[0] for batch in batches], backend=search_backend)
+
+    def iter_pages_for_batch(*, handle: str) -> Iterator[CollectPage]:
+        # `_iter_pages_for_handles` keys its workers by `handle`; here that is the batch id.
+        return _iter_x_search_pages_for_batch(
+            search_backend=search_backend,
+            handles=batches_by_id[handle],
+            limits=limits,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            cursor_store=cursor_store,
+            field_profile=field_profile,
+            budget=budget,
+            until_ids=until_ids,
+            start_newest_ids=start_newest_ids,
+        )
+
+    yield from _iter_pages_for_handles(list(batches_by_id), iter_pages_for_batch, concurrency=concurrency)
+
+
+def _x_api_time(value: datetime) -> str:
+    return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass(slots=True)
+class BackfillPlan:
+    """Time-window sharding for full-archive (`all`) backfills."""
+
+    start_time: datetime
+    end_time: datetime
+    shard_days: int = 30
+    concurrency: int = 4
+    checkpoint_dir: Path | None = None
+
+
+def _split_time_window(start_time: datetime, end_time: datetime, shard_days: int) -> list[tuple[datetime, datetime]]:
+    """Split [start_time, end_time) into consecutive shards, newest first."""
+    span = timedelta(days=max(1, shard_days))
+    shards: list[tuple[datetime, datetime]] = []
+    shard_end = end_time
+    while shard_end > start_time:
+        shard_start = max(start_time, shard_end - span)
+        shards.append((shard_start, shard_end))
+        shard_end = shard_start
+    return shards
+
+
+def _post_id_sort_key(row: dict) -> tuple[int, str]:
+    post_id = str(row.get("post_id") or "")
+    return (int(post_id) if post_id.isdigit() else -1, post_id)
+
+
+def _backfill_x_search_posts_for_handle(
+    *,
+    handle: str,
+    plan: BackfillPlan,
+    limit_per_account: int,
+    token_pool: BearerTokenPool,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+    content_mode: ContentMode,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+) -> list[dict]:
+    """
+    Backfill one account from `/tweets/search/all` by paginating time shards concurrently.
+
+    Shards run newest first, at most `plan.concurrency` at a time. Once the
+    finished newest shards hold `limit_per_account` unique posts, no further
+    shard is started, and the merged rows (newest first, deduplicated by
+    `post_id`) are trimmed to the limit, as for the other backends. Finished
+    shards are checkpointed as JSONL under `plan.checkpoint_dir` and reused on
+    the next run with the same query and window. Shards of an account cut
+    short by `budget` are not checkpointed.
+    """
+    query = build_x_search_query(
+        handle=handle,
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
+    shards = _split_time_window(plan.start_time, plan.end_time, plan.shard_days)
+    shard_dir: Path | None = None
+    if plan.checkpoint_dir is not None:
+        job_key = f"{query}|{_x_api_time(plan.start_time)}|{_x_api_time(plan.end_time)}|{plan.shard_days}|{limit_per_account}"
+        job_hash = hashlib.sha1(job_key.encode("utf-8")).hexdigest()[:12]
+        shard_dir = ensure_dir(plan.checkpoint_dir / f"{handle.lower()}-{job_hash}")
+
+    def shard_path(shard: tuple[datetime, datetime]) -> Path | None:
+        if shard_dir is None:
+            return None
+        return shard_dir / f"{shard[0].strftime('%Y%m%dT%H%M%S')}_{shard[1].strftime('%Y%m%dT%H%M%S')}.jsonl"
+
+    reused_shards: list[tuple[datetime, datetime]] = []
+
+    def fetch_shard(shard: tuple[datetime, datetime]) -> list[dict]:
+        path = shard_path(shard)
+        if path is not None and path.exists():
+            reused_shards.append(shard)
+            return read_jsonl(path)
+        shard_rows = _fetch_x_search_posts_for_handle(
+            search_backend="all",
+            handle=handle,
+            limit_per_account=limit_per_account,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            start_time=shard[0],
+            end_time=shard[1],
+            field_profile=field_profile,
+            budget=budget,
+        )
+        if path is not None and not (budget is not None and handle in budget.cut):
+            tmp_path = path.with_suffix(".jsonl.tmp")
+            write_jsonl(tmp_path, shard_rows)
+            tmp_path.replace(path)
+        return shard_rows
+
+    workers = max(1, min(plan.concurrency, len(shards)))
+    rows_by_id: dict[str, dict] = {}
+    pending_shards = iter(shards)
+    shards_done = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"backfill-{handle}") as executor:
+        in_flight: deque[Future] = deque()
+
+        def start_next() -> None:
+            shard = next(pending_shards, None)
+            if shard is not None:
+                in_flight.append(executor.submit(fetch_shard, shard))
+
+        for _ in range(workers):
+            start_next()
+        # Results are taken in shard order, so every finished prefix holds the newest posts.
+        while in_flight:
+            for row in in_flight.popleft().result():
+                rows_by_id.setdefault(str(row.get("post_id")), row)
+            shards_done += 1
+            if len(rows_by_id) < limit_per_account:
+                start_next()
+    LOGGER.info(
+        "Backfill %s: %s of %s shards (%s from checkpoint), %s unique posts",
+        handle,
+        shards_done,
+        len(shards),
+        len(reused_shards),
+        len(rows_by_id),
+    )
+    return sorted(rows_by_id.values(), key=_post_id_sort_key, reverse=True)[:limit_per_account]
+
+
+_USERS_BY_BATCH_SIZE = 100
+
+
+def _get_x_user_by_username(
+    *,
+    handle: str,
+    token_pool: BearerTokenPool,
+    user_cache: XUserCache | None = None,
+    budget: CollectBudget | None = None,
+) -> dict | None:
+    """User record for `handle`; None when `budget` has no request left for the lookup."""
+    cached = user_cache.get(handle) if user_cache else None
+    if cached:
+        return cached
+    if budget is not None and not budget.charge_request(handle):
+        return None
     url = (
         f"{X_API_BASE_URL}/users/by/username/{quote(handle)}?"
         + urlencode({"user.fields": "id,name,username"})
     )
-    payload = _http_get_json(url, bearer_token=bearer_token)
+    payload = _http_get_json(url, token_pool=token_pool)
     data = payload.get("data")
     if not data:
         raise ValueError(f"User not found in X API: {handle}")
+    if user_cache:
+        user_cache.put(handle, data)
     return data
 
 
-def _fetch_x_timeline_posts_for_handle(
+def prefetch_x_users(
+    handles: list[str],
+    *,
+    token_pool: BearerTokenPool,
+    user_cache: XUserCache,
+    budget: CollectBudget | None = None,
+) -> int:
+    """
+    Resolve every handle missing from `user_cache` with bulk `/users/by` lookups.
+
+    Up to 100 usernames per request; unknown accounts are left out so the
+    per-handle lookup reports them as before. Each request counts against
+    `budget` (drawn from the share of the batch's first handle) and the
+    prefetch stops once it is refused. Returns the number of requests.
+    """
+    missing = list(dict.fromkeys(user_cache.missing(handles)))
+    requests = 0
+    for offset in range(0, len(missing), _USERS_BY_BATCH_SIZE):
+        batch = missing[offset : offset + _USERS_BY_BATCH_SIZE]
+        if budget is not None and not budget.charge_request(batch[0]):
+            break
+        url = f"{X_API_BASE_URL}/users/by?" + urlencode(
+            {"usernames": ",".join(batch), "user.fields": "id,name,username"}
+        )
+        payload = _http_get_json(url, token_pool=token_pool)
+        requests += 1
+        by_username = {str(user.get("username") or "").lower(): user for user in payload.get("data") or []}
+        for handle in batch:
+            user = by_username.get(handle.lower())
+            if user:
+                user_cache.put(handle, user)
+        for error in payload.get("errors") or []:
+            LOGGER.warning("X user lookup failed for %s: %s", error.get("value"), error.get("detail") or error.get("title"))
+    if missing:
+        LOGGER.info("Resolved %s uncached accounts with %s bulk user lookups", len(missing), requests)
+    return requests
+
+
+def _iter_x_timeline_pages_for_handle(
     *,
     handle: str,
     limit_per_account: int,
-    bearer_token: str,
+    token_pool: BearerTokenPool,
     tag_filters: list[str] | None,
     text_filters: list[str] | None,
     match_mode: Literal["any", "all"],
     content_mode: ContentMode,
-) -> list[dict]:
-    user = _get_x_user_by_username(handle=handle, bearer_token=bearer_token)
+    cursor_store: CollectCursorStore | None = None,
+    user_cache: XUserCache | None = None,
+    start_token: str | None = None,
+    start_newest_id: str | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+    prefetch: bool = False,
+) -> Iterator[CollectPage]:
+    # Timeline filtering is local, so the filter set is part of the cursor identity.
+    key = cursor_key(
+        handle=handle,
+        backend="timeline",
+        query=json.dumps(
+            {
+                "tag_filters": tag_filters or [],
+                "text_filters": text_filters or [],
+                "match_mode": match_mode,
+                "content_mode": content_mode,
+            },
+            sort_keys=True,
+        ),
+    )
+    since_id = cursor_store.get_since_id(key) if cursor_store else None
+    newest_id = start_newest_id
+    user = _get_x_user_by_username(handle=handle, token_pool=token_pool, user_cache=user_cache, budget=budget)
+    if user is None:
+        # Budget cut before the lookup: the account stays unfinished for a resume.
+        return
     user_id = user["id"]
     author_handle = user.get("username", handle)
     author_name = user.get("name")
-    rows: list[dict] = []
-    next_token: str | None = None
-    page_size = min(max(limit_per_account, 10), 100)
+    collected = 0
+    next_token = start_token
+    page_sizer = _PageSizer()
+    request_fields = _request_fields(content_mode=content_mode, field_profile=field_profile, include_author=False)
     scraped_at = datetime.now(UTC).isoformat()
+    filter_context = _build_filter_context(
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
+    post_filters = compile_post_filters(tag_filters=tag_filters, text_filters=text_filters, match_mode=match_mode)
 
-    while len(rows) < limit_per_account:
+    def fetch_page(max_results: int, page_token: str | None) -> dict:
         params = {
-            "max_results": str(page_size),
-            "tweet.fields": "id,text,created_at,entities,attachments,lang,public_metrics",
-            "expansions": "attachments.media_keys",
-            "media.fields": "media_key,type,url,preview_image_url,width,height,alt_text",
+            "max_results": str(max_results),
+            **request_fields,
         }
-        if next_token:
-            params["pagination_token"] = next_token
+        if since_id:
+            params["since_id"] = since_id
+        if page_token:
+            params["pagination_token"] = page_token
+        return _http_get_json(f"{X_API_BASE_URL}/users/{user_id}/tweets?{urlencode(params)}", token_pool=token_pool)
 
-        url = f"{X_API_BASE_URL}/users/{user_id}/tweets?{urlencode(params)}"
-        payload = _http_get_json(url, bearer_token=bearer_token)
-        includes = payload.get("includes", {})
-        for tweet in payload.get("data", []):
-            row = _build_post_row(
-                tweet=tweet,
-                includes=includes,
-                author_handle=author_handle,
-                author_name=author_name,
-                source_backend="x-api-user-timeline",
-                scraped_at=scraped_at,
-                tag_filters=tag_filters,
-                text_filters=text_filters,
-                match_mode=match_mode,
-                content_mode=content_mode,
-                x_query=None,
+    pipeline = _PagePipeline(fetch_page, page_sizer=page_sizer, budget=budget, budget_key=handle, prefetch=prefetch)
+    budget_cut = False
+    try:
+        while collected < limit_per_account:
+            payload = pipeline.fetch(limit_per_account - collected, next_token)
+            if payload is None:
+                budget_cut = True
+                break
+            meta = payload.get("meta") or {}
+            pipeline.prefetch(
+                remaining=limit_per_account - collected,
+                page_returned=len(payload.get("data", [])),
+                next_token=meta.get("next_token"),
             )
-            if not _matches_content_mode(row, content_mode):
-                continue
-            if not _matches_filters(
-                row,
-                tag_filters=tag_filters,
-                text_filters=text_filters,
-                match_mode=match_mode,
-            ):
-                continue
-            rows.append(row)
-            if len(rows) >= limit_per_account:
+            media_by_key, _ = _index_page_includes(payload.get("includes", {}))
+            rows: list[dict] = []
+            for tweet in payload.get("data", []):
+                if content_mode == "only-text" and _tweet_has_media(tweet):
+                    continue
+                row = _build_post_row(
+                    tweet=tweet,
+                    media_by_key=media_by_key,
+                    author_handle=author_handle,
+                    author_name=author_name,
+                    source_backend="x-api-user-timeline",
+                    scraped_at=scraped_at,
+                    filter_context=filter_context,
+                    x_query=None,
+                )
+                if not _matches_content_mode(row, content_mode):
+                    continue
+                if not post_filters.matches(row):
+                    continue
+                rows.append(row)
+                if collected + len(rows) >= limit_per_account:
+                    break
+
+            page_sizer.observe(returned=len(payload.get("data", [])), kept=len(rows))
+            collected += len(rows)
+            newest_id = newest_id or meta.get("newest_id")
+            next_token = meta.get("next_token")
+            done = not next_token or not payload.get("data") or collected >= limit_per_account
+            yield CollectPage(handle=handle, rows=rows, next_token=next_token, newest_id=newest_id, done=done)
+            if done:
                 break
+    finally:
+        pipeline.close()
 
-        meta = payload.get("meta") or {}
-        next_token = meta.get("next_token")
-        if not next_token or not payload.get("data"):
-            break
+    if cursor_store and not budget_cut:
+        cursor_store.advance(key, newest_id)
 
-    return rows
+
+def _fetch_x_timeline_posts_for_handle(**kwargs: Any) -> list[dict]:
+    return [row for page in _iter_x_timeline_pages_for_handle(**kwargs) for row in page.rows]
 
 
 def _collect_placeholder_posts(
@@ -410,6 +1237,13 @@ def _collect_placeholder_posts(
     content_mode: ContentMode,
 ) -> list[dict]:
     now = datetime.now(UTC).isoformat()
+    filter_context = _build_filter_context(
+        tag_filters=tag_filters,
+        text_filters=text_filters,
+        match_mode=match_mode,
+        content_mode=content_mode,
+    )
+    post_filters = compile_post_filters(tag_filters=tag_filters, text_filters=text_filters, match_mode=match_mode)
     rows: list[dict] = []
     for handle in handles:
         for idx in range(limit_per_account):
@@ -440,85 +1274,324 @@ def _collect_placeholder_posts(
                 "text": text,
                 "hashtags": hashtags,
                 "source_backend": "placeholder",
-                "filter_context": {
-                    "tag_filters": tag_filters or [],
-                    "text_filters": text_filters or [],
-                    "match_mode": match_mode,
-                    "content_mode": content_mode,
-                },
+                "filter_context": filter_context,
                 "images": images,
             }
             if not _matches_content_mode(row, content_mode):
                 continue
-            if not _matches_filters(
-                row,
-                tag_filters=tag_filters,
-                text_filters=text_filters,
-                match_mode=match_mode,
-            ):
+            if not post_filters.matches(row):
                 continue
             rows.append(row)
     return rows
 
 
-def collect_public_posts(
+def _iter_backfill_pages_for_handle(*, handle: str, **kwargs: Any) -> Iterator[CollectPage]:
+    # Resume granularity is the shard checkpoint, not a pagination token.
+    kwargs.pop("start_token", None)
+    kwargs.pop("start_newest_id", None)
+    rows = _backfill_x_search_posts_for_handle(handle=handle, **kwargs)
+    budget = kwargs.get("budget")
+    yield CollectPage(handle=handle, rows=rows, done=budget is None or handle not in budget.cut)
+
+
+def _iter_placeholder_pages_for_handle(*, handle: str, **kwargs: Any) -> Iterator[CollectPage]:
+    kwargs.pop("start_token", None)
+    kwargs.pop("start_newest_id", None)
+    yield CollectPage(handle=handle, rows=_collect_placeholder_posts(handles=[handle], **kwargs), done=True)
+
+
+_PAGE_DONE = object()
+
+
+def _iter_pages_for_handles(
+    handles: list[str],
+    iter_pages_for_handle: Callable[..., Iterable[CollectPage]],
+    *,
+    concurrency: int,
+    max_buffered_pages: int = 4,
+) -> Iterator[CollectPage]:
+    """
+    Yield pages for all handles in handle order.
+
+    With `concurrency > 1` each handle is paged on a worker thread into its own
+    bounded queue, so later accounts fetch ahead while earlier ones are being
+    consumed, but never more than `max_buffered_pages` pages per account.
+    """
+    workers = max(1, min(concurrency, len(handles)))
+    if workers == 1:
+        for handle in handles:
+            yield from iter_pages_for_handle(handle=handle)
+        return
+
+    stop = threading.Event()
+    page_queues = [queue.Queue(maxsize=max(1, max_buffered_pages)) for _ in handles]
+
+    def put(page_queue: queue.Queue, item: object) -> bool:
+        while not stop.is_set():
+            try:
+                page_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(handle: str, page_queue: queue.Queue) -> None:
+        try:
+            for page in iter_pages_for_handle(handle=handle):
+                if not put(page_queue, page):
+                    return
+        except BaseException as exc:  # re-raised in the consuming thread
+            put(page_queue, exc)
+            return
+        put(page_queue, _PAGE_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collect")
+    try:
+        for handle, page_queue in zip(handles, page_queues):
+            executor.submit(produce, handle, page_queue)
+        for page_queue in page_queues:
+            while True:
+                item = page_queue.get()
+                if item is _PAGE_DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_public_posts(
     handles: list[str],
     limit_per_account: int = 5,
     *,
     backend: CollectBackend = "auto",
     x_api_bearer_token: str | None = None,
+    x_api_bearer_tokens: list[str] | None = None,
+    token_pool: BearerTokenPool | None = None,
     tag_filters: list[str] | None = None,
     text_filters: list[str] | None = None,
     match_mode: Literal["any", "all"] = "any",
     content_mode: ContentMode = "mixed",
-) -> list[dict]:
-    """Collect posts using X API backends (`recent`, `timeline`, `all`) or placeholder."""
+    concurrency: int = 1,
+    cursor_store: CollectCursorStore | None = None,
+    backfill: BackfillPlan | None = None,
+    resume_state: dict[str, dict] | None = None,
+    batch_search: bool = False,
+    max_query_length: int = 512,
+    user_cache: XUserCache | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+    prefetch: bool = False,
+) -> Iterator[CollectPage]:
+    """
+    Stream collected posts as one `CollectPage` per X API page.
+
+    Pages arrive in the order of `handles`; `concurrency` bounds how many
+    accounts are fetched in parallel. Requests are spread over `token_pool`
+    (built from `x_api_bearer_token` / `x_api_bearer_tokens` when not given).
+    Page sizes adapt to the remaining limit and the observed filter hit rate;
+    `field_profile="lean"` requests only the fields the pipeline reads (see
+    `_request_fields`).
+
+    With a `cursor_store`, X API fetches only request posts newer than the
+    stored `since_id` and advance the cursor in memory once an account is
+    exhausted; the caller saves it after persisting the rows. A `backfill`
+    plan switches the `all` backend to time-sharded pagination (see
+    `_backfill_x_search_posts_for_handle`) and yields one merged page per
+    account. `batch_search` packs accounts into `(from:a OR from:b ...)`
+    queries of at most `max_query_length` characters for the `recent`/`all`
+    backends (see `_iter_x_search_pages_for_batch`); `concurrency` then bounds
+    parallel batches instead of accounts. The `timeline` backend resolves
+    user ids through `user_cache`, filling misses with bulk `/users/by`
+    lookups before pagination starts.
+
+    `resume_state` (per-handle state from a `CollectJob`) skips finished
+    handles. Per-account walks continue from the stored pagination token with
+    the remaining row limit, batched searches continue below the stored
+    `until_id`, and an unfinished backfill reruns with its full limit,
+    fetching only shards without a checkpoint. A `budget` caps page requests
+    and posts read, split fairly across the accounts still to collect; an
+    account cut short by it is left unfinished for `resume_state`. With
+    `prefetch`, per-account search and timeline walks request the next page
+    while the current one is processed (see `_PagePipeline`); batched search
+    and backfill shards page without it.
+    """
+    bearer_tokens = [token for token in [x_api_bearer_token, *(x_api_bearer_tokens or [])] if token]
+    has_credentials = token_pool is not None or bool(bearer_tokens)
     selected_backend = _normalize_backend(backend)
     if selected_backend == "auto":
-        selected_backend = "timeline" if x_api_bearer_token else "placeholder"
+        selected_backend = "timeline" if has_credentials else "placeholder"
 
     if selected_backend in {"recent", "all", "timeline"}:
-        if not x_api_bearer_token:
+        if not has_credentials:
             raise ValueError(f"X_API_BEARER_TOKEN is required for backend '{selected_backend}'")
+        token_pool = token_pool or BearerTokenPool(bearer_tokens)
 
-    if selected_backend in {"recent", "all"}:
-        rows: list[dict] = []
-        for handle in handles:
-            rows.extend(
-                _fetch_x_search_posts_for_handle(
-                    search_backend=selected_backend,
-                    handle=handle,
-                    limit_per_account=limit_per_account,
-                    bearer_token=x_api_bearer_token or "",
-                    tag_filters=tag_filters,
-                    text_filters=text_filters,
-                    match_mode=match_mode,
-                    content_mode=content_mode,
-                )
-            )
-        return rows
+    if batch_search and backfill is None and selected_backend in {"recent", "all"}:
+        yield from _iter_x_search_batches(
+            handles,
+            search_backend=selected_backend,
+            limit_per_account=limit_per_account,
+            max_query_length=max_query_length,
+            concurrency=concurrency,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            cursor_store=cursor_store,
+            resume_state=resume_state,
+            field_profile=field_profile,
+            budget=budget,
+        )
+        return
 
-    if selected_backend == "timeline":
-        rows = []
-        for handle in handles:
-            rows.extend(
-                _fetch_x_timeline_posts_for_handle(
-                    handle=handle,
-                    limit_per_account=limit_per_account,
-                    bearer_token=x_api_bearer_token or "",
-                    tag_filters=tag_filters,
-                    text_filters=text_filters,
-                    match_mode=match_mode,
-                    content_mode=content_mode,
-                )
+    if budget is not None:
+        pending = [handle for handle in handles if not ((resume_state or {}).get(handle) or {}).get("done")]
+        budget.allocate(pending, backend=selected_backend)
+
+    if backfill is not None:
+        if selected_backend != "all":
+            raise ValueError("Backfill mode requires the full-archive search backend 'all'")
+        iter_pages_for_handle = partial(
+            _iter_backfill_pages_for_handle,
+            plan=backfill,
+            limit_per_account=limit_per_account,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            field_profile=field_profile,
+            budget=budget,
+        )
+    elif selected_backend in {"recent", "all"}:
+        iter_pages_for_handle = partial(
+            _iter_x_search_pages_for_handle,
+            search_backend=selected_backend,
+            limit_per_account=limit_per_account,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            cursor_store=cursor_store,
+            field_profile=field_profile,
+            budget=budget,
+            prefetch=prefetch,
+        )
+    elif selected_backend == "timeline":
+        if user_cache is not None:
+            prefetch_x_users(handles, token_pool=token_pool, user_cache=user_cache, budget=budget)
+        iter_pages_for_handle = partial(
+            _iter_x_timeline_pages_for_handle,
+            limit_per_account=limit_per_account,
+            token_pool=token_pool,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+            cursor_store=cursor_store,
+            user_cache=user_cache,
+            field_profile=field_profile,
+            budget=budget,
+            prefetch=prefetch,
+        )
+    else:
+        iter_pages_for_handle = partial(
+            _iter_placeholder_pages_for_handle,
+            limit_per_account=limit_per_account,
+            tag_filters=tag_filters,
+            text_filters=text_filters,
+            match_mode=match_mode,
+            content_mode=content_mode,
+        )
+        concurrency = 1
+
+    if budget is not None:
+        walk_handle = iter_pages_for_handle
+
+        def iter_pages_for_handle(*, handle: str, **kwargs: Any) -> Iterator[CollectPage]:
+            try:
+                yield from walk_handle(handle=handle, **kwargs)
+            finally:
+                # Once per account, after all its pages (every backfill shard) have settled.
+                budget.release(handle)
+
+    if resume_state:
+        base_iter_pages = iter_pages_for_handle
+
+        def iter_pages_for_handle(*, handle: str) -> Iterator[CollectPage]:
+            state = resume_state.get(handle) or {}
+            if state.get("done"):
+                return
+            if backfill is not None:
+                # Shards are the resume unit: `rows_written` counts merged rows of every
+                # finished shard, and the original limit keeps their checkpoints valid.
+                yield from base_iter_pages(handle=handle)
+                return
+            remaining = limit_per_account - int(state.get("rows_written") or 0)
+            if remaining <= 0:
+                return
+            yield from base_iter_pages(
+                handle=handle,
+                limit_per_account=remaining,
+                start_token=state.get("next_token"),
+                start_newest_id=state.get("newest_id"),
             )
-        return rows
 
-    return _collect_placeholder_posts(
-        handles=handles,
-        limit_per_account=limit_per_account,
+    yield from _iter_pages_for_handles(handles, iter_pages_for_handle, concurrency=concurrency)
+
+
+def collect_public_posts(
+    handles: list[str],
+    limit_per_account: int = 5,
+    *,
+    backend: CollectBackend = "auto",
+    x_api_bearer_token: str | None = None,
+    x_api_bearer_tokens: list[str] | None = None,
+    token_pool: BearerTokenPool | None = None,
+    tag_filters: list[str] | None = None,
+    text_filters: list[str] | None = None,
+    match_mode: Literal["any", "all"] = "any",
+    content_mode: ContentMode = "mixed",
+    concurrency: int = 1,
+    cursor_store: CollectCursorStore | None = None,
+    backfill: BackfillPlan | None = None,
+    resume_state: dict[str, dict] | None = None,
+    batch_search: bool = False,
+    max_query_length: int = 512,
+    user_cache: XUserCache | None = None,
+    field_profile: FieldProfile = "full",
+    budget: CollectBudget | None = None,
+    prefetch: bool = False,
+) -> list[dict]:
+    """Collect posts using X API backends (`recent`, `timeline`, `all`) or placeholder.
+
+    Materialized form of `iter_public_posts`; see it for the arguments.
+    """
+    pages = iter_public_posts(
+        handles,
+        limit_per_account,
+        backend=backend,
+        x_api_bearer_token=x_api_bearer_token,
+        x_api_bearer_tokens=x_api_bearer_tokens,
+        token_pool=token_pool,
         tag_filters=tag_filters,
         text_filters=text_filters,
         match_mode=match_mode,
         content_mode=content_mode,
+        concurrency=concurrency,
+        cursor_store=cursor_store,
+        backfill=backfill,
+        resume_state=resume_state,
+        batch_search=batch_search,
+        max_query_length=max_query_length,
+        user_cache=user_cache,
+        field_profile=field_profile,
+        budget=budget,
+        prefetch=prefetch,
     )
+    return [row for page in pages for row in page.rows]
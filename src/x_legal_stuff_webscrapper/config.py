@@ -15,12 +15,21 @@ class AppConfig:
     openai_ocr_model: str
     openai_knowledge_model: str
     x_api_bearer_token: str | None
+    x_api_bearer_tokens: list[str]
+    x_api_base_url: str
     x_source_accounts: list[str]
     x_collect_backend: str
     x_filter_tags: list[str]
     x_filter_keywords: list[str]
     data_dir: Path
     log_level: str
+    http_pool_size_per_host: int
+    http_connect_timeout_seconds: float
+    media_requests_per_second_per_host: float
+    media_bytes_per_second_per_host: float
+    media_max_attempts: int
+    media_max_retry_after_seconds: float
+    x_user_cache_ttl_hours: float
 
     @classmethod
     def from_env(cls) -> "AppConfig":
@@ -30,10 +39,19 @@ class AppConfig:
             openai_ocr_model=os.getenv("OPENAI_OCR_MODEL", "gpt-4.1-mini"),
             openai_knowledge_model=os.getenv("OPENAI_KNOWLEDGE_MODEL", "gpt-4.1-mini"),
             x_api_bearer_token=os.getenv("X_API_BEARER_TOKEN"),
+            x_api_bearer_tokens=_split_csv(os.getenv("X_API_BEARER_TOKENS", "")),
+            x_api_base_url=os.getenv("X_API_BASE_URL", "https://api.x.com/2"),
             x_source_accounts=_split_csv(os.getenv("X_SOURCE_ACCOUNTS", "")),
             x_collect_backend=os.getenv("X_COLLECT_BACKEND", "auto"),
             x_filter_tags=_split_csv(os.getenv("X_FILTER_TAGS", "")),
             x_filter_keywords=_split_csv(os.getenv("X_FILTER_KEYWORDS", "")),
             data_dir=data_dir,
             log_level=os.getenv("LOG_LEVEL", "INFO").upper(),
+            http_pool_size_per_host=int(os.getenv("HTTP_POOL_SIZE_PER_HOST", "4")),
+            http_connect_timeout_seconds=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10")),
+            media_requests_per_second_per_host=float(os.getenv("MEDIA_REQUESTS_PER_SECOND_PER_HOST", "0")),
+            media_bytes_per_second_per_host=float(os.getenv("MEDIA_BYTES_PER_SECOND_PER_HOST", "0")),
+            media_max_attempts=int(os.getenv("MEDIA_MAX_ATTEMPTS", "4")),
+            media_max_retry_after_seconds=float(os.getenv("MEDIA_MAX_RETRY_AFTER_SECONDS", "300")),
+            x_user_cache_ttl_hours=float(os.getenv("X_USER_CACHE_TTL_HOURS", "168")),
         )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import http.client
+import io
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import Message
+from typing import Iterator
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+LOGGER = logging.getLogger("http_transport")
+
+USER_AGENT = "x-legal-stuff-webscrapper/0.1.0"
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_MAX_REDIRECTS = 5
+# Raised when a pooled connection was closed by the server between requests.
+# Errors that show a pooled keep-alive connection was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (
+    ConnectionResetError,
+    BrokenPipeError,
+)
+# Only these are resent on a fresh connection; a POST may already have been accepted (and billed).
+_RETRYABLE_METHODS = frozenset({"GET", "HEAD"})
+
+_PoolKey = tuple[str, str, int]
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    status: int
+    headers: Message
+    body: bytes
+    url: str
+
+
+@dataclass(slots=True)
+class HttpStreamResponse:
+    status: int
+    headers: Message
+    url: str
+    chunks: Iterator[bytes]
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP(S) client with a small per-host connection pool.
+
+    Drop-in replacement for the `urlopen` calls in the collector, downloader and
+    OpenAI clients: 4xx/5xx responses raise `HTTPError` and connection failures
+    raise `URLError`, so existing retry handling keeps working. Safe to share
+    between threads; each request checks a connection out of the pool and
+    returns it once the response body has been read. A GET/HEAD whose pooled
+    connection turns out to be closed before any response byte arrives is
+    resent once on a new connection; other methods are never resent.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size_per_host: int = 4,
+        connect_timeout_seconds: float = 10.0,
+        default_timeout_seconds: float = 30.0,
+    ) -> None:
+        self.pool_size_per_host = max(1, pool_size_per_host)
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.default_timeout_seconds = default_timeout_seconds
+        self._lock = threading.Lock()
+        self._idle: dict[_PoolKey, deque[http.client.HTTPConnection]] = {}
+        self._stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "stale_retries": 0,
+        }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle_connections"] = sum(len(pool) for pool in self._idle.values())
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def _new_connection(self, key: _PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy_url = None if proxy_bypass(host) else getproxies().get(scheme)
+        if proxy_url:
+            proxy = urlsplit(proxy_url if "://" in proxy_url else f"http://{proxy_url}")
+            conn_cls = http.client.HTTPSConnection if proxy.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(proxy.hostname or "", proxy.port, timeout=self.connect_timeout_seconds)
+            if scheme == "https":
+                conn.set_tunnel(host, port)
+            return conn
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.connect_timeout_seconds)
+        return http.client.HTTPConnection(host, port, timeout=self.connect_timeout_seconds)
+
+    def _checkout(self, key: _PoolKey) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._idle.get(key)
+            if pool:
+                self._stats["connections_reused"] += 1
+                return pool.pop(), True
+            self._stats["connections_opened"] += 1
+        return self._new_connection(key), False
+
+    def _checkin(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._idle.setdefault(key, deque())
+            if len(pool) < self.pool_size_per_host:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def _open(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout_seconds: float,
+    ) -> tuple[_PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a request and return the pooled connection with its unread response."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"}:
+            raise URLError(f"unsupported URL scheme: {scheme!r}")
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key: _PoolKey = (scheme, host, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+
+        request_headers = {"Host": parts.netloc, "User-Agent": USER_AGENT, **headers}
+        for stale_attempt in range(2):
+            conn, reused = self._checkout(key)
+            retry_stale = reused and stale_attempt == 0 and method.upper() in _RETRYABLE_METHODS
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                conn.sock.settimeout(timeout_seconds)
+                # Plain-HTTP proxies expect the absolute URL as request target.
+                proxied_http = scheme == "http" and conn.host != host
+                conn.request(method, url if proxied_http else target, body=body, headers=request_headers)
+            except _STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                if retry_stale:
+                    self._count("stale_retries")
+                    continue
+                raise URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+            try:
+                return key, conn, conn.getresponse()
+            except http.client.RemoteDisconnected as exc:
+                # Closed before a single response byte arrived: the server dropped the idle connection.
+                conn.close()
+                if retry_stale:
+                    self._count("stale_retries")
+                    continue
+                raise URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+        raise URLError("connection pool exhausted stale retries")
+
+    def _release(self, key: _PoolKey, conn: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        """Return a connection to the pool once its response was read to the end."""
+        if response.will_close or not response.isclosed() or conn.sock is None:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+    def _send_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout_seconds: float,
+    ) -> HttpResponse:
+        key, conn, response = self._open(method, url, headers=headers, body=body, timeout_seconds=timeout_seconds)
+        try:
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            raise URLError(exc) from exc
+        self._release(key, conn, response)
+        return HttpResponse(status=response.status, headers=response.headers, body=payload, url=url)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout_seconds: float | None = None,
+        follow_redirects: bool = True,
+    ) -> HttpResponse:
+        timeout = timeout_seconds if timeout_seconds is not None else self.default_timeout_seconds
+        self._count("requests")
+        response = self._send_once(method, url, headers=dict(headers or {}), body=body, timeout_seconds=timeout)
+        redirects = 0
+        while follow_redirects and response.status in _REDIRECT_STATUSES and method in {"GET", "HEAD"}:
+            location = response.headers.get("Location")
+            if not location or redirects >= _MAX_REDIRECTS:
+                break
+            redirects += 1
+            url = urljoin(url, location)
+            self._count("requests")
+            response = self._send_once(method, url, headers=dict(headers or {}), body=None, timeout_seconds=timeout)
+
+        if response.status >= 400:
+            raise HTTPError(url, response.status, http.client.responses.get(response.status, ""), response.headers, io.BytesIO(response.body))
+        return response
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout_seconds: float | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[HttpStreamResponse]:
+        """
+        Like `request`, but hand out the body as chunks instead of one buffer.
+
+        Redirects are followed and 4xx/5xx raise `HTTPError` before the block
+        runs. The connection goes back to the pool only if the block read the
+        body to the end; otherwise it is closed.
+        """
+        timeout = timeout_seconds if timeout_seconds is not None else self.default_timeout_seconds
+        request_headers = dict(headers or {})
+        redirects = 0
+        while True:
+            self._count("requests")
+            key, conn, response = self._open(method, url, headers=request_headers, body=None, timeout_seconds=timeout)
+            location = response.headers.get("Location")
+            if response.status in _REDIRECT_STATUSES and location and redirects < _MAX_REDIRECTS:
+                self._drain(key, conn, response)
+                redirects += 1
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                payload = self._drain(key, conn, response)
+                raise HTTPError(url, response.status, http.client.responses.get(response.status, ""), response.headers, io.BytesIO(payload))
+            break
+
+        def iter_chunks() -> Iterator[bytes]:
+            try:
+                while chunk := response.read(chunk_size):
+                    yield chunk
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+
+        try:
+            yield HttpStreamResponse(status=response.status, headers=response.headers, url=url, chunks=iter_chunks())
+        finally:
+            self._release(key, conn, response)
+
+    def _drain(self, key: _PoolKey, conn: http.client.HTTPConnection, response: http.client.HTTPResponse) -> bytes:
+        try:
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            raise URLError(exc) from exc
+        self._release(key, conn, response)
+        return payload
+
+
+_DEFAULT_TRANSPORT = HttpTransport()
+
+
+def get_default_transport() -> HttpTransport:
+    return _DEFAULT_TRANSPORT
+
+
+def configure_default_transport(
+    *,
+    pool_size_per_host: int,
+    connect_timeout_seconds: float,
+) -> HttpTransport:
+    """Apply pool settings from `AppConfig` to the process-wide transport."""
+    _DEFAULT_TRANSPORT.pool_size_per_host = max(1, pool_size_per_host)
+    _DEFAULT_TRANSPORT.connect_timeout_seconds = connect_timeout_seconds
+    return _DEFAULT_TRANSPORT
+
+
+def log_transport_stats(logger: logging.Logger, transport: HttpTransport | None = None) -> None:
+    stats = (transport or _DEFAULT_TRANSPORT).stats()
+    if not stats["requests"]:
+        return
+    logger.info(
+        "HTTP transport: requests=%s connections_opened=%s connections_reused=%s (handshakes saved) stale_retries=%s",
+        stats["requests"],
+        stats["connections_opened"],
+        stats["connections_reused"],
+        stats["stale_retries"],
+    )
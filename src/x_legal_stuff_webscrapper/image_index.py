@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterator
+
+from .storage import ensure_dir
+
+LOGGER = logging.getLogger("image_index")
+
+_BOOTSTRAP_BATCH_SIZE = 10_000
+_COLUMNS = ("source_url", "sha256", "file_path", "file_size", "content_type", "etag", "downloaded_at", "last_modified", "dhash")
+# Columns added after the first release of the table.
+_ADDED_COLUMNS = ("last_modified", "dhash")
+
+
+def _iter_downloaded_manifest_rows(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get("download_status") == "downloaded" and row.get("source_url") and row.get("file_path"):
+                yield row
+
+
+class ImageUrlIndex:
+    """
+    Persistent `source_url -> stored blob` map for image downloads, backed by SQLite.
+
+    Lets `download_images_for_posts` reuse a blob stored under `by_sha256/` by
+    an earlier run without any network request. Bootstrapped once from
+    `images_manifest.jsonl`; only successful downloads are indexed, so
+    failed URLs are retried by the next run. Each URL also keeps the `etag` /
+    `last_modified` validators of its last response for conditional
+    re-checks, and the blob's perceptual `dhash`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        ensure_dir(path.parent)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_urls (source_url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, "
+            "file_path TEXT NOT NULL, file_size INTEGER, content_type TEXT, etag TEXT, downloaded_at TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(image_urls)")}
+        for column in _ADDED_COLUMNS:
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE image_urls ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS index_sources (source_path TEXT PRIMARY KEY, bootstrapped_at TEXT)")
+        self._conn.commit()
+
+    def __enter__(self) -> "ImageUrlIndex":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def ensure_bootstrapped(self, manifest_path: Path) -> int:
+        """Index downloaded URLs already recorded in `manifest_path`; runs once per manifest."""
+        with self._lock:
+            source = manifest_path.as_posix()
+            row = self._conn.execute("SELECT 1 FROM index_sources WHERE source_path = ?", (source,)).fetchone()
+            if row:
+                return 0
+            count = 0
+            if manifest_path.exists():
+                batch: list[tuple] = []
+                # Later manifest rows win, like a later download would.
+                for manifest_row in _iter_downloaded_manifest_rows(manifest_path):
+                    batch.append(tuple(manifest_row.get(column) for column in _COLUMNS))
+                    if len(batch) >= _BOOTSTRAP_BATCH_SIZE:
+                        self._conn.executemany("INSERT OR REPLACE INTO image_urls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                        count += len(batch)
+                        batch = []
+                self._conn.executemany("INSERT OR REPLACE INTO image_urls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                count += len(batch)
+            self._conn.execute("INSERT INTO index_sources VALUES (?, ?)", (source, datetime.now(UTC).isoformat()))
+            self._conn.commit()
+        if count:
+            LOGGER.info("Indexed %s downloaded image URLs from %s", count, manifest_path)
+        return count
+
+    def get(self, source_url: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM image_urls WHERE source_url = ?", (source_url,)
+            ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def put(self, source_url: str, entry: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_urls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (source_url, *(entry.get(column) for column in _COLUMNS[1:])),
+            )
+
+    def relocate(self, moved_paths: dict[str, str]) -> int:
+        """Rewrite `file_path` values after blobs moved (`{old: new}`); returns updated rows."""
+        with self._lock:
+            updated = 0
+            for old_path, new_path in moved_paths.items():
+                cursor = self._conn.execute("UPDATE image_urls SET file_path = ? WHERE file_path = ?", (new_path, old_path))
+                updated += cursor.rowcount
+            self._conn.commit()
+        return updated
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM image_urls").fetchone()[0]
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
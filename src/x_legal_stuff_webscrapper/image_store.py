@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .storage import ensure_dir
+
+BLOBS_DIRNAME = "by_sha256"
+
+
+class ImageStore:
+    """
+    Content-addressed image blobs under `data/raw/images/by_sha256/ab/cd/<sha256><ext>`.
+
+    Two levels of fan-out by the leading hex digits keep each directory at
+    a few hundred entries even for millions of images, so `exists()` checks
+    and listings stay fast. Blobs written before sharding sit flat in
+    `by_sha256/`; `locate()` still finds them and `migrate_flat_layout()`
+    moves them into place.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.blobs_dir = root / BLOBS_DIRNAME
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> "ImageStore":
+        return cls(data_dir / "raw" / "images")
+
+    def blob_path(self, sha256: str, ext: str) -> Path:
+        return self.blobs_dir / sha256[:2] / sha256[2:4] / f"{sha256}{ext.lower()}"
+
+    def locate(self, blob_name: str) -> Path | None:
+        """Path of a stored blob by file name (`<sha256><ext>`), sharded or legacy flat."""
+        sha256, ext = os.path.splitext(blob_name)
+        for path in (self.blob_path(sha256, ext), self.blobs_dir / blob_name):
+            if path.is_file():
+                return path
+        return None
+
+    def put_stream(self, chunks: Iterable[bytes], *, ext: str) -> tuple[Path, str, int]:
+        """
+        Write chunks to a temp file under `root` while hashing them, then move it into place.
+
+        The rename is atomic, so concurrent writers of the same content and
+        readers of the store never see a partial blob. Returns
+        `(path, sha256, size)`.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(
+            dir=ensure_dir(self.root), prefix=".download-", suffix=".part", delete=False
+        ) as handle:
+            tmp_path = Path(handle.name)
+            try:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                handle.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        sha256 = digest.hexdigest()
+        target_path = self.blob_path(sha256, ext)
+        if target_path.exists():
+            tmp_path.unlink()
+        else:
+            ensure_dir(target_path.parent)
+            os.replace(tmp_path, target_path)
+        return target_path, sha256, size
+
+    def iter_blobs(self) -> Iterator[Path]:
+        """Every stored blob, sharded or legacy flat (temp and hidden files skipped)."""
+        if not self.blobs_dir.is_dir():
+            return
+        for dirpath, dirnames, filenames in os.walk(self.blobs_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if not name.startswith("."):
+                    yield Path(dirpath) / name
+
+    def prune_empty_shards(self) -> None:
+        """Remove shard directories left empty by deletions."""
+        if not self.blobs_dir.is_dir():
+            return
+        for dirpath, _, _ in sorted(os.walk(self.blobs_dir), key=lambda entry: len(entry[0]), reverse=True):
+            path = Path(dirpath)
+            if path != self.blobs_dir and not any(path.iterdir()):
+                path.rmdir()
+
+    def migrate_flat_layout(self, *, dry_run: bool = False) -> dict[Path, Path]:
+        """Move blobs stored flat in `by_sha256/` into the sharded layout; returns `{old: new}`."""
+        moved: dict[Path, Path] = {}
+        if not self.blobs_dir.is_dir():
+            return moved
+        with os.scandir(self.blobs_dir) as entries:
+            flat_names = [entry.name for entry in entries if entry.is_file() and not entry.name.startswith(".")]
+        for name in flat_names:
+            sha256, ext = os.path.splitext(name)
+            source = self.blobs_dir / name
+            target = self.blob_path(sha256, ext)
+            moved[source] = target
+            if dry_run:
+                continue
+            if target.exists():
+                source.unlink()
+            else:
+                ensure_dir(target.parent)
+                os.replace(source, target)
+        return moved
+
+
+def resolve_image_path(data_dir: Path, file_path: str) -> Path:
+    """
+    Local path of an image's `file_path` (relative to `data_dir`).
+
+    Records written before the store was sharded keep their flat
+    `by_sha256/<blob>` path; those resolve to wherever the blob lives now.
+    """
+    path = data_dir / file_path
+    if path.exists() or path.parent.name != BLOBS_DIRNAME:
+        return path
+    return ImageStore(path.parent.parent).locate(path.name) or path
@@ -5,7 +5,8 @@ import logging
 import uuid
 from datetime import UTC, datetime
 from typing import Any, Literal
-from urllib.request import Request, urlopen
+
+from .http_transport import get_default_transport
 
 LOGGER = logging.getLogger("knowledge_extractor")
 
@@ -180,17 +181,17 @@ def _call_openai_json(*, api_key: str, model: str, system_prompt: str, user_payl
             {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
         ],
     }
-    request = Request(
+    response = get_default_transport().request(
+        "POST",
         "https://api.openai.com/v1/chat/completions",
-        data=json.dumps(body).encode("utf-8"),
+        body=json.dumps(body).encode("utf-8"),
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
-        method="POST",
+        timeout_seconds=timeout_seconds,
     )
-    with urlopen(request, timeout=timeout_seconds) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+    payload = json.loads(response.body.decode("utf-8"))
     choices = payload.get("choices") or []
     if not choices:
         raise RuntimeError("OpenAI returned no choices for knowledge extraction")
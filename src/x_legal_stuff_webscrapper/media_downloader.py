@@ -1,14 +1,27 @@
 from __future__ import annotations
 
-import hashlib
+import logging
 import mimetypes
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping
+from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
 
+from .http_transport import HttpStreamResponse, get_default_transport
+from .image_index import ImageUrlIndex
+from .image_store import ImageStore, resolve_image_path
+from .perceptual_hash import compute_dhash
 from .storage import ensure_dir
 
+LOGGER = logging.getLogger("media_downloader")
+
 
 def _guess_extension(source_url: str, content_type: str | None) -> str:
     if content_type:
@@ -19,102 +32,459 @@ def _guess_extension(source_url: str, content_type: str | None) -> str:
     return suffix if suffix else ".bin"
 
 
-def _download_bytes(source_url: str, timeout_seconds: int = 30) -> tuple[bytes, str | None]:
-    req = Request(
+_ACCEPT_IMAGES = "image/*,*/*;q=0.8"
+
+
+@contextmanager
+def _open_download(
+    source_url: str, timeout_seconds: int = 30, headers: dict[str, str] | None = None
+) -> Iterator[HttpStreamResponse]:
+    """Stream an image response; `headers` carry conditional request validators."""
+    with get_default_transport().stream(
+        "GET",
         source_url,
-        headers={
-            "User-Agent": "x-legal-stuff-webscrapper/0.1.0",
-            "Accept": "image/*,*/*;q=0.8",
-        },
-        method="GET",
-    )
-    with urlopen(req, timeout=timeout_seconds) as response:
-        return response.read(), response.headers.get("Content-Type")
+        headers={"Accept": _ACCEPT_IMAGES, **(headers or {})},
+        timeout_seconds=timeout_seconds,
+    ) as response:
+        yield response
+
+
+def _probe_download(source_url: str, timeout_seconds: int = 30) -> Mapping[str, str]:
+    """HEAD an image URL and return its response headers."""
+    return get_default_transport().request(
+        "HEAD",
+        source_url,
+        headers={"Accept": _ACCEPT_IMAGES},
+        timeout_seconds=timeout_seconds,
+    ).headers
+
+
+def _validators(headers: Mapping[str, str]) -> dict:
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+
+def _store_stream_dedup(
+    root: Path, chunks: Iterable[bytes], source_url: str, content_type: str | None
+) -> tuple[Path, str, int]:
+    """Stream chunks into the content-addressed store under `root`; returns `(path, sha256, size)`."""
+    return ImageStore(root).put_stream(chunks, ext=_guess_extension(source_url, content_type))
 
 
 def _store_blob_dedup(root: Path, blob: bytes, source_url: str, content_type: str | None) -> tuple[Path, str]:
-    sha256 = hashlib.sha256(blob).hexdigest()
-    ext = _guess_extension(source_url, content_type)
-    target_dir = ensure_dir(root / "by_sha256")
-    target_path = target_dir / f"{sha256}{ext.lower()}"
-    if not target_path.exists():
-        target_path.write_bytes(blob)
+    target_path, sha256, _ = _store_stream_dedup(root, [blob], source_url, content_type)
     return target_path, sha256
 
 
+def _cached_download(entry: dict | None, *, data_dir: Path) -> dict | None:
+    """Image metadata for an indexed URL, or None when its blob is gone from disk."""
+    if entry is None:
+        return None
+    local_path = resolve_image_path(data_dir, entry["file_path"])
+    if not local_path.is_file():
+        return None
+    return {
+        "file_path": local_path.relative_to(data_dir).as_posix(),
+        "sha256": entry["sha256"],
+        "file_size": entry["file_size"],
+        "content_type": entry["content_type"],
+        "etag": entry.get("etag"),
+        "last_modified": entry.get("last_modified"),
+        "dhash": entry.get("dhash"),
+        "download_status": "cached",
+        "downloaded_at": entry["downloaded_at"],
+    }
+
+
+class _HostLimiter:
+    """Per-host semaphores so concurrent downloads never open more than `max_per_host` requests to one CDN host."""
+
+    def __init__(self, max_per_host: int) -> None:
+        self.max_per_host = max(1, max_per_host)
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+    def for_url(self, source_url: str) -> threading.BoundedSemaphore:
+        host = (urlparse(source_url).hostname or "").lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return semaphore
+
+
+class _TokenBucket:
+    """
+    Token bucket refilled at `rate` per second up to `capacity`.
+
+    `take()` may drive the balance negative (a chunk larger than the burst);
+    the returned wait covers that debt, so the long-run rate holds.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def take(self, amount: float) -> float:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.rate)
+
+
+@dataclass(slots=True)
+class DownloadLimits:
+    """Per-host download limits; None disables a limit."""
+
+    requests_per_second: float | None = None
+    bytes_per_second: float | None = None
+    max_attempts: int = 4
+    max_retry_after_seconds: float | None = 300.0
+
+
+class DownloadThrottle:
+    """
+    Per-host request/byte rate limits and retry policy for image downloads.
+
+    Every request takes a token from the host's requests/sec bucket and
+    every received chunk takes its size from the bytes/sec bucket; the
+    calling download thread sleeps off any shortfall. A 429 pauses the whole
+    host for `Retry-After` (or the exponential backoff), so parallel
+    downloads to a throttling CDN back off together. Retries follow the
+    collector: up to `max_attempts`, backoff `2**(attempt-1)` seconds capped
+    at 30 (15 for network errors), on 429, 5xx and connection errors.
+    `stats()` reports the time spent waiting.
+    """
+
+    def __init__(
+        self,
+        limits: DownloadLimits | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limits = limits or DownloadLimits()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._request_buckets: dict[str, _TokenBucket] = {}
+        self._byte_buckets: dict[str, _TokenBucket] = {}
+        self._paused_until: dict[str, float] = {}
+        self._stats = {
+            "requests": 0,
+            "bytes": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        }
+
+    def _bucket(self, buckets: dict[str, _TokenBucket], host: str, rate: float) -> _TokenBucket:
+        bucket = buckets.get(host)
+        if bucket is None:
+            # One second of burst, but at least one request / one chunk.
+            bucket = buckets[host] = _TokenBucket(rate, max(1.0, rate), self._clock)
+        return bucket
+
+    def _wait(self, seconds: float, metric: str) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._stats[metric] += seconds
+        self._sleep(seconds)
+
+    def acquire_request(self, host: str) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            wait = self._paused_until.get(host, 0.0) - self._clock()
+            rate = self.limits.requests_per_second
+            if rate:
+                wait = max(wait, self._bucket(self._request_buckets, host, rate).take(1))
+        self._wait(wait, "throttled_seconds")
+
+    def metered(self, host: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass chunks through, sleeping to keep the host under its bytes/sec limit."""
+        for chunk in chunks:
+            with self._lock:
+                self._stats["bytes"] += len(chunk)
+                rate = self.limits.bytes_per_second
+                wait = self._bucket(self._byte_buckets, host, rate).take(len(chunk)) if rate else 0.0
+            self._wait(wait, "throttled_seconds")
+            yield chunk
+
+    def retry_delay(self, host: str, exc: Exception, attempt: int) -> float | None:
+        """Seconds to back off before retrying after `exc`, or None to give up."""
+        if attempt >= self.limits.max_attempts:
+            return None
+        if isinstance(exc, HTTPError):
+            if exc.code == 429:
+                delay = float(min(2 ** (attempt - 1), 30))
+                retry_after = (exc.headers or {}).get("Retry-After")
+                if retry_after and str(retry_after).strip().isdigit():
+                    delay = float(retry_after)
+                max_pause = self.limits.max_retry_after_seconds
+                if max_pause is not None and delay > max_pause:
+                    LOGGER.warning(
+                        "Host %s asked to wait %.0fs (Retry-After), above the %.0fs cap; giving up", host, delay, max_pause
+                    )
+                    with self._lock:
+                        self._stats["rate_limited"] += 1
+                    return None
+                with self._lock:
+                    self._stats["rate_limited"] += 1
+                    self._stats["retries"] += 1
+                    self._paused_until[host] = max(self._paused_until.get(host, 0.0), self._clock() + delay)
+                # The pause is served by the next acquire_request().
+                return 0.0
+            if not 500 <= exc.code < 600:
+                return None
+            delay = float(min(2 ** (attempt - 1), 30))
+        elif isinstance(exc, URLError):
+            delay = float(min(2 ** (attempt - 1), 15))
+        else:
+            return None
+        with self._lock:
+            self._stats["retries"] += 1
+        return delay
+
+    def backoff(self, seconds: float) -> None:
+        self._wait(seconds, "backoff_seconds")
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._stats)
+
+
+def _revalidate(
+    source_url: str, cached: dict, *, timeout_seconds: int, now: str, throttle: DownloadThrottle, host: str
+) -> tuple[dict | None, dict[str, str]]:
+    """
+    Check a stored image against its source without fetching the body.
+
+    With stored validators, returns the conditional headers for the GET (a
+    304 then confirms the blob). Without them, a HEAD probe decides: a
+    `Content-Length` equal to the stored size counts as unchanged and the
+    probe's validators are kept for the next refresh.
+    """
+    if cached.get("etag") or cached.get("last_modified"):
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return None, headers
+    throttle.acquire_request(host)
+    probed = _probe_download(source_url, timeout_seconds=timeout_seconds)
+    if probed.get("Content-Length") is not None and str(probed.get("Content-Length")) == str(cached["file_size"]):
+        return {**cached, **_validators(probed), "download_status": "not_modified", "checked_at": now}, {}
+    return None, {}
+
+
+def _download_attempt(
+    source_url: str,
+    *,
+    images_root: Path,
+    data_dir: Path,
+    timeout_seconds: int,
+    now: str,
+    cached: dict | None,
+    throttle: DownloadThrottle,
+    host: str,
+) -> dict:
+    conditional_headers: dict[str, str] = {}
+    if cached is not None:
+        unchanged, conditional_headers = _revalidate(
+            source_url, cached, timeout_seconds=timeout_seconds, now=now, throttle=throttle, host=host
+        )
+        if unchanged is not None:
+            return unchanged
+    throttle.acquire_request(host)
+    with _open_download(source_url, timeout_seconds=timeout_seconds, headers=conditional_headers) as response:
+        if response.status == 304 and cached is not None:
+            return {**cached, "download_status": "not_modified", "checked_at": now}
+        content_type = response.headers.get("Content-Type")
+        validators = _validators(response.headers)
+        local_path, sha256, file_size = _store_stream_dedup(
+            images_root, throttle.metered(host, response.chunks), source_url, content_type
+        )
+    return {
+        "file_path": local_path.relative_to(data_dir).as_posix(),
+        "sha256": sha256,
+        "file_size": file_size,
+        "content_type": content_type,
+        **validators,
+        "dhash": compute_dhash(local_path),
+        "download_status": "downloaded",
+        "downloaded_at": now,
+    }
+
+
+def _download_one(
+    source_url: str,
+    *,
+    images_root: Path,
+    data_dir: Path,
+    timeout_seconds: int,
+    now: str,
+    cached: dict | None = None,
+    throttle: DownloadThrottle | None = None,
+) -> dict:
+    """
+    Download and store one image; returns the image metadata update (success or error).
+
+    `cached` is the stored metadata of an image being refreshed; the request
+    is then made conditional (see `_revalidate`) and a 304 keeps the blob.
+    Requests go through `throttle` (rate limits, retries on 429/5xx).
+    """
+    throttle = throttle or DownloadThrottle()
+    host = (urlparse(source_url).hostname or "").lower()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return _download_attempt(
+                source_url,
+                images_root=images_root,
+                data_dir=data_dir,
+                timeout_seconds=timeout_seconds,
+                now=now,
+                cached=cached,
+                throttle=throttle,
+                host=host,
+            )
+        except Exception as exc:
+            delay = throttle.retry_delay(host, exc, attempt)
+            if delay is None:
+                return {
+                    "download_status": "error",
+                    "download_error": str(exc),
+                    "downloaded_at": now,
+                }
+            LOGGER.warning(
+                "Image download failed on attempt %s/%s (%s), retrying: %s",
+                attempt,
+                throttle.limits.max_attempts,
+                exc,
+                source_url,
+            )
+            throttle.backoff(delay)
+
+
 def download_images_for_posts(
     posts: list[dict],
     *,
     data_dir: Path,
     timeout_seconds: int = 30,
+    concurrency: int = 1,
+    max_per_host: int = 4,
+    url_index: ImageUrlIndex | None = None,
+    revalidate: bool = False,
+    throttle: DownloadThrottle | None = None,
 ) -> tuple[list[dict], list[dict]]:
     """
     Download images referenced in posts and update image metadata in-place.
 
+    Each distinct `source_url` is fetched once; `concurrency` downloads run in
+    parallel, at most `max_per_host` of them against the same host. Manifest
+    rows keep the serial order: one row per distinct URL, at its first
+    occurrence in `posts`. URLs found in `url_index` whose blob is still on
+    disk are not requested again and get `download_status="cached"`; new
+    downloads are added to it. With `revalidate`, those URLs are re-checked
+    with conditional requests instead (`If-None-Match` / `If-Modified-Since`,
+    or a HEAD probe when no validators are stored): an unchanged image costs
+    headers only and gets `download_status="not_modified"`. A failed
+    re-check keeps the stored blob. Downloaded images also get a perceptual
+    `dhash` (None without Pillow) so `ocr` can reuse results across
+    near-duplicates. `throttle` applies per-host rate limits and retries
+    (see `DownloadThrottle`); share one across calls to keep limits and
+    metrics for a whole run.
+
     Returns:
       (updated_posts, manifest_rows)
     """
     images_root = ensure_dir(data_dir / "raw" / "images")
-    manifest_rows: list[dict] = []
-    processed_urls: dict[str, dict] = {}
     now = datetime.now(UTC).isoformat()
 
+    pending_urls: list[str] = []
+    seen_urls: set[str] = set()
     for post in posts:
         for image in post.get("images", []):
             source_url = image.get("source_url")
             if not source_url:
                 image["download_status"] = "missing_url"
                 continue
+            if source_url not in seen_urls:
+                seen_urls.add(source_url)
+                pending_urls.append(source_url)
 
-            if source_url in processed_urls:
-                cached = processed_urls[source_url]
-                image.update(cached)
-                continue
+    processed_urls: dict[str, dict] = {}
+    stored: dict[str, dict] = {}
+    if url_index is not None:
+        for source_url in pending_urls:
+            cached = _cached_download(url_index.get(source_url), data_dir=data_dir)
+            if cached is not None:
+                stored[source_url] = cached
+        if not revalidate:
+            processed_urls.update(stored)
+            pending_urls = [source_url for source_url in pending_urls if source_url not in stored]
 
-            try:
-                blob, content_type = _download_bytes(source_url, timeout_seconds=timeout_seconds)
-                local_path, sha256 = _store_blob_dedup(images_root, blob, source_url, content_type)
-                relative_path = local_path.relative_to(data_dir).as_posix()
-                update = {
-                    "file_path": relative_path,
-                    "sha256": sha256,
-                    "file_size": len(blob),
-                    "content_type": content_type,
-                    "download_status": "downloaded",
-                    "downloaded_at": now,
-                }
-                image.update(update)
-                processed_urls[source_url] = update
-                manifest_rows.append(
-                    {
-                        "image_id": image.get("image_id"),
-                        "post_id": post.get("post_id"),
-                        "source_url": source_url,
-                        "file_path": relative_path,
-                        "sha256": sha256,
-                        "file_size": len(blob),
-                        "content_type": content_type,
-                        "download_status": "downloaded",
-                        "downloaded_at": now,
-                    }
-                )
-            except Exception as exc:
-                error_info = {
-                    "download_status": "error",
-                    "download_error": str(exc),
-                    "downloaded_at": now,
+    fetch = partial(
+        _download_one,
+        images_root=images_root,
+        data_dir=data_dir,
+        timeout_seconds=timeout_seconds,
+        now=now,
+        throttle=throttle or DownloadThrottle(),
+    )
+
+    def download(source_url: str) -> dict:
+        cached = stored.get(source_url)
+        update = fetch(source_url, cached=cached)
+        if cached is not None and update["download_status"] == "error":
+            return {**cached, "download_error": update["download_error"]}
+        return update
+
+    workers = max(1, min(concurrency, len(pending_urls)))
+    if workers == 1:
+        processed_urls.update((source_url, download(source_url)) for source_url in pending_urls)
+    else:
+        limiter = _HostLimiter(max_per_host)
+
+        def download_limited(source_url: str) -> dict:
+            with limiter.for_url(source_url):
+                return download(source_url)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images") as executor:
+            processed_urls.update(zip(pending_urls, executor.map(download_limited, pending_urls)))
+
+    if url_index is not None:
+        for source_url in pending_urls:
+            if processed_urls[source_url]["download_status"] in {"downloaded", "not_modified"}:
+                url_index.put(source_url, processed_urls[source_url])
+        url_index.commit()
+
+    manifest_rows: list[dict] = []
+    written_urls: set[str] = set()
+    for post in posts:
+        for image in post.get("images", []):
+            source_url = image.get("source_url")
+            if not source_url:
+                continue
+            update = processed_urls[source_url]
+            image.update(update)
+            if source_url in written_urls:
+                continue
+            written_urls.add(source_url)
+            manifest_rows.append(
+                {
+                    "image_id": image.get("image_id"),
+                    "post_id": post.get("post_id"),
+                    "source_url": source_url,
+                    **update,
                 }
-                image.update(error_info)
-                processed_urls[source_url] = error_info
-                manifest_rows.append(
-                    {
-                        "image_id": image.get("image_id"),
-                        "post_id": post.get("post_id"),
-                        "source_url": source_url,
-                        "download_status": "error",
-                        "download_error": str(exc),
-                        "downloaded_at": now,
-                    }
-                )
+            )
 
     return posts, manifest_rows
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .image_store import ImageStore
+
+LOGGER = logging.getLogger("media_maintenance")
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file through a read-only memory map (no copy into Python buffers)."""
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+@dataclass(slots=True)
+class FsckReport:
+    checked: int = 0
+    bytes_checked: int = 0
+    corrupt: list[tuple[Path, str]] = field(default_factory=list)
+    unreadable: list[tuple[Path, str]] = field(default_factory=list)
+    removed: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.corrupt and not self.unreadable
+
+
+def fsck_image_store(store: ImageStore, *, workers: int | None = None, repair: bool = False) -> FsckReport:
+    """
+    Re-hash every blob and compare it with the SHA-256 in its file name.
+
+    Files are hashed on a thread pool sized to the CPU count; hashlib
+    releases the GIL while digesting, so large blobs hash on all cores.
+    With `repair`, corrupt blobs are deleted: the next download of their
+    URL stores a fresh copy instead of trusting the URL index.
+    """
+    report = FsckReport()
+
+    def check(path: Path) -> tuple[Path, str | None, str | None, int]:
+        try:
+            return path, hash_file(path), None, path.stat().st_size
+        except OSError as exc:
+            return path, None, str(exc), 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1), thread_name_prefix="fsck") as executor:
+        for path, actual, error, size in executor.map(check, store.iter_blobs()):
+            report.checked += 1
+            report.bytes_checked += size
+            if error is not None:
+                report.unreadable.append((path, error))
+                LOGGER.error("Cannot read %s: %s", path, error)
+            elif actual != path.stem:
+                report.corrupt.append((path, actual))
+                LOGGER.error("Corrupt blob %s (content sha256=%s)", path, actual)
+    if repair:
+        for path, _ in report.corrupt:
+            path.unlink(missing_ok=True)
+            report.removed += 1
+    return report
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def collect_image_references(*, manifest_paths: Iterable[Path], posts_paths: Iterable[Path]) -> set[str]:
+    """Blob file names (`<sha256><ext>`) referenced by manifest rows or post images."""
+    references: set[str] = set()
+    for path in manifest_paths:
+        for row in _iter_jsonl(path):
+            if row.get("file_path"):
+                references.add(Path(row["file_path"]).name)
+    for path in posts_paths:
+        for post in _iter_jsonl(path):
+            for image in post.get("images") or []:
+                if image.get("file_path"):
+                    references.add(Path(image["file_path"]).name)
+    return references
+
+
+@dataclass(slots=True)
+class GcReport:
+    scanned: int = 0
+    orphaned: list[Path] = field(default_factory=list)
+    bytes_freed: int = 0
+    stale_temp_files: int = 0
+
+
+def gc_image_store(
+    store: ImageStore,
+    references: set[str],
+    *,
+    min_age_seconds: float = 3600.0,
+    dry_run: bool = False,
+) -> GcReport:
+    """
+    Delete blobs whose file name no post or manifest row references.
+
+    Blobs (and leftover `.part` temp files of interrupted downloads) younger
+    than `min_age_seconds` are kept, so a `collect` running at the same time
+    cannot lose a blob it has stored but not yet recorded. References are
+    matched by file name, so legacy flat paths still protect migrated blobs.
+    """
+    report = GcReport()
+    cutoff = time.time() - min_age_seconds
+    for path in store.iter_blobs():
+        report.scanned += 1
+        if path.name in references:
+            continue
+        stat = path.stat()
+        if stat.st_mtime > cutoff:
+            continue
+        report.orphaned.append(path)
+        report.bytes_freed += stat.st_size
+        if not dry_run:
+            path.unlink(missing_ok=True)
+    for path in store.root.glob(".download-*.part") if store.root.is_dir() else []:
+        if path.stat().st_mtime <= cutoff:
+            report.stale_temp_files += 1
+            if not dry_run:
+                path.unlink(missing_ok=True)
+    if not dry_run:
+        store.prune_empty_shards()
+    return report
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Generic, Sequence, TypeVar
+
+LOGGER = logging.getLogger("perceptual_hash")
+
+DHASH_SIZE = 8
+# Hamming distance (of 64 bits) up to which two dHashes count as the same picture.
+DEFAULT_MAX_DISTANCE = 6
+
+T = TypeVar("T")
+
+_pillow_missing_logged = False
+
+
+def dhash_from_pixels(pixels: Sequence[Sequence[int]]) -> str:
+    """
+    64-bit difference hash of a grayscale grid with 8 rows of 9 pixels, as 16 hex digits.
+
+    Each bit says whether a pixel is brighter than its right neighbour, so
+    the hash survives rescaling and recompression of the same image.
+    """
+    value = 0
+    for row in pixels:
+        for left, right in zip(row, row[1:]):
+            value = (value << 1) | (1 if left > right else 0)
+    return f"{value:0{DHASH_SIZE * DHASH_SIZE // 4}x}"
+
+
+def compute_dhash(path: Path) -> str | None:
+    """dHash of an image file; None when Pillow is not installed or the file is not a decodable image."""
+    global _pillow_missing_logged
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _pillow_missing_logged:
+            _pillow_missing_logged = True
+            LOGGER.info("Pillow not installed (pip install '.[images]'); skipping perceptual hashes")
+        return None
+    try:
+        with Image.open(path) as image:
+            small = image.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+            data = list(small.getdata())
+    except Exception as exc:
+        LOGGER.debug("Cannot compute dHash for %s: %s", path, exc)
+        return None
+    width = DHASH_SIZE + 1
+    return dhash_from_pixels([data[offset : offset + width] for offset in range(0, len(data), width)])
+
+
+def hamming_distance(left: str, right: str) -> int:
+    return (int(left, 16) ^ int(right, 16)).bit_count()
+
+
+class BKTree(Generic[T]):
+    """
+    Burkhard-Keller tree over hex hashes under the Hamming metric.
+
+    `search()` visits only children whose edge distance lies within
+    `max_distance` of the query's distance to their parent (triangle
+    inequality), so a lookup touches a small part of a large hash set.
+    """
+
+    def __init__(self) -> None:
+        # Nodes are `(hash, [(insertion seq, item), ...], {edge distance: child})`.
+        self._root: tuple[str, list[tuple[int, T]], dict[int, tuple]] | None = None
+        self.size = 0
+
+    def add(self, hash_value: str, item: T) -> None:
+        entry = (self.size, item)
+        self.size += 1
+        if self._root is None:
+            self._root = (hash_value, [entry], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(hash_value, node[0])
+            if distance == 0:
+                node[1].append(entry)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (hash_value, [entry], {})
+                return
+            node = child
+
+    def search(self, hash_value: str, max_distance: int) -> list[tuple[int, T]]:
+        """Items within `max_distance`, closest first (insertion order among equals)."""
+        found: list[tuple[int, int, T]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_hash, items, children = stack.pop()
+            distance = hamming_distance(hash_value, node_hash)
+            if distance <= max_distance:
+                found.extend((distance, seq, item) for seq, item in items)
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda entry: entry[:2])
+        return [(distance, item) for distance, _, item in found]
+
+
+class NearDuplicateIndex(Generic[T]):
+    """
+    Map images to a canonical earlier image by SHA-256 or perceptual hash.
+
+    An exact `sha256` match wins; otherwise the closest `dhash` within
+    `max_distance` does. Images are registered with `add()` in the order
+    they should become canonical (first seen wins).
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        self._by_sha256: dict[str, T] = {}
+        self._by_dhash: BKTree[T] = BKTree()
+
+    def add(self, item: T, *, sha256: str | None, dhash: str | None) -> None:
+        if sha256:
+            self._by_sha256.setdefault(sha256, item)
+        if dhash:
+            self._by_dhash.add(dhash, item)
+
+    def find(self, *, sha256: str | None, dhash: str | None) -> tuple[int, T] | None:
+        """`(distance, canonical item)` for a new image, or None; distance 0 for an exact match."""
+        if sha256 and sha256 in self._by_sha256:
+            return 0, self._by_sha256[sha256]
+        if dhash:
+            matches = self._by_dhash.search(dhash, self.max_distance)
+            if matches:
+                return matches[0]
+        return None
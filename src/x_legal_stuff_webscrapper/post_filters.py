@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Literal
+
+# Below this many filters, plain `in` scans (C substring search) beat the regex.
+_REGEX_MIN_FILTERS = 64
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a character trie; greedy optional tails make it prefer the longest filter."""
+    end = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if end else body
+
+
+class CompiledPostFilters:
+    """
+    Tag/text filters compiled into one regex that reports every matched filter in one pass.
+
+    Semantics match the original per-filter substring checks: each filter is
+    a case-insensitive substring of `"<text> <hashtags...>"`; `match_mode`
+    `any` needs one filter, `all` needs every filter. The filters form a
+    character trie compiled into a lookahead regex, so each haystack position
+    yields the longest filter starting there in a single scan. Shorter filters
+    contained in a matched one are added from a precomputed substring
+    closure, which keeps the reported set complete. Small filter sets skip
+    the regex and scan the pre-lowercased filters directly.
+    """
+
+    def __init__(self, *, tag_filters: list[str], text_filters: list[str], match_mode: Literal["any", "all"]) -> None:
+        self.match_mode = match_mode
+        self.filters = list(dict.fromkeys(x.lower() for x in [*tag_filters, *text_filters]))
+        self._always = {x for x in self.filters if not x}
+        needles = [x for x in self.filters if x]
+        self._needles = needles
+        self._pattern: re.Pattern[str] | None = None
+        if len(needles) >= _REGEX_MIN_FILTERS:
+            trie: dict = {}
+            for needle in needles:
+                node = trie
+                for char in needle:
+                    node = node.setdefault(char, {})
+                node[""] = None
+            self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))")
+        self._closure = {needle: {other for other in needles if other in needle} for needle in needles}
+
+    @property
+    def empty(self) -> bool:
+        return not self.filters
+
+    def matched_filters(self, haystack: str) -> set[str]:
+        """Filters found in an already lowercased haystack."""
+        found = set(self._always)
+        if self._pattern is None:
+            found.update(needle for needle in self._needles if needle in haystack)
+        else:
+            for longest in {match.group(1) for match in self._pattern.finditer(haystack) if match.group(1)}:
+                found |= self._closure[longest]
+        return found
+
+    def matches(self, post: dict) -> bool:
+        if self.empty:
+            return True
+        haystack = f"{post.get('text', '')} {' '.join(post.get('hashtags', []))}".lower()
+        if self.match_mode == "any":
+            # The first hit decides; no need to collect the full match set.
+            if self._always:
+                return True
+            if self._pattern is None:
+                return any(needle in haystack for needle in self._needles)
+            return self._pattern.search(haystack) is not None
+        return len(self.matched_filters(haystack)) == len(self.filters)
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(
+    tag_filters: tuple[str, ...], text_filters: tuple[str, ...], match_mode: Literal["any", "all"]
+) -> CompiledPostFilters:
+    return CompiledPostFilters(tag_filters=list(tag_filters), text_filters=list(text_filters), match_mode=match_mode)
+
+
+def compile_post_filters(
+    *,
+    tag_filters: list[str] | None,
+    text_filters: list[str] | None,
+    match_mode: Literal["any", "all"],
+) -> CompiledPostFilters:
+    """Compiled matcher for a filter set, built once and shared by every handle of a run."""
+    return _compile_cached(tuple(tag_filters or ()), tuple(text_filters or ()), match_mode)
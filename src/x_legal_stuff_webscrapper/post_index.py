@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .storage import ensure_dir
+
+LOGGER = logging.getLogger("post_index")
+
+_BOOTSTRAP_BATCH_SIZE = 10_000
+# Position of the indexed prefix of each store's JSONL file (added after the first release).
+_SOURCE_COLUMNS = ("indexed_bytes", "source_mtime_ns")
+
+
+def _iter_jsonl_post_ids(path: Path, offset: int) -> Iterator[tuple[str | None, int]]:
+    """`(post_id, end offset)` for each complete line from byte `offset`; a trailing partial line is left for later."""
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        for line in handle:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            line = line.strip()
+            post_id = json.loads(line).get("post_id") if line else None
+            yield (None if post_id is None else str(post_id)), offset
+
+
+def _file_position(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PostIdIndex:
+    """
+    On-disk post_id set per JSONL store (`raw`, `processed`), backed by SQLite.
+
+    Membership checks hit the primary key, so they stay O(1)-ish (B-tree) for
+    millions of posts without loading the JSONL files into memory. Each store
+    follows its JSONL file: `ensure_bootstrapped()` indexes lines appended
+    since the last indexed byte (also by tools other than `collect`), and a
+    file that shrank, was rewritten in place or moved is re-indexed from
+    scratch. New ids are claimed
+    inside a transaction; call `commit()` once the rows are written (or
+    `rollback()` if the write failed) so the index never runs ahead of the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        ensure_dir(path.parent)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS post_ids (store TEXT NOT NULL, post_id TEXT NOT NULL, "
+            "PRIMARY KEY (store, post_id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS store_sources (store TEXT PRIMARY KEY, source_path TEXT, bootstrapped_at TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(store_sources)")}
+        for column in _SOURCE_COLUMNS:
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE store_sources ADD COLUMN {column} INTEGER")
+        self._conn.commit()
+
+    def __enter__(self) -> "PostIdIndex":
+        return self
+
+    def __exit__(self, exc_type: object, *_: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+
+    def ensure_bootstrapped(self, store: str, jsonl_path: Path) -> int:
+        """Index post ids in `jsonl_path` not indexed yet; returns how many were added."""
+        with self._lock:
+            source = self._conn.execute(
+                "SELECT source_path, indexed_bytes, source_mtime_ns FROM store_sources WHERE store = ?", (store,)
+            ).fetchone()
+            exists = jsonl_path.exists()
+            size, mtime_ns = _file_position(jsonl_path) if exists else (0, 0)
+            offset = 0
+            # Sources indexed before positions were tracked (indexed_bytes NULL) are rescanned, keeping their ids.
+            if source is not None and source[1] is not None:
+                source_path, indexed_bytes, source_mtime_ns = source
+                unchanged = size == indexed_bytes and mtime_ns == source_mtime_ns
+                appended = size > indexed_bytes and source_path == jsonl_path.as_posix()
+                if unchanged and source_path == jsonl_path.as_posix():
+                    return 0
+                if appended:
+                    offset = indexed_bytes
+                else:
+                    self._conn.execute("DELETE FROM post_ids WHERE store = ?", (store,))
+            count = 0
+            if exists:
+                batch: list[tuple[str, str]] = []
+                for post_id, offset in _iter_jsonl_post_ids(jsonl_path, offset):
+                    if post_id is not None:
+                        batch.append((store, post_id))
+                    if len(batch) >= _BOOTSTRAP_BATCH_SIZE:
+                        count += self._conn.executemany("INSERT OR IGNORE INTO post_ids VALUES (?, ?)", batch).rowcount
+                        batch = []
+                if batch:
+                    count += self._conn.executemany("INSERT OR IGNORE INTO post_ids VALUES (?, ?)", batch).rowcount
+            # Stat after the scan: an append racing with it then shows up as growth next time.
+            indexed_mtime_ns = _file_position(jsonl_path)[1] if exists else 0
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_sources (store, source_path, bootstrapped_at, indexed_bytes, source_mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (store, jsonl_path.as_posix(), datetime.now(UTC).isoformat(), offset, indexed_mtime_ns),
+            )
+            self._conn.commit()
+        if count:
+            LOGGER.info("Indexed %s post ids from %s", count, jsonl_path)
+        return count
+
+    def contains(self, store: str, post_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM post_ids WHERE store = ? AND post_id = ?", (store, str(post_id))
+            ).fetchone()
+        return row is not None
+
+    def filter_new(self, store: str, rows: Iterable[dict]) -> list[dict]:
+        """Return rows whose post_id is not in `store` yet and claim their ids."""
+        out: list[dict] = []
+        with self._lock:
+            for row in rows:
+                post_id = row.get("post_id")
+                if post_id is None:
+                    out.append(row)
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO post_ids VALUES (?, ?)", (store, str(post_id))
+                )
+                if cursor.rowcount == 1:
+                    out.append(row)
+        return out
+
+    def count(self, store: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM post_ids WHERE store = ?", (store,)).fetchone()[0]
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._conn.rollback()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
-from typing import Iterable
+from typing import IO, Iterable
 
 
 def ensure_dir(path: Path) -> Path:
@@ -20,6 +21,60 @@ def append_jsonl(path: Path, rows: Iterable[dict]) -> int:
     return count
 
 
+class JsonlAppender:
+    """
+    Append-mode JSONL writer for streaming producers.
+
+    Keeps the file open between batches and flushes once `flush_every_rows`
+    rows or `flush_interval_seconds` have accumulated, so long runs persist
+    progress without reopening the file per page. Use as a context manager.
+    """
+
+    def __init__(self, path: Path, *, flush_every_rows: int = 100, flush_interval_seconds: float = 5.0) -> None:
+        self.path = path
+        self.flush_every_rows = flush_every_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self.count = 0
+        self._handle: IO[str] | None = None
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "JsonlAppender":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write_many(self, rows: Iterable[dict]) -> int:
+        written = 0
+        for row in rows:
+            if self._handle is None:
+                # Opened lazily so an unused stream does not leave an empty file behind.
+                ensure_dir(self.path.parent)
+                self._handle = self.path.open("a", encoding="utf-8")
+            self._handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+            written += 1
+        self.count += written
+        self._unflushed += written
+        if (
+            self._unflushed >= self.flush_every_rows
+            or time.monotonic() - self._last_flush >= self.flush_interval_seconds
+        ):
+            self.flush()
+        return written
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
 def write_jsonl(path: Path, rows: Iterable[dict]) -> int:
     ensure_dir(path.parent)
     count = 0
@@ -5,7 +5,10 @@ import json
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Literal
-from urllib.request import Request, urlopen
+
+from .http_transport import get_default_transport
+from .image_store import resolve_image_path
+from .perceptual_hash import DEFAULT_MAX_DISTANCE, NearDuplicateIndex
 
 
 OcrBackend = Literal["placeholder", "openai-vision", "auto"]
@@ -72,17 +75,17 @@ def _openai_vision_ocr(
             }
         ],
     }
-    request = Request(
+    response = get_default_transport().request(
+        "POST",
         "https://api.openai.com/v1/chat/completions",
-        data=json.dumps(payload).encode("utf-8"),
+        body=json.dumps(payload).encode("utf-8"),
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
-        method="POST",
+        timeout_seconds=timeout_seconds,
     )
-    with urlopen(request, timeout=timeout_seconds) as response:
-        response_payload = json.loads(response.read().decode("utf-8"))
+    response_payload = json.loads(response.body.decode("utf-8"))
     return {
         "ocr_text": _extract_openai_chat_text(response_payload),
         "raw_response_id": response_payload.get("id"),
@@ -98,12 +101,30 @@ def process_posts_for_ocr(
     openai_api_key: str | None = None,
     openai_model: str = "gpt-4.1-mini",
     openai_prompt: str = DEFAULT_OCR_PROMPT,
+    previous_results: list[dict] | None = None,
+    reuse_duplicates: bool = True,
+    reuse_near_duplicates: bool = False,
+    near_duplicate_distance: int = DEFAULT_MAX_DISTANCE,
 ) -> list[dict]:
-    """OCR stage for image text extraction."""
+    """
+    OCR stage for image text extraction.
+
+    With `openai-vision` and `reuse_duplicates`, an image whose `sha256` matches
+    an image already OCR-ed in this run or in `previous_results` reuses that
+    text instead of a new paid call (`reused_from` names the canonical image).
+    `reuse_near_duplicates` also reuses text for a `dhash` within
+    `near_duplicate_distance` bits. It is off by default: slides built from
+    one template can hash that close while carrying different text.
+    """
     selected_backend: OcrBackend = backend
     if selected_backend == "auto":
         selected_backend = "openai-vision" if openai_api_key else "placeholder"
 
+    reusable: NearDuplicateIndex[dict] = NearDuplicateIndex(near_duplicate_distance)
+    for row in (previous_results or []) if reuse_duplicates else []:
+        if row.get("engine") == "openai-vision" and row.get("status") == "processed" and not row.get("reused_from"):
+            reusable.add(row, sha256=row.get("sha256"), dhash=row.get("dhash"))
+
     now = datetime.now(UTC).isoformat()
     results: list[dict] = []
     for post in posts:
@@ -134,7 +155,8 @@ def process_posts_for_ocr(
                     )
                     continue
 
-                image_path = (data_dir / file_path_value).resolve()
+                base_row.update({"sha256": image.get("sha256"), "dhash": image.get("dhash")})
+                image_path = resolve_image_path(data_dir, file_path_value).resolve()
                 if not image_path.exists():
                     results.append(
                         {
@@ -149,6 +171,29 @@ def process_posts_for_ocr(
                     )
                     continue
 
+                reuse = None
+                if reuse_duplicates:
+                    reuse = reusable.find(
+                        sha256=image.get("sha256"),
+                        dhash=image.get("dhash") if reuse_near_duplicates else None,
+                    )
+                if reuse is not None:
+                    distance, canonical = reuse
+                    results.append(
+                        {
+                            **base_row,
+                            "ocr_text": canonical.get("ocr_text", ""),
+                            "confidence": canonical.get("confidence"),
+                            "engine": "openai-vision",
+                            "model": canonical.get("model"),
+                            "status": "processed",
+                            "file_path": file_path_value,
+                            "reused_from": canonical["image_id"],
+                            "reuse_distance": distance,
+                        }
+                    )
+                    continue
+
                 try:
                     ocr_output = _openai_vision_ocr(
                         image_path=image_path,
@@ -169,6 +214,7 @@ def process_posts_for_ocr(
                             "usage": ocr_output.get("usage"),
                         }
                     )
+                    reusable.add(results[-1], sha256=image.get("sha256"), dhash=image.get("dhash"))
                 except Exception as exc:
                     results.append(
                         {
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping
+from urllib.parse import urlparse
+
+LOGGER = logging.getLogger("x_rate_limit")
+
+# X API v2 rate limits are tracked per endpoint, not per app; requests against
+# `/users/{id}/tweets` never consume the `/tweets/search/recent` window.
+ENDPOINT_FAMILIES = (
+    "/tweets/search/recent",
+    "/tweets/search/all",
+    "/users/{id}/tweets",
+    "/users/by/username",
+    "/users/by",
+)
+
+_USER_TWEETS_PATH = re.compile(r"^/users/[^/]+/tweets$")
+_USER_BY_USERNAME_PATH = re.compile(r"^/users/by/username/[^/]+$")
+
+
+def endpoint_family(url: str) -> str:
+    path = urlparse(url).path.rstrip("/")
+    if path.startswith("/2/"):
+        path = path[2:]
+    if path in {"/tweets/search/recent", "/tweets/search/all", "/users/by"}:
+        return path
+    if _USER_TWEETS_PATH.match(path):
+        return "/users/{id}/tweets"
+    if _USER_BY_USERNAME_PATH.match(path):
+        return "/users/by/username"
+    return path
+
+
+def _header_int(headers: Mapping[str, str] | None, name: str) -> int | None:
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None or not str(value).strip().isdigit():
+        return None
+    return int(str(value).strip())
+
+
+@dataclass(slots=True)
+class _FamilyState:
+    limit: int | None = None
+    remaining: int | None = None
+    reset_epoch: float | None = None
+    in_flight: int = 0
+    waited_seconds: float = 0.0
+    requests: int = 0
+
+
+class RateLimitScheduler:
+    """
+    Shared pacing for X API requests based on `x-rate-limit-*` headers.
+
+    Every request reserves a slot for its endpoint family before it is sent.
+    When the last known `remaining` (minus requests still in flight) reaches
+    zero, callers block until the advertised reset instead of provoking a 429.
+    Safe to share between collector threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        reset_margin_seconds: float = 1.0,
+        max_wait_seconds: float = 900.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._reset_margin_seconds = reset_margin_seconds
+        self._max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._families: dict[str, _FamilyState] = {}
+
+    def _state(self, family: str) -> _FamilyState:
+        state = self._families.get(family)
+        if state is None:
+            state = self._families[family] = _FamilyState()
+        return state
+
+    def _wait_seconds(self, state: _FamilyState) -> float:
+        if state.remaining is None or state.reset_epoch is None:
+            return 0.0
+        now = self._clock()
+        if now >= state.reset_epoch + self._reset_margin_seconds:
+            # Window rolled over; quota is unknown until the next response.
+            state.remaining = None
+            state.reset_epoch = None
+            return 0.0
+        if state.remaining - state.in_flight > 0:
+            return 0.0
+        return min(state.reset_epoch + self._reset_margin_seconds - now, self._max_wait_seconds)
+
+    def acquire(self, family: str) -> float:
+        """Block until `family` has quota, reserve one request and return seconds waited."""
+        waited = 0.0
+        with self._condition:
+            state = self._state(family)
+            while True:
+                wait_seconds = self._wait_seconds(state)
+                if wait_seconds <= 0:
+                    break
+                if waited == 0.0:
+                    LOGGER.info(
+                        "Rate limit budget exhausted for %s (remaining=%s in_flight=%s); waiting %.1fs for reset",
+                        family,
+                        state.remaining,
+                        state.in_flight,
+                        wait_seconds,
+                    )
+                started = time.monotonic()
+                self._condition.wait(timeout=wait_seconds)
+                waited += time.monotonic() - started
+                if waited >= self._max_wait_seconds:
+                    # Headers may be stale (clock skew); let the request through and resync.
+                    state.remaining = None
+                    state.reset_epoch = None
+                    break
+            state.in_flight += 1
+            state.requests += 1
+            state.waited_seconds += waited
+        return waited
+
+    def headroom(self, family: str) -> tuple[float, float]:
+        """Return (requests available now, seconds until quota frees up) for `family`."""
+        with self._condition:
+            state = self._state(family)
+            wait_seconds = self._wait_seconds(state)
+            if state.remaining is None:
+                return math.inf, wait_seconds
+            return float(max(0, state.remaining - state.in_flight)), wait_seconds
+
+    def try_acquire(self, family: str) -> bool:
+        """Reserve a request slot only if one is available right now."""
+        with self._condition:
+            state = self._state(family)
+            if self._wait_seconds(state) > 0:
+                return False
+            state.in_flight += 1
+            state.requests += 1
+            return True
+
+    def release(self, family: str, headers: Mapping[str, str] | None = None) -> None:
+        """Finish a reserved request, syncing quota from response headers when present."""
+        with self._condition:
+            state = self._state(family)
+            state.in_flight = max(0, state.in_flight - 1)
+            limit = _header_int(headers, "x-rate-limit-limit")
+            remaining = _header_int(headers, "x-rate-limit-remaining")
+            reset_epoch = _header_int(headers, "x-rate-limit-reset")
+            if limit is not None:
+                state.limit = limit
+            if remaining is not None and reset_epoch is not None:
+                state.remaining = remaining
+                state.reset_epoch = float(reset_epoch)
+            self._condition.notify_all()
+
+    def mark_exhausted(self, family: str, *, retry_after_seconds: float) -> None:
+        """Park `family` after a 429 until `retry_after_seconds` from now."""
+        with self._condition:
+            state = self._state(family)
+            state.remaining = 0
+            state.reset_epoch = max(state.reset_epoch or 0.0, self._clock() + retry_after_seconds)
+            self._condition.notify_all()
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._condition:
+            return {
+                family: {
+                    "limit": state.limit,
+                    "remaining": state.remaining,
+                    "reset_epoch": state.reset_epoch,
+                    "in_flight": state.in_flight,
+                    "requests": state.requests,
+                    "waited_seconds": round(state.waited_seconds, 3),
+                }
+                for family, state in self._families.items()
+            }
+
+
+@dataclass(slots=True)
+class TokenLease:
+    token: str
+    label: str
+    scheduler: RateLimitScheduler
+
+
+def mask_token(token: str) -> str:
+    return f"...{token[-4:]}" if len(token) > 8 else "***"
+
+
+class BearerTokenPool:
+    """
+    Spread X API requests over several bearer tokens (one rate limit per app).
+
+    Each token has its own `RateLimitScheduler`. `acquire()` leases the token
+    with the most remaining quota for the endpoint family; a 429 parks that
+    token's family so the retry rotates to another token. Only when every
+    token is exhausted does the caller wait for the earliest reset.
+    """
+
+    def __init__(self, tokens: list[str], *, schedulers: list[RateLimitScheduler] | None = None) -> None:
+        unique_tokens = list(dict.fromkeys(token for token in tokens if token))
+        if not unique_tokens:
+            raise ValueError("BearerTokenPool requires at least one bearer token")
+        self._lock = threading.Lock()
+        self._leases = [
+            TokenLease(
+                token=token,
+                label=f"token{idx + 1}({mask_token(token)})",
+                scheduler=schedulers[idx] if schedulers else scheduler_for_token(token),
+            )
+            for idx, token in enumerate(unique_tokens)
+        ]
+        self._rate_limited: dict[str, int] = {lease.label: 0 for lease in self._leases}
+        self._pool_waited_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+    def acquire(self, family: str) -> TokenLease:
+        while True:
+            with self._lock:
+                headrooms = [(lease, *lease.scheduler.headroom(family)) for lease in self._leases]
+                # Most remaining quota first; unknown quota (fresh token) counts as unlimited.
+                for lease, _, _ in sorted(headrooms, key=lambda item: -item[1]):
+                    if lease.scheduler.try_acquire(family):
+                        return lease
+                wait_seconds = min(wait for _, _, wait in headrooms)
+            if wait_seconds > 0:
+                LOGGER.info("All %s bearer tokens exhausted for %s; waiting %.1fs", len(self._leases), family, wait_seconds)
+                time.sleep(wait_seconds)
+                with self._lock:
+                    self._pool_waited_seconds += wait_seconds
+
+    def record_rate_limited(self, lease: TokenLease, family: str, *, retry_after_seconds: float) -> None:
+        lease.scheduler.mark_exhausted(family, retry_after_seconds=retry_after_seconds)
+        with self._lock:
+            self._rate_limited[lease.label] += 1
+
+    def usage(self) -> list[dict]:
+        with self._lock:
+            rate_limited = dict(self._rate_limited)
+        return [
+            {
+                "token": lease.label,
+                "requests": sum(item["requests"] for item in lease.scheduler.snapshot().values()),
+                "rate_limited": rate_limited[lease.label],
+                "families": lease.scheduler.snapshot(),
+            }
+            for lease in self._leases
+        ]
+
+
+_SCHEDULERS_LOCK = threading.Lock()
+_SCHEDULERS_BY_TOKEN: dict[str, RateLimitScheduler] = {}
+
+
+def scheduler_for_token(token: str) -> RateLimitScheduler:
+    """Process-wide scheduler per bearer token, shared by every pool that uses it."""
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS_BY_TOKEN.get(token)
+        if scheduler is None:
+            scheduler = _SCHEDULERS_BY_TOKEN[token] = RateLimitScheduler()
+        return scheduler
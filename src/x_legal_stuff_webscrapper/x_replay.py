@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Mapping
+from urllib.parse import parse_qs, urlsplit
+
+from .storage import ensure_dir, read_jsonl
+from .x_rate_limit import endpoint_family
+
+LOGGER = logging.getLogger("x_replay")
+
+# Query parameters that identify a position in a pagination chain. Field
+# selections, page size and since_id are ignored so cassettes survive changes
+# to the request shape.
+MATCH_PARAMS = ("query", "usernames", "next_token", "pagination_token", "until_id", "start_time", "end_time")
+_RATE_LIMIT_HEADERS = ("x-rate-limit-limit", "x-rate-limit-remaining", "x-rate-limit-reset")
+
+
+def cassette_match_key(path: str, params: Mapping[str, str]) -> str:
+    """Stable lookup key for a recorded X API request."""
+    selected = {name: params[name] for name in MATCH_PARAMS if params.get(name)}
+    return json.dumps([path.rstrip("/"), selected], sort_keys=True)
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url)
+    params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+    return cassette_match_key(parts.path, params)
+
+
+class CassetteRecorder:
+    """
+    Append successful X API v2 responses to a JSONL cassette.
+
+    Each line holds the request path, the matching query parameters, the
+    rate-limit headers and the decoded JSON body. Bearer tokens travel in the
+    Authorization header and are never written.
+    """
+
+    def __init__(self, path: Path) -> None:
+        ensure_dir(path.parent)
+        self.path = path
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, url: str, *, status: int, headers: Mapping[str, str], body: dict) -> None:
+        parts = urlsplit(url)
+        params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        entry = {
+            "path": parts.path,
+            "params": {name: params[name] for name in MATCH_PARAMS if params.get(name)},
+            "status": status,
+            "headers": {name: headers.get(name) for name in _RATE_LIMIT_HEADERS if headers.get(name) is not None},
+            "body": body,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+            self.count += 1
+
+
+def load_cassette(path: Path) -> list[dict]:
+    return read_jsonl(path)
+
+
+class ReplayServer:
+    """
+    Local stand-in for the X API v2 serving recorded payloads.
+
+    Requests are matched on path + `MATCH_PARAMS`; unmatched requests get a
+    404. Every bearer token gets `rate_limit` requests per endpoint family and
+    `window_seconds` window, reported through `x-rate-limit-*` headers, and
+    exhausting it returns 429 like the real API. `fail_every` additionally
+    answers every N-th request with a 503 to exercise transient-error
+    backoff, and `latency_seconds` delays each response.
+
+        with ReplayServer(entries) as server:
+            configure_x_api(base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[dict],
+        *,
+        rate_limit: int = 450,
+        window_seconds: float = 900.0,
+        fail_every: int = 0,
+        latency_seconds: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self._responses: dict[str, dict] = {}
+        for entry in entries:
+            self._responses[cassette_match_key(entry["path"], entry.get("params") or {})] = entry
+        self.rate_limit = rate_limit
+        self.window_seconds = window_seconds
+        self.fail_every = fail_every
+        self.latency_seconds = latency_seconds
+        self._lock = threading.Lock()
+        self._windows: dict[tuple[str, str], tuple[float, int]] = {}
+        self.stats = {"requests": 0, "served": 0, "rate_limited": 0, "injected_failures": 0, "not_found": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/2"
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="x-replay", daemon=True)
+        self._thread.start()
+        LOGGER.info("Replaying %s recorded responses on %s", len(self._responses), self.base_url)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        LOGGER.info("Replaying %s recorded responses on %s", len(self._responses), self.base_url)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def _take_quota(self, token: str, family: str) -> tuple[bool, bool, dict[str, str]]:
+        """Return (allowed, injected_failure, rate-limit headers) for one request."""
+        now = time.time()
+        with self._lock:
+            self.stats["requests"] += 1
+            injected = bool(self.fail_every) and self.stats["requests"] % self.fail_every == 0
+            window_start, used = self._windows.get((token, family), (now, 0))
+            if now >= window_start + self.window_seconds:
+                window_start, used = now, 0
+            allowed = used < self.rate_limit and not injected
+            if allowed:
+                used += 1
+            self._windows[(token, family)] = (window_start, used)
+            if injected:
+                self.stats["injected_failures"] += 1
+            elif not allowed:
+                self.stats["rate_limited"] += 1
+        headers = {
+            "x-rate-limit-limit": str(self.rate_limit),
+            "x-rate-limit-remaining": str(max(0, self.rate_limit - used)),
+            "x-rate-limit-reset": str(int(window_start + self.window_seconds + 0.999)),
+        }
+        return allowed, injected, headers
+
+    def _respond(self, url: str, authorization: str) -> tuple[int, dict[str, str], dict]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        allowed, injected, headers = self._take_quota(authorization, endpoint_family(url))
+        if injected:
+            return 503, headers, {"title": "Service Unavailable", "detail": "injected by replay server"}
+        if not allowed:
+            return 429, headers, {"title": "Too Many Requests"}
+        entry = self._responses.get(_url_key(url))
+        if entry is None:
+            with self._lock:
+                self.stats["not_found"] += 1
+            return 404, headers, {"title": "Not Found", "detail": f"no recorded response for {_url_key(url)}"}
+        with self._lock:
+            self.stats["served"] += 1
+        return int(entry.get("status") or 200), headers, entry["body"]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                status, headers, body = server._respond(self.path, self.headers.get("Authorization", ""))
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                LOGGER.debug(format, *args)
+
+        return Handler
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from .storage import write_json
+
+
+class XUserCache:
+    """
+    Persisted X username -> user lookup (`data/index/x_users.json`).
+
+    Entries hold `user_id`, `username`, `name` and `fetched_at`; lookups older
+    than `ttl_seconds` count as misses so renamed or recreated accounts are
+    eventually refreshed. Usernames are case-insensitive on X, so keys are
+    lowercased.
+    """
+
+    def __init__(self, path: Path, *, ttl_seconds: float = 7 * 24 * 3600) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._users: dict[str, dict] = {}
+        self._dirty = False
+        if path.exists():
+            self._users = json.loads(path.read_text(encoding="utf-8")).get("users", {})
+
+    def _is_fresh(self, entry: dict) -> bool:
+        try:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return False
+        return time.time() - fetched_at < self.ttl_seconds
+
+    def get(self, handle: str) -> dict | None:
+        """Return `{"id", "username", "name"}` for a fresh entry, else None."""
+        with self._lock:
+            entry = self._users.get(handle.lower())
+        if not entry or not self._is_fresh(entry):
+            return None
+        return {"id": entry["user_id"], "username": entry.get("username") or handle, "name": entry.get("name")}
+
+    def missing(self, handles: list[str]) -> list[str]:
+        return [handle for handle in handles if self.get(handle) is None]
+
+    def put(self, handle: str, user: dict) -> None:
+        with self._lock:
+            self._users[handle.lower()] = {
+                "user_id": str(user["id"]),
+                "username": user.get("username") or handle,
+                "name": user.get("name"),
+                "fetched_at": datetime.now(UTC).isoformat(),
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": 1, "users": dict(sorted(self._users.items()))}
+            self._dirty = False
+        write_json(self.path, payload)
@@ -146,3 +146,53 @@ def test_cli_export_knowledge_library_supports_options() -> None:
     assert namespace.policy_file == "policy.json"
     assert namespace.schema_contract_version == "knowledge-canonical-contract-v1"
     assert namespace.fail_on_run_gate is True
+
+
+def test_cli_collect_supports_collect_concurrency() -> None:
+    parser = build_parser()
+    namespace = parser.parse_args(["collect", "--collect-concurrency", "4"])
+
+    assert namespace.collect_concurrency == 4
+
+
+def test_cli_collect_supports_incremental_toggle() -> None:
+    parser = build_parser()
+
+    assert parser.parse_args(["collect"]).incremental is False
+    assert parser.parse_args(["collect", "--incremental"]).incremental is True
+
+
+def test_cli_collect_supports_batch_search() -> None:
+    parser = build_parser()
+    namespace = parser.parse_args(["collect", "--batch-search", "--max-query-length", "1024"])
+
+    assert namespace.batch_search is True
+    assert namespace.max_query_length == 1024
+
+
+def test_cli_migrate_images_supports_dry_run() -> None:
+    parser = build_parser()
+    namespace = parser.parse_args(["migrate-images", "--dry-run"])
+
+    assert namespace.command == "migrate-images"
+    assert namespace.dry_run is True
+
+
+def test_cmd_collect_reports_token_usage_when_collect_fails(tmp_path, monkeypatch) -> None:
+    from x_legal_stuff_webscrapper import cli
+    from x_legal_stuff_webscrapper.config import AppConfig
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("X_API_BEARER_TOKEN", "token")
+    reported: list[object] = []
+
+    def failing_pages(**_: object):
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(cli, "iter_public_posts", failing_pages)
+    monkeypatch.setattr(cli, "_log_token_usage", lambda _, token_pool: reported.append(token_pool))
+    args = build_parser().parse_args(["collect", "--account", "demo", "--backend", "recent"])
+
+    assert cli.cmd_collect(args, AppConfig.from_env()) == 1
+    assert len(reported) == 1 and reported[0] is not None
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.collect_budget import BudgetLedger, CollectBudget
+
+
+def test_budget_splits_posts_fairly_and_redistributes_unused_share() -> None:
+    budget = CollectBudget(max_posts_read=300)
+    budget.allocate(["a", "b", "c"], backend="all")
+
+    assert budget.reserve("a", wanted_posts=100) == 100
+    budget.settle("a", reserved_posts=100, posts_read=40)
+    budget.release("a")  # a finished early: its 60 unused posts go to the pool
+    assert budget.reserve("b", wanted_posts=100, min_posts=10) == 100
+    budget.settle("b", reserved_posts=100, posts_read=100)
+    assert budget.reserve("b", wanted_posts=100, min_posts=10) == 60
+    budget.settle("b", reserved_posts=60, posts_read=60)
+    assert budget.reserve("b", wanted_posts=100, min_posts=10) == 0
+    assert budget.cut == {"b"}
+    # c still has its own share.
+    assert budget.reserve("c", wanted_posts=100) == 100
+    assert budget.used == {"requests": 3, "posts_read": 200}
+
+
+def test_month_scope_counts_ledger_usage(tmp_path: Path) -> None:
+    ledger = BudgetLedger(tmp_path / "x_api_budget.json")
+    ledger.record("all", requests=9, posts_read=500)
+    ledger.save()
+
+    budget = CollectBudget(max_requests=10, ledger=BudgetLedger(ledger.path), scope="month")
+    budget.allocate(["a"], backend="all")
+    assert budget.reserve("a", wanted_posts=10) == 10
+    budget.settle("a", reserved_posts=10, posts_read=10)
+    assert budget.reserve("a", wanted_posts=10) == 0
+    budget.save()
+
+    assert BudgetLedger(ledger.path).month_usage("all") == {"requests": 10, "posts_read": 510}
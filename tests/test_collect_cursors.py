@@ -0,0 +1,16 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.collect_cursors import CollectCursorStore, cursor_key
+
+
+def test_cursor_store_only_moves_forward_and_persists(tmp_path: Path) -> None:
+    path = tmp_path / "collect_cursors.json"
+    key = cursor_key(handle="Demo", backend="recent", query="from:Demo")
+    store = CollectCursorStore(path)
+    store.advance(key, "1900")
+    store.advance(key, "200")
+    store.save()
+
+    reloaded = CollectCursorStore(path)
+    assert reloaded.get_since_id(key) == "1900"
+    assert reloaded.get_since_id(cursor_key(handle="demo", backend="all", query="from:Demo")) is None
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.collect_jobs import CollectJob
+
+
+def test_collect_job_checkpoint_roundtrip(tmp_path: Path) -> None:
+    job = CollectJob.create(tmp_path, {"handles": ["a", "b"], "limit_per_account": 5})
+    job.record_page(handle="a", rows_written=2, next_token="t2", newest_id="120", done=False)
+    job.record_page(handle="a", rows_written=2, next_token="t3", newest_id="90", done=False)
+    job.record_page(handle="b", rows_written=1, next_token="x", newest_id="50", done=True)
+
+    loaded = CollectJob.load(tmp_path, job.job_id)
+    assert loaded.payload["status"] == "running"
+    assert loaded.handle_states["a"] == {"next_token": "t3", "newest_id": "120", "rows_written": 4, "done": False}
+    assert loaded.handle_states["b"]["done"] is True
+    assert loaded.handle_states["b"]["next_token"] is None
@@ -0,0 +1,618 @@
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from x_legal_stuff_webscrapper import collector_x
+from x_legal_stuff_webscrapper.collect_budget import CollectBudget
+from x_legal_stuff_webscrapper.collect_cursors import CollectCursorStore, cursor_key
+from x_legal_stuff_webscrapper.collect_jobs import CollectJob
+from x_legal_stuff_webscrapper.collector_x import (
+    CollectPage,
+    _iter_pages_for_handles,
+    _request_fields,
+    _split_time_window,
+    build_x_batch_search_query,
+    pack_search_handle_batches,
+)
+from x_legal_stuff_webscrapper.x_user_cache import XUserCache
+
+
+class _FakeXApi:
+    """
+    Stand-in for `_http_get_json` that records every request.
+
+    `routes` maps a URL path fragment to a payload, a list of payloads served
+    in order, or a callable taking the parsed query params.
+    """
+
+    def __init__(self, routes: dict[str, Any]) -> None:
+        self.routes = routes
+        self.calls: list[tuple[str, dict[str, list[str]]]] = []
+
+    def __call__(self, url: str, **_: object) -> dict:
+        parsed = urlparse(url)
+        params = parse_qs(parsed.query)
+        self.calls.append((parsed.path, params))
+        for fragment, response in self.routes.items():
+            if fragment in parsed.path:
+                if callable(response):
+                    return response(params)
+                if isinstance(response, list):
+                    return response.pop(0)
+                return response
+        raise AssertionError(f"unexpected X API request: {url}")
+
+    @property
+    def paths(self) -> list[str]:
+        return [path for path, _ in self.calls]
+
+    @property
+    def params(self) -> list[dict[str, list[str]]]:
+        return [params for _, params in self.calls]
+
+
+@pytest.fixture()
+def fake_x_api(monkeypatch) -> Callable[[dict[str, Any]], _FakeXApi]:
+    def install(routes: dict[str, Any]) -> _FakeXApi:
+        api = _FakeXApi(routes)
+        monkeypatch.setattr(collector_x, "_http_get_json", api)
+        return api
+
+    return install
+
+
+def _users_by_response(params: dict[str, list[str]]) -> dict:
+    usernames = params["usernames"][0].split(",")
+    return {"data": [{"id": f"id-{name}", "username": name, "name": name.title()} for name in usernames]}
+
+
+def test_iter_pages_for_handles_keeps_handle_order_with_concurrency() -> None:
+    delays = {"a": 0.05, "b": 0.0, "c": 0.02}
+
+    def fake_pages(*, handle: str):
+        for page_idx in range(2):
+            time.sleep(delays[handle])
+            yield CollectPage(handle=handle, rows=[{"post_id": f"{handle}-{page_idx}"}])
+
+    pages = list(_iter_pages_for_handles(["a", "b", "c"], fake_pages, concurrency=3, max_buffered_pages=1))
+
+    assert [row["post_id"] for page in pages for row in page.rows] == ["a-0", "a-1", "b-0", "b-1", "c-0", "c-1"]
+
+
+def test_iter_pages_for_handles_reraises_worker_errors() -> None:
+    def failing_pages(*, handle: str):
+        if handle == "b":
+            raise RuntimeError("boom")
+        yield CollectPage(handle=handle, rows=[{"post_id": handle}])
+
+    pages = _iter_pages_for_handles(["a", "b"], failing_pages, concurrency=2)
+    assert next(pages).handle == "a"
+    with pytest.raises(RuntimeError, match="boom"):
+        next(pages)
+
+
+def test_search_fetch_passes_since_id_and_advances_cursor(tmp_path, fake_x_api) -> None:
+    api = fake_x_api(
+        {
+            "/tweets/search": {
+                "data": [{"id": "120", "text": "new post"}, {"id": "110", "text": "older post"}],
+                "meta": {"newest_id": "120", "oldest_id": "110"},
+            }
+        }
+    )
+    store = CollectCursorStore(tmp_path / "collect_cursors.json")
+    key = collector_x.cursor_key(handle="demo", backend="recent", query="from:demo")
+    store.advance(key, "100")
+
+    rows = collector_x.collect_public_posts(
+        ["demo"],
+        limit_per_account=5,
+        backend="recent",
+        x_api_bearer_token="token",
+        cursor_store=store,
+    )
+
+    assert [row["post_id"] for row in rows] == ["120", "110"]
+    assert api.params[0]["since_id"] == ["100"]
+    assert store.get_since_id(key) == "120"
+
+
+def test_split_time_window_covers_range_newest_first() -> None:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    end = datetime(2024, 3, 1, tzinfo=UTC)
+    shards = _split_time_window(start, end, 30)
+
+    assert shards[0][1] == end
+    assert shards[-1][0] == start
+    assert all(newer[0] == older[1] for newer, older in zip(shards, shards[1:]))
+
+
+def test_backfill_merges_shards_and_reuses_checkpoints(tmp_path, fake_x_api) -> None:
+    def shard_page(params: dict) -> dict:
+        # The same post shows up in both shards to exercise dedup.
+        shard_id = "300" if params["start_time"][0].startswith("2024-01-31") else "100"
+        return {"data": [{"id": shard_id, "text": "a"}, {"id": "200", "text": "b"}], "meta": {}}
+
+    api = fake_x_api({"/tweets/search": shard_page})
+    plan = collector_x.BackfillPlan(
+        start_time=datetime(2024, 1, 1, tzinfo=UTC),
+        end_time=datetime(2024, 3, 1, tzinfo=UTC),
+        shard_days=30,
+        concurrency=2,
+        checkpoint_dir=tmp_path,
+    )
+    kwargs = dict(limit_per_account=10, backend="all", x_api_bearer_token="token", backfill=plan)
+
+    rows = collector_x.collect_public_posts(["demo"], **kwargs)
+    assert [row["post_id"] for row in rows] == ["300", "200", "100"]
+    assert len(api.calls) == 2
+
+    rows_again = collector_x.collect_public_posts(["demo"], **kwargs)
+    assert [row["post_id"] for row in rows_again] == ["300", "200", "100"]
+    assert len(api.calls) == 2
+
+
+def test_backfill_trims_to_account_limit_and_skips_older_shards(fake_x_api) -> None:
+    def shard_page(params: dict) -> dict:
+        day = int(params["start_time"][0][8:10])
+        return {"data": [{"id": f"{day}01", "text": "a"}, {"id": f"{day}00", "text": "b"}], "meta": {}}
+
+    api = fake_x_api({"/tweets/search": shard_page})
+    plan = collector_x.BackfillPlan(
+        start_time=datetime(2024, 1, 1, tzinfo=UTC),
+        end_time=datetime(2024, 1, 6, tzinfo=UTC),
+        shard_days=1,
+        concurrency=1,
+    )
+
+    rows = collector_x.collect_public_posts(
+        ["demo"], limit_per_account=3, backend="all", x_api_bearer_token="token", backfill=plan
+    )
+
+    # The two newest shards already hold 3 posts; the three older shards are never read.
+    assert [params["start_time"][0] for params in api.params] == ["2024-01-05T00:00:00Z", "2024-01-04T00:00:00Z"]
+    assert [row["post_id"] for row in rows] == ["501", "500", "401"]
+
+
+def test_backfill_cut_by_budget_resumes_only_missing_shards(tmp_path, fake_x_api) -> None:
+    def shard_page(params: dict) -> dict:
+        day = int(params["start_time"][0][8:10])
+        return {"data": [{"id": f"{day}00", "text": "a"}, {"id": f"{day}01", "text": "b"}], "meta": {}}
+
+    api = fake_x_api({"/tweets/search": shard_page})
+    plan = collector_x.BackfillPlan(
+        start_time=datetime(2024, 1, 1, tzinfo=UTC),
+        end_time=datetime(2024, 1, 6, tzinfo=UTC),
+        shard_days=1,
+        concurrency=1,
+        checkpoint_dir=tmp_path / "backfill",
+    )
+    kwargs = dict(limit_per_account=10, backend="all", x_api_bearer_token="token", backfill=plan)
+    job = CollectJob.create(tmp_path / "jobs", {"handles": ["demo"]})
+
+    def run(**extra: object) -> None:
+        for page in collector_x.iter_public_posts(["demo"], **kwargs, **extra):
+            job.record_page(
+                handle=page.handle,
+                rows_written=len(page.rows),
+                next_token=page.next_token,
+                newest_id=page.newest_id,
+                done=page.done,
+            )
+
+    run(budget=CollectBudget(max_requests=2))
+    first_run_shards = [params["start_time"][0] for params in api.params]
+    assert len(first_run_shards) == 2
+    # A smaller remaining limit on resume would change the shard checkpoint key.
+    assert job.handle_states["demo"] == {"next_token": None, "newest_id": None, "rows_written": 4, "done": False}
+
+    api.calls.clear()
+    run(resume_state=job.handle_states)
+
+    assert len(api.calls) == 3
+    assert not {params["start_time"][0] for params in api.params} & set(first_run_shards)
+    assert job.handle_states["demo"]["done"] is True
+
+
+def test_backfill_releases_budget_share_once_after_all_shards(fake_x_api, monkeypatch) -> None:
+    def shard_page(params: dict) -> dict:
+        return {"data": [{"id": f"{int(params['start_time'][0][8:10])}00", "text": "a"}], "meta": {}}
+
+    api = fake_x_api({"/tweets/search": shard_page})
+    budget = CollectBudget(max_posts_read=1000)
+    released: list[tuple[str, int]] = []
+    release = budget.release
+    monkeypatch.setattr(budget, "release", lambda consumer: (released.append((consumer, len(api.calls))), release(consumer)))
+    plan = collector_x.BackfillPlan(
+        start_time=datetime(2024, 1, 1, tzinfo=UTC),
+        end_time=datetime(2024, 1, 4, tzinfo=UTC),
+        shard_days=1,
+        concurrency=2,
+    )
+
+    rows = collector_x.collect_public_posts(
+        ["demo"], limit_per_account=10, backend="all", x_api_bearer_token="token", backfill=plan, budget=budget
+    )
+
+    assert len(rows) == 3
+    assert released == [("demo", 3)]
+
+
+def test_iter_public_posts_resumes_from_checkpoint_token(fake_x_api) -> None:
+    api = fake_x_api(
+        {
+            "/tweets/search": {
+                "data": [{"id": "90", "text": "a"}, {"id": "80", "text": "b"}],
+                "meta": {"next_token": "t3"},
+            }
+        }
+    )
+    resume_state = {
+        "done_handle": {"next_token": None, "rows_written": 3, "done": True},
+        "demo": {"next_token": "t2", "newest_id": "120", "rows_written": 2, "done": False},
+    }
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["done_handle", "demo"],
+            limit_per_account=3,
+            backend="recent",
+            x_api_bearer_token="token",
+            resume_state=resume_state,
+        )
+    )
+
+    assert len(api.calls) == 1
+    assert api.params[0]["next_token"] == ["t2"]
+    assert [row["post_id"] for row in pages[0].rows] == ["90"]
+    assert pages[0].done is True
+    assert pages[0].newest_id == "120"
+
+
+def test_page_rows_share_filter_context_and_resolve_media(fake_x_api) -> None:
+    payload = {
+        "data": [
+            {"id": "2", "text": "a", "author_id": "u1", "attachments": {"media_keys": ["m1"]}},
+            {"id": "1", "text": "b", "author_id": "u1", "attachments": {"media_keys": ["m2", "missing"]}},
+        ],
+        "includes": {
+            "media": [
+                {"media_key": "m1", "type": "photo", "url": "https://img/1.jpg"},
+                {"media_key": "m2", "type": "video", "preview_image_url": "https://img/2.jpg"},
+            ],
+            "users": [{"id": "u1", "username": "Demo", "name": "Demo Name"}],
+        },
+        "meta": {},
+    }
+    fake_x_api({"/tweets/search": payload})
+
+    rows = collector_x.collect_public_posts(["demo"], limit_per_account=5, backend="recent", x_api_bearer_token="t")
+
+    assert rows[0]["filter_context"] is rows[1]["filter_context"]
+    assert rows[0]["author_handle"] == "Demo"
+    assert [image["source_url"] for row in rows for image in row["images"]] == ["https://img/1.jpg", "https://img/2.jpg"]
+
+
+def test_pack_search_handle_batches_respects_query_length() -> None:
+    handles = [f"account{idx:02d}" for idx in range(12)]
+    batches = pack_search_handle_batches(
+        handles,
+        max_query_length=80,
+        tag_filters=["ICT"],
+        text_filters=None,
+        match_mode="any",
+        content_mode="mixed",
+    )
+
+    assert [handle for batch in batches for handle in batch] == handles
+    assert len(batches) > 1
+    for batch in batches:
+        query = build_x_batch_search_query(
+            handles=batch, tag_filters=["ICT"], text_filters=None, match_mode="any", content_mode="mixed"
+        )
+        assert len(query) <= 80
+        assert query.endswith("(#ICT)")
+
+
+def test_batch_search_routes_rows_by_author_and_drops_saturated_handles(fake_x_api) -> None:
+    users = [{"id": "1", "username": "Alpha"}, {"id": "2", "username": "beta"}]
+    api = fake_x_api(
+        {
+            "/tweets/search": [
+                {
+                    "data": [
+                        {"id": "50", "text": "a1", "author_id": "1"},
+                        {"id": "49", "text": "b1", "author_id": "2"},
+                        {"id": "48", "text": "a2", "author_id": "1"},
+                    ],
+                    "includes": {"users": users},
+                    "meta": {"next_token": "n1", "oldest_id": "48"},
+                },
+                {
+                    "data": [{"id": "40", "text": "b2", "author_id": "2"}],
+                    "includes": {"users": users},
+                    "meta": {},
+                },
+            ]
+        }
+    )
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["alpha", "beta"],
+            limit_per_account=2,
+            backend="recent",
+            x_api_bearer_token="token",
+            batch_search=True,
+        )
+    )
+
+    requested = api.params
+    assert requested[0]["query"] == ["(from:alpha OR from:beta)"]
+    # alpha hit its limit on page one; the query is rebuilt for beta below the last page.
+    assert requested[1]["query"] == ["from:beta"]
+    assert requested[1]["until_id"] == ["48"]
+    assert "next_token" not in requested[1]
+    # One aggregated page per API response, with a checkpoint per account.
+    assert [[row["post_id"] for row in page.rows] for page in pages] == [["50", "48", "49"], ["40"]]
+    assert [
+        [(checkpoint.handle, checkpoint.rows_written, checkpoint.done) for checkpoint in page.checkpoints()]
+        for page in pages
+    ] == [[("alpha", 2, True), ("beta", 1, False)], [("beta", 1, True)]]
+    assert pages[-1].done is True
+
+
+def test_batch_search_drops_handles_once_below_their_since_id(tmp_path, fake_x_api) -> None:
+    users = [{"id": "1", "username": "alpha"}, {"id": "2", "username": "beta"}]
+    api = fake_x_api(
+        {
+            "/tweets/search": [
+                {
+                    "data": [{"id": "90", "text": "a", "author_id": "1"}, {"id": "70", "text": "b", "author_id": "2"}],
+                    "includes": {"users": users},
+                    "meta": {"next_token": "n1", "oldest_id": "70"},
+                },
+                {
+                    "data": [{"id": "20", "text": "b", "author_id": "2"}],
+                    "includes": {"users": users},
+                    "meta": {"oldest_id": "20"},
+                },
+            ]
+        }
+    )
+    cursor_store = CollectCursorStore(tmp_path / "cursors.json")
+    for handle, since_id in {"alpha": "80", "beta": "10"}.items():
+        key = cursor_key(handle=handle, backend="recent", query=collector_x.build_x_search_query(
+            handle=handle, tag_filters=None, text_filters=None, match_mode="any", content_mode="mixed"
+        ))
+        cursor_store.advance(key, since_id)
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["alpha", "beta"],
+            limit_per_account=10,
+            backend="recent",
+            x_api_bearer_token="token",
+            batch_search=True,
+            cursor_store=cursor_store,
+        )
+    )
+
+    # Page one reads below alpha's since_id (80): alpha is done and leaves the query.
+    assert api.params[0]["since_id"] == ["10"]
+    assert api.params[1]["query"] == ["from:beta"]
+    assert api.params[1]["until_id"] == ["70"]
+    assert [(c.handle, c.rows_written, c.done) for c in pages[0].checkpoints()] == [("alpha", 1, True), ("beta", 1, False)]
+    assert [row["post_id"] for page in pages for row in page.rows] == ["90", "70", "20"]
+
+
+def test_batch_search_resume_continues_below_checkpointed_until_id(tmp_path, fake_x_api) -> None:
+    users = [{"id": "1", "username": "alpha"}, {"id": "2", "username": "beta"}]
+    first_page = {
+        "data": [
+            {"id": "50", "text": "a1", "author_id": "1"},
+            {"id": "49", "text": "b1", "author_id": "2"},
+            {"id": "48", "text": "x", "author_id": "9"},
+        ],
+        "includes": {"users": users},
+        "meta": {"next_token": "n1", "oldest_id": "48"},
+    }
+
+    def first_page_then_fail(params: dict) -> dict:
+        if len(failing_api.calls) == 1:
+            return first_page
+        raise RuntimeError("network down")
+
+    failing_api = fake_x_api({"/tweets/search": first_page_then_fail})
+    job = CollectJob.create(tmp_path, {"handles": ["alpha", "beta"]})
+    kwargs = {"limit_per_account": 2, "backend": "recent", "x_api_bearer_token": "token", "batch_search": True}
+    with pytest.raises(RuntimeError):
+        for page in collector_x.iter_public_posts(["alpha", "beta"], **kwargs):
+            job.record(page.checkpoints())
+
+    api = fake_x_api(
+        {
+            "/tweets/search": {
+                "data": [
+                    {"id": "47", "text": "a2", "author_id": "1"},
+                    {"id": "46", "text": "b2", "author_id": "2"},
+                ],
+                "includes": {"users": users},
+                "meta": {"oldest_id": "46"},
+            }
+        }
+    )
+    pages = list(collector_x.iter_public_posts(["alpha", "beta"], resume_state=job.handle_states, **kwargs))
+
+    assert len(api.calls) == 1
+    assert api.params[0]["until_id"] == ["48"]
+    assert "next_token" not in api.params[0]
+    assert [[row["post_id"] for row in page.rows] for page in pages] == [["47", "46"]]
+    assert all(checkpoint.done for checkpoint in pages[0].checkpoints())
+
+
+def test_timeline_prefetches_users_in_bulk_and_reuses_cache(tmp_path, fake_x_api) -> None:
+    api = fake_x_api({"/users/by": _users_by_response, "/tweets": {"data": [{"id": "7", "text": "post"}], "meta": {}}})
+    cache_path = tmp_path / "x_users.json"
+    kwargs = {"limit_per_account": 1, "backend": "timeline", "x_api_bearer_token": "token"}
+
+    cache = XUserCache(cache_path)
+    rows = collector_x.collect_public_posts(["alpha", "beta"], user_cache=cache, **kwargs)
+    cache.save()
+
+    assert api.paths == ["/2/users/by", "/2/users/id-alpha/tweets", "/2/users/id-beta/tweets"]
+    assert [row["author_name"] for row in rows] == ["Alpha", "Beta"]
+
+    api.calls.clear()
+    collector_x.collect_public_posts(["alpha", "beta"], user_cache=XUserCache(cache_path), **kwargs)
+    assert api.paths == ["/2/users/id-alpha/tweets", "/2/users/id-beta/tweets"]
+
+
+def test_user_lookups_count_against_max_requests(tmp_path, fake_x_api) -> None:
+    api = fake_x_api({"/users/by": _users_by_response, "/tweets": {"data": [{"id": "7", "text": "post"}], "meta": {}}})
+    budget = CollectBudget(max_requests=2)
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["alpha", "beta"],
+            limit_per_account=1,
+            backend="timeline",
+            x_api_bearer_token="token",
+            user_cache=XUserCache(tmp_path / "x_users.json"),
+            budget=budget,
+        )
+    )
+
+    # The bulk lookup spends alpha's only request, so alpha stops before its timeline.
+    assert api.paths == ["/2/users/by", "/2/users/id-beta/tweets"]
+    assert [(page.handle, page.done) for page in pages] == [("beta", True)]
+    assert budget.used["requests"] == 2
+    assert budget.cut == {"alpha"}
+
+
+def test_request_fields_follow_content_mode_and_profile() -> None:
+    full = _request_fields(content_mode="mixed", field_profile="full", include_author=True)
+    assert full["expansions"] == "attachments.media_keys,author_id"
+    assert "public_metrics" in full["tweet.fields"] and "alt_text" in full["media.fields"]
+
+    lean_text = _request_fields(content_mode="only-text", field_profile="lean", include_author=False)
+    assert "expansions" not in lean_text and "media.fields" not in lean_text
+    assert "attachments" in lean_text["tweet.fields"]
+    assert "public_metrics" not in lean_text["tweet.fields"]
+
+
+def test_timeline_page_size_tracks_hit_rate_and_only_text_skips_media(fake_x_api) -> None:
+    def timeline_page(params: dict) -> dict:
+        page = len(api.paths) - 1
+        tweets = [{"id": f"{page}{idx:02d}", "text": "post"} for idx in range(int(params["max_results"][0]))]
+        # Only every fourth post is text-only.
+        for idx, tweet in enumerate(tweets):
+            if idx % 4:
+                tweet["attachments"] = {"media_keys": [f"m{tweet['id']}"]}
+        return {"data": tweets, "meta": {"next_token": f"t{page}"}}
+
+    api = fake_x_api({"/users/by/username/": {"data": {"id": "1", "username": "demo"}}, "/tweets": timeline_page})
+
+    rows = collector_x.collect_public_posts(
+        ["demo"], limit_per_account=30, backend="timeline", x_api_bearer_token="t", content_mode="only-text"
+    )
+
+    requested = api.params[1:]
+    assert len(rows) == 30
+    assert all(not row["images"] for row in rows)
+    assert "expansions" not in requested[0]
+    # First page asks for the limit; 8 of 30 kept, so the next asks for 22 / (8/30) posts.
+    assert requested[0]["max_results"] == ["30"]
+    assert requested[1]["max_results"] == ["83"]
+
+
+def test_budget_cut_leaves_handle_unfinished(fake_x_api) -> None:
+    def search_page(params: dict) -> dict:
+        page = len(api.calls)
+        count = int(params["max_results"][0])
+        return {"data": [{"id": f"{page}{idx:03d}", "text": "x"} for idx in range(count)], "meta": {"next_token": f"t{page}"}}
+
+    api = fake_x_api({"/tweets/search": search_page})
+    budget = CollectBudget(max_posts_read=60)
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["a", "b"], limit_per_account=100, backend="recent", x_api_bearer_token="t", budget=budget
+        )
+    )
+
+    assert [params["max_results"] for params in api.params] == [["30"], ["30"]]
+    assert [(page.handle, len(page.rows), page.done) for page in pages] == [("a", 30, False), ("b", 30, False)]
+    assert pages[0].next_token == "t1"
+    assert budget.cut == {"a", "b"}
+
+
+def test_prefetch_requests_next_page_while_current_is_processed(fake_x_api) -> None:
+    second_requested = threading.Event()
+
+    def search_page(params: dict) -> dict:
+        page = len(api.calls)
+        if page == 2:
+            second_requested.set()
+        meta = {"next_token": f"t{page}"} if page < 3 else {}
+        return {"data": [{"id": f"{page}{idx:02d}", "text": "x"} for idx in range(10)], "meta": meta}
+
+    api = fake_x_api({"/tweets/search": search_page})
+
+    pages = collector_x.iter_public_posts(
+        ["a"], limit_per_account=50, backend="recent", x_api_bearer_token="t", prefetch=True
+    )
+    first = next(pages)
+    # The second page is requested before the first one is handed back for the next.
+    assert second_requested.wait(timeout=2)
+    assert len(first.rows) == 10
+    rest = list(pages)
+
+    assert [len(page.rows) for page in rest] == [10, 10]
+    assert rest[-1].done
+    assert [params.get("next_token") for params in api.params] == [None, ["t1"], ["t2"]]
+
+
+def test_prefetch_in_flight_settles_before_the_walk_closes(fake_x_api) -> None:
+    def search_page(params: dict) -> dict:
+        if len(api.calls) == 2:
+            time.sleep(0.2)
+        return {"data": [{"id": f"{idx:02d}", "text": "x"} for idx in range(10)], "meta": {"next_token": "t"}}
+
+    api = fake_x_api({"/tweets/search": search_page})
+    budget = CollectBudget(max_posts_read=1000)
+
+    pages = collector_x.iter_public_posts(
+        ["a"], limit_per_account=50, backend="recent", x_api_bearer_token="t", prefetch=True, budget=budget
+    )
+    next(pages)
+    pages.close()
+
+    assert len(api.calls) == 2
+    assert budget.used == {"requests": 2, "posts_read": 20}
+
+
+def test_prefetch_skipped_when_current_page_can_finish_the_walk(fake_x_api) -> None:
+    api = fake_x_api(
+        {
+            "/tweets/search": {
+                "data": [{"id": f"{idx:02d}", "text": "x"} for idx in range(10)],
+                "meta": {"next_token": "t1"},
+            }
+        }
+    )
+    budget = CollectBudget(max_requests=5)
+
+    pages = list(
+        collector_x.iter_public_posts(
+            ["a"], limit_per_account=10, backend="recent", x_api_bearer_token="t", prefetch=True, budget=budget
+        )
+    )
+
+    assert len(api.calls) == 1
+    assert pages[0].done and len(pages[0].rows) == 10
+    assert budget.used == {"requests": 1, "posts_read": 10}
@@ -0,0 +1,124 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+from x_legal_stuff_webscrapper.http_transport import HttpTransport
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        status = 404 if self.path.startswith("/missing") else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_reuses_keep_alive_connection(local_server: str) -> None:
+    transport = HttpTransport(pool_size_per_host=2)
+    for idx in range(3):
+        response = transport.request("GET", f"{local_server}/page/{idx}")
+        assert response.status == 200
+        assert response.body == b'{"ok": true}'
+    transport.close()
+
+    stats = transport.stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+
+
+def test_transport_raises_http_error_with_readable_body(local_server: str) -> None:
+    transport = HttpTransport()
+    with pytest.raises(HTTPError) as exc_info:
+        transport.request("GET", f"{local_server}/missing")
+    transport.close()
+
+    assert exc_info.value.code == 404
+    assert exc_info.value.read() == b'{"ok": true}'
+
+
+def test_transport_stream_reuses_connection_only_after_full_read(local_server: str) -> None:
+    transport = HttpTransport(pool_size_per_host=2)
+    with transport.stream("GET", f"{local_server}/a", chunk_size=4) as response:
+        assert b"".join(response.chunks) == b'{"ok": true}'
+    with transport.stream("GET", f"{local_server}/b", chunk_size=4) as response:
+        next(response.chunks)
+    with transport.stream("GET", f"{local_server}/c") as response:
+        assert response.headers.get("Content-Type") == "application/json"
+        list(response.chunks)
+    with pytest.raises(HTTPError):
+        with transport.stream("GET", f"{local_server}/missing"):
+            pass
+    transport.close()
+
+    stats = transport.stats()
+    # /b was abandoned mid-body, so /c had to open a new connection.
+    assert stats["connections_opened"] == 2
+    assert stats["connections_reused"] == 2
+
+
+class _DropAfterResponseHandler(BaseHTTPRequestHandler):
+    """Answers as keep-alive, then closes the connection like an idle-timeout on the server."""
+
+    protocol_version = "HTTP/1.1"
+    seen: list[str] = []
+
+    def _answer(self) -> None:
+        self.seen.append(self.command)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        self.close_connection = True
+
+    do_GET = do_POST = _answer  # noqa: N815
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_transport_retries_stale_connection_only_for_idempotent_methods() -> None:
+    import time
+    from urllib.error import URLError
+
+    _DropAfterResponseHandler.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DropAfterResponseHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    transport = HttpTransport()
+    try:
+        transport.request("GET", f"{base_url}/a")
+        time.sleep(0.1)
+        assert transport.request("GET", f"{base_url}/b").body == b"ok"
+        time.sleep(0.1)
+        with pytest.raises(URLError):
+            transport.request("POST", f"{base_url}/paid", body=b"{}")
+    finally:
+        transport.close()
+        server.shutdown()
+        server.server_close()
+
+    assert transport.stats()["stale_retries"] == 1
+    assert _DropAfterResponseHandler.seen == ["GET", "GET"]
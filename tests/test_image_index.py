@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.image_index import ImageUrlIndex
+from x_legal_stuff_webscrapper.storage import write_jsonl
+
+
+def test_image_index_bootstraps_downloaded_manifest_rows(tmp_path: Path) -> None:
+    manifest = tmp_path / "index" / "images_manifest.jsonl"
+    write_jsonl(
+        manifest,
+        [
+            {"source_url": "https://a/1.jpg", "file_path": "raw/images/by_sha256/old.jpg", "sha256": "old", "download_status": "downloaded"},
+            {"source_url": "https://a/2.jpg", "download_status": "error", "download_error": "boom"},
+            {"source_url": "https://a/1.jpg", "file_path": "raw/images/by_sha256/new.jpg", "sha256": "new", "download_status": "downloaded"},
+        ],
+    )
+
+    with ImageUrlIndex(tmp_path / "index" / "image_urls.sqlite") as index:
+        assert index.ensure_bootstrapped(manifest) == 2
+        assert index.ensure_bootstrapped(manifest) == 0
+        index.put("https://a/3.jpg", {"sha256": "c", "file_path": "raw/images/by_sha256/c.png", "file_size": 3})
+
+    reopened = ImageUrlIndex(tmp_path / "index" / "image_urls.sqlite")
+    assert reopened.get("https://a/1.jpg")["sha256"] == "new"
+    assert reopened.get("https://a/2.jpg") is None
+    assert reopened.get("https://a/3.jpg")["file_size"] == 3
+    assert reopened.count() == 2
+    reopened.close()
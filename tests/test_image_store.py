@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.image_index import ImageUrlIndex
+from x_legal_stuff_webscrapper.image_store import ImageStore, resolve_image_path
+
+
+def test_image_store_shards_blobs_and_migrates_flat_layout(tmp_path: Path) -> None:
+    store = ImageStore.for_data_dir(tmp_path)
+    path, sha256, size = store.put_stream([b"slide"], ext=".PNG")
+
+    assert path == tmp_path / "raw" / "images" / "by_sha256" / sha256[:2] / sha256[2:4] / f"{sha256}.png"
+    assert size == 5
+
+    legacy = store.blobs_dir / ("ab" * 32 + ".jpg")
+    legacy.write_bytes(b"old")
+    duplicate = store.blobs_dir / f"{sha256}.png"
+    duplicate.write_bytes(b"slide")
+    legacy_file_path = legacy.relative_to(tmp_path).as_posix()
+    assert resolve_image_path(tmp_path, legacy_file_path) == legacy
+
+    assert len(store.migrate_flat_layout(dry_run=True)) == 2
+    assert legacy.exists()
+    moved = store.migrate_flat_layout()
+
+    assert moved[legacy] == store.blob_path("ab" * 32, ".jpg")
+    assert not legacy.exists() and not duplicate.exists()
+    assert path.read_bytes() == b"slide"
+    # Records written before the migration still resolve.
+    assert resolve_image_path(tmp_path, legacy_file_path) == moved[legacy]
+    assert store.locate(legacy.name) == moved[legacy]
+
+
+def test_image_index_relocate_rewrites_file_paths(tmp_path: Path) -> None:
+    with ImageUrlIndex(tmp_path / "image_urls.sqlite") as index:
+        index.put("https://a/1.jpg", {"sha256": "ab", "file_path": "raw/images/by_sha256/ab.jpg"})
+        assert index.relocate({"raw/images/by_sha256/ab.jpg": "raw/images/by_sha256/ab/00/ab.jpg"}) == 1
+        assert index.get("https://a/1.jpg")["file_path"] == "raw/images/by_sha256/ab/00/ab.jpg"
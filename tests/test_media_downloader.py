@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from x_legal_stuff_webscrapper.http_transport import HttpStreamResponse
 from x_legal_stuff_webscrapper.media_downloader import _store_blob_dedup
 
 
@@ -11,3 +12,328 @@ def test_store_blob_dedup_reuses_same_hash_file(tmp_path: Path) -> None:
     assert sha1 == sha2
     assert path1 == path2
     assert path1.exists()
+
+
+def test_download_images_in_parallel_keeps_manifest_order_and_host_limit(tmp_path: Path, monkeypatch) -> None:
+    import threading
+    import time
+    from contextlib import contextmanager
+
+    from x_legal_stuff_webscrapper import media_downloader
+
+    lock = threading.Lock()
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    calls: list[str] = []
+
+    @contextmanager
+    def fake_open_download(source_url: str, timeout_seconds: int = 30, headers: dict | None = None):
+        host = source_url.split("/")[2]
+        with lock:
+            calls.append(source_url)
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        if source_url.endswith("broken.jpg"):
+            raise OSError("boom")
+        yield HttpStreamResponse(
+            status=200, headers={"Content-Type": "image/jpeg"}, url=source_url, chunks=iter([source_url.encode("utf-8")])
+        )
+
+    monkeypatch.setattr(media_downloader, "_open_download", fake_open_download)
+    urls = [f"https://{host}/{idx}.jpg" for idx in range(6) for host in ("a.example", "b.example")]
+    posts = [
+        {"post_id": str(idx), "images": [{"image_id": f"img-{idx}", "source_url": url}]} for idx, url in enumerate(urls)
+    ]
+    posts.append({"post_id": "dup", "images": [{"image_id": "img-dup", "source_url": urls[0]}, {"image_id": "no-url"}]})
+    posts.append({"post_id": "bad", "images": [{"image_id": "img-bad", "source_url": "https://a.example/broken.jpg"}]})
+
+    _, manifest = media_downloader.download_images_for_posts(posts, data_dir=tmp_path, concurrency=8, max_per_host=2)
+
+    assert sorted(calls) == sorted([*urls, "https://a.example/broken.jpg"])
+    assert max(peak.values()) == 2
+    assert [row["source_url"] for row in manifest] == [*urls, "https://a.example/broken.jpg"]
+    assert manifest[-1]["download_status"] == "error"
+    assert posts[-2]["images"][0]["sha256"] == posts[0]["images"][0]["sha256"]
+    assert posts[-2]["images"][1]["download_status"] == "missing_url"
+
+
+def test_store_stream_dedup_hashes_chunks_and_leaves_no_temp_files(tmp_path: Path) -> None:
+    import hashlib
+
+    import pytest
+
+    from x_legal_stuff_webscrapper.media_downloader import _store_stream_dedup
+
+    chunks = [b"a" * 1000, b"b" * 1000, b"c"]
+    path, sha256, size = _store_stream_dedup(tmp_path, iter(chunks), "https://example.com/a.gif", "image/gif")
+
+    assert sha256 == hashlib.sha256(b"".join(chunks)).hexdigest()
+    assert size == 2001
+    assert path == tmp_path / "by_sha256" / sha256[:2] / sha256[2:4] / f"{sha256}.gif"
+    assert path.read_bytes() == b"".join(chunks)
+
+    def broken_chunks():
+        yield b"partial"
+        raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        _store_stream_dedup(tmp_path, broken_chunks(), "https://example.com/b.gif", "image/gif")
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_download_images_streams_over_http(tmp_path: Path) -> None:
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from x_legal_stuff_webscrapper.media_downloader import download_images_for_posts
+
+    body = bytes(range(256)) * 1024
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/moved.png":
+                self.send_response(302)
+                self.send_header("Location", "/image.png")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    posts = [{"post_id": "1", "images": [{"source_url": f"{base_url}/moved.png"}]}]
+    try:
+        _, manifest = download_images_for_posts(posts, data_dir=tmp_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    image = posts[0]["images"][0]
+    assert image["download_status"] == "downloaded"
+    assert image["file_size"] == len(body)
+    assert (tmp_path / image["file_path"]).read_bytes() == body
+    assert manifest[0]["content_type"] == "image/png"
+    assert not list((tmp_path / "raw" / "images").glob("*.part"))
+
+
+def test_download_images_reuses_url_index_across_runs(tmp_path: Path, monkeypatch) -> None:
+    from contextlib import contextmanager
+
+    from x_legal_stuff_webscrapper import media_downloader
+    from x_legal_stuff_webscrapper.image_index import ImageUrlIndex
+
+    calls: list[str] = []
+
+    @contextmanager
+    def fake_open_download(source_url: str, timeout_seconds: int = 30, headers: dict | None = None):
+        calls.append(source_url)
+        yield HttpStreamResponse(
+            status=200, headers={"Content-Type": "image/jpeg"}, url=source_url, chunks=iter([source_url.encode("utf-8")])
+        )
+
+    monkeypatch.setattr(media_downloader, "_open_download", fake_open_download)
+
+    def posts() -> list[dict]:
+        return [{"post_id": "1", "images": [{"source_url": "https://a/1.jpg"}, {"source_url": "https://a/2.jpg"}]}]
+
+    index = ImageUrlIndex(tmp_path / "index" / "image_urls.sqlite")
+    first, _ = media_downloader.download_images_for_posts(posts(), data_dir=tmp_path, url_index=index)
+    # A blob deleted from disk is downloaded again.
+    (tmp_path / first[0]["images"][1]["file_path"]).unlink()
+    second, manifest = media_downloader.download_images_for_posts(posts(), data_dir=tmp_path, url_index=index)
+    index.close()
+
+    assert calls == ["https://a/1.jpg", "https://a/2.jpg", "https://a/2.jpg"]
+    assert [image["download_status"] for image in second[0]["images"]] == ["cached", "downloaded"]
+    assert second[0]["images"][0]["sha256"] == first[0]["images"][0]["sha256"]
+    assert [row["download_status"] for row in manifest] == ["cached", "downloaded"]
+
+
+def test_revalidate_uses_conditional_get_and_head_probe(tmp_path: Path) -> None:
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from x_legal_stuff_webscrapper.image_index import ImageUrlIndex
+    from x_legal_stuff_webscrapper.media_downloader import download_images_for_posts
+
+    state = {"a_version": "1", "bodies": 0, "heads": 0, "conditional": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _headers(self) -> bytes:
+            body = f"image-{self.path}-{state['a_version']}".encode() if self.path == "/a.png" else b"static-b"
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            if self.path == "/a.png":
+                self.send_header("ETag", f'"v{state["a_version"]}"')
+            return body
+
+        def do_HEAD(self) -> None:  # noqa: N802
+            state["heads"] += 1
+            self.send_response(200)
+            self._headers()
+            self.end_headers()
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.headers.get("If-None-Match"):
+                state["conditional"] += 1
+                if self.headers["If-None-Match"] == f'"v{state["a_version"]}"':
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+            self.send_response(200)
+            body = self._headers()
+            self.end_headers()
+            self.wfile.write(body)
+            state["bodies"] += 1
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def run(**kwargs) -> list[dict]:
+        posts = [{"post_id": "1", "images": [{"source_url": f"{base_url}/a.png"}, {"source_url": f"{base_url}/b.png"}]}]
+        download_images_for_posts(posts, data_dir=tmp_path, url_index=index, **kwargs)
+        return posts[0]["images"]
+
+    index = ImageUrlIndex(tmp_path / "image_urls.sqlite")
+    try:
+        first = run()
+        assert [image["download_status"] for image in first] == ["downloaded", "downloaded"]
+        assert first[0]["etag"] == '"v1"'
+
+        refreshed = run(revalidate=True)
+        assert [image["download_status"] for image in refreshed] == ["not_modified", "not_modified"]
+        assert refreshed[0]["sha256"] == first[0]["sha256"]
+        assert (state["bodies"], state["conditional"], state["heads"]) == (2, 1, 1)
+
+        state["a_version"] = "2"
+        changed = run(revalidate=True)
+        assert changed[0]["download_status"] == "downloaded"
+        assert changed[0]["etag"] == '"v2"'
+        assert changed[0]["sha256"] != first[0]["sha256"]
+        assert index.get(f"{base_url}/a.png")["etag"] == '"v2"'
+    finally:
+        index.close()
+        server.shutdown()
+        server.server_close()
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_download_throttle_limits_requests_and_bytes_per_host() -> None:
+    from x_legal_stuff_webscrapper.media_downloader import DownloadLimits, DownloadThrottle
+
+    clock = _FakeClock()
+    throttle = DownloadThrottle(
+        DownloadLimits(requests_per_second=2, bytes_per_second=1000), clock=clock, sleep=clock.sleep
+    )
+    for _ in range(5):
+        throttle.acquire_request("a.example")
+    # Burst of 2, then one request every 0.5s.
+    assert clock.now == 1.5
+    throttle.acquire_request("b.example")
+    assert clock.now == 1.5
+
+    assert b"".join(throttle.metered("a.example", [b"x" * 500] * 4)) == b"x" * 2000
+    assert clock.now == 2.5
+    stats = throttle.stats()
+    assert stats["requests"] == 6
+    assert stats["bytes"] == 2000
+    assert stats["throttled_seconds"] == 2.5
+
+
+def test_download_retries_server_errors_and_honours_retry_after(tmp_path: Path) -> None:
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from x_legal_stuff_webscrapper.media_downloader import DownloadThrottle, download_images_for_posts
+
+    responses = [(503, {}), (429, {"Retry-After": "7"}), (200, {"Content-Type": "image/png"})]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            status, headers = responses.pop(0)
+            body = b"png" if status == 200 else b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clock = _FakeClock()
+    throttle = DownloadThrottle(clock=clock, sleep=clock.sleep)
+    posts = [
+        {"post_id": "1", "images": [{"source_url": f"http://127.0.0.1:{server.server_address[1]}/a.png"}]},
+        {"post_id": "2", "images": [{"source_url": "http://127.0.0.1:1/refused.png"}]},
+    ]
+    try:
+        download_images_for_posts(posts, data_dir=tmp_path, throttle=throttle)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert posts[0]["images"][0]["download_status"] == "downloaded"
+    assert posts[1]["images"][0]["download_status"] == "error"
+    stats = throttle.stats()
+    # 503 -> 1s backoff, 429 -> host paused 7s; refused: 1s + 2s + 4s, then give up.
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 5
+    assert stats["throttled_seconds"] == 7
+    assert stats["backoff_seconds"] == 8
+
+
+def test_retry_after_above_cap_gives_up_instead_of_pausing() -> None:
+    from urllib.error import HTTPError
+
+    from x_legal_stuff_webscrapper.media_downloader import DownloadLimits, DownloadThrottle
+
+    clock = _FakeClock()
+    throttle = DownloadThrottle(DownloadLimits(max_retry_after_seconds=60), clock=clock, sleep=clock.sleep)
+
+    def rate_limited(retry_after: str) -> HTTPError:
+        return HTTPError("http://img.test/a.png", 429, "Too Many Requests", {"Retry-After": retry_after}, None)
+
+    assert throttle.retry_delay("img.test", rate_limited("3600"), attempt=1) is None
+    throttle.acquire_request("img.test")
+    assert throttle.stats()["throttled_seconds"] == 0
+
+    assert throttle.retry_delay("img.test", rate_limited("60"), attempt=1) == 0.0
+    throttle.acquire_request("img.test")
+    assert throttle.stats()["throttled_seconds"] == 60
+    assert throttle.stats()["rate_limited"] == 2
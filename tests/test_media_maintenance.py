@@ -0,0 +1,71 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.image_store import ImageStore
+from x_legal_stuff_webscrapper.media_maintenance import (
+    collect_image_references,
+    fsck_image_store,
+    gc_image_store,
+    hash_file,
+)
+from x_legal_stuff_webscrapper.storage import write_jsonl
+
+
+def _age(path: Path, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_hash_file_matches_hashlib(tmp_path: Path) -> None:
+    (tmp_path / "empty").write_bytes(b"")
+    (tmp_path / "blob").write_bytes(b"x" * 100_000)
+
+    assert hash_file(tmp_path / "empty") == hashlib.sha256(b"").hexdigest()
+    assert hash_file(tmp_path / "blob") == hashlib.sha256(b"x" * 100_000).hexdigest()
+
+
+def test_fsck_reports_and_repairs_corrupt_blobs(tmp_path: Path) -> None:
+    store = ImageStore.for_data_dir(tmp_path)
+    good, _, _ = store.put_stream([b"good"], ext=".png")
+    bad, _, _ = store.put_stream([b"bad"], ext=".png")
+    bad.write_bytes(b"bit rot")
+
+    report = fsck_image_store(store, workers=2)
+    assert report.checked == 2
+    assert [path for path, _ in report.corrupt] == [bad]
+    assert not report.ok
+
+    repaired = fsck_image_store(store, repair=True)
+    assert repaired.removed == 1
+    assert good.exists() and not bad.exists()
+
+
+def test_gc_removes_only_old_unreferenced_blobs(tmp_path: Path) -> None:
+    store = ImageStore.for_data_dir(tmp_path)
+    from_manifest, _, _ = store.put_stream([b"manifest"], ext=".png")
+    from_post, _, _ = store.put_stream([b"post"], ext=".jpg")
+    orphan, _, _ = store.put_stream([b"orphan"], ext=".png")
+    fresh_orphan, _, _ = store.put_stream([b"just downloaded"], ext=".png")
+    stale_part = store.root / ".download-abc.part"
+    stale_part.write_bytes(b"partial")
+    for path in (from_manifest, from_post, orphan, stale_part):
+        _age(path, 7200)
+
+    write_jsonl(tmp_path / "images_manifest.jsonl", [{"file_path": from_manifest.relative_to(tmp_path).as_posix()}])
+    # A legacy flat path still protects the migrated blob.
+    write_jsonl(tmp_path / "posts.jsonl", [{"images": [{"file_path": f"raw/images/by_sha256/{from_post.name}"}]}])
+    references = collect_image_references(
+        manifest_paths=[tmp_path / "images_manifest.jsonl"], posts_paths=[tmp_path / "posts.jsonl", tmp_path / "missing.jsonl"]
+    )
+
+    dry = gc_image_store(store, references, dry_run=True)
+    assert dry.orphaned == [orphan] and orphan.exists()
+
+    report = gc_image_store(store, references)
+    assert report.scanned == 4
+    assert report.orphaned == [orphan]
+    assert report.stale_temp_files == 1
+    assert not orphan.exists() and not stale_part.exists() and not orphan.parent.exists()
+    assert from_manifest.exists() and from_post.exists() and fresh_orphan.exists()
@@ -0,0 +1,71 @@
+import random
+
+from x_legal_stuff_webscrapper.perceptual_hash import (
+    BKTree,
+    NearDuplicateIndex,
+    dhash_from_pixels,
+    hamming_distance,
+)
+
+
+def test_dhash_from_pixels_ignores_brightness_and_contrast_changes() -> None:
+    rng = random.Random(7)
+    grid = [[rng.randint(0, 255) for _ in range(9)] for _ in range(8)]
+    brighter = [[min(255, value // 2 + 100) for value in row] for row in grid]
+
+    assert len(dhash_from_pixels(grid)) == 16
+    assert hamming_distance(dhash_from_pixels(grid), dhash_from_pixels(brighter)) <= 4
+    assert dhash_from_pixels([[9 - x for x in range(9)]] * 8) == "f" * 16
+
+
+def test_bk_tree_search_matches_brute_force() -> None:
+    rng = random.Random(11)
+    hashes = [f"{rng.getrandbits(64):016x}" for _ in range(300)]
+    tree: BKTree[int] = BKTree()
+    for idx, value in enumerate(hashes):
+        tree.add(value, idx)
+
+    query = f"{int(hashes[5], 16) ^ 0b1011:016x}"
+    expected = sorted(
+        (hamming_distance(query, value), idx) for idx, value in enumerate(hashes) if hamming_distance(query, value) <= 20
+    )
+    assert tree.search(query, 20) == expected
+    assert tree.search(query, 3)[0] == (3, 5)
+
+
+def test_bk_tree_search_orders_ties_by_insertion() -> None:
+    tree: BKTree[str] = BKTree()
+    tree.add("0000000000000000", "root")
+    tree.add("0000000000000003", "first")
+    tree.add("00000000000000f0", "second")
+
+    # Both children are 3 bits away; traversal reaches "second" first.
+    assert tree.search("0000000000000073", 3) == [(3, "first"), (3, "second")]
+
+
+def test_near_duplicate_index_prefers_sha256_then_closest_dhash() -> None:
+    index: NearDuplicateIndex[str] = NearDuplicateIndex(max_distance=4)
+    index.add("first", sha256="s1", dhash="00000000000000ff")
+    index.add("second", sha256="s2", dhash="000000000000000f")
+
+    assert index.find(sha256="s2", dhash=None) == (0, "second")
+    assert index.find(sha256="other", dhash="00000000000000fe") == (1, "first")
+    assert index.find(sha256="other", dhash="ffffffffffffffff") is None
+
+
+def test_compute_dhash_matches_rescaled_copy(tmp_path) -> None:
+    import pytest
+
+    image_module = pytest.importorskip("PIL.Image")
+    from x_legal_stuff_webscrapper.perceptual_hash import compute_dhash
+
+    rng = random.Random(3)
+    original = image_module.new("L", (90, 80))
+    original.putdata([rng.randint(0, 255) for _ in range(90 * 80)])
+    original = original.resize((360, 320))
+    original.save(tmp_path / "slide.png")
+    original.resize((180, 160)).save(tmp_path / "slide-small.jpg", quality=70)
+
+    assert hamming_distance(compute_dhash(tmp_path / "slide.png"), compute_dhash(tmp_path / "slide-small.jpg")) <= 6
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    assert compute_dhash(tmp_path / "broken.png") is None
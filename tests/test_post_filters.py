@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from x_legal_stuff_webscrapper import post_filters
+from x_legal_stuff_webscrapper.post_filters import CompiledPostFilters
+
+# 1 forces the trie regex even for tiny filter sets; 1000 forces plain substring scans.
+regex_threshold = pytest.mark.parametrize("threshold", [1, 1000])
+
+
+def _legacy_matches(post: dict, tag_filters: list[str], text_filters: list[str], match_mode: str) -> bool:
+    filters = [x.lower() for x in [*tag_filters, *text_filters]]
+    if not filters:
+        return True
+    haystack = f"{post.get('text', '')} {' '.join(post.get('hashtags', []))}".lower()
+    checks = [term in haystack for term in filters]
+    return all(checks) if match_mode == "all" else any(checks)
+
+
+@regex_threshold
+def test_compiled_filters_report_overlapping_and_nested_matches(threshold: int, monkeypatch) -> None:
+    monkeypatch.setattr(post_filters, "_REGEX_MIN_FILTERS", threshold)
+    matcher = CompiledPostFilters(
+        tag_filters=["ICT", "mentor"], text_filters=["ICT 2026 Mentorship", "2026", "lecture #1"], match_mode="all"
+    )
+    haystack = "ict 2026 mentorship ... lecture #1 notes"
+
+    assert matcher.matched_filters(haystack) == {"ict", "mentor", "ict 2026 mentorship", "2026", "lecture #1"}
+    assert matcher.matches({"text": "ICT 2026 Mentorship ... LECTURE #12", "hashtags": []}) is True
+    assert matcher.matches({"text": "ICT 2026", "hashtags": ["MENTORSHIP"]}) is False
+
+
+@regex_threshold
+def test_compiled_filters_agree_with_substring_checks(threshold: int, monkeypatch) -> None:
+    monkeypatch.setattr(post_filters, "_REGEX_MIN_FILTERS", threshold)
+    rng = random.Random(7)
+    vocabulary = ["ict", "ic", "mentor", "mentorship", "2026", "lecture #1", "lecture #12", "fvg", "ob", "silver bullet"]
+    for _ in range(300):
+        tags = rng.sample(vocabulary, rng.randint(0, 3))
+        texts = rng.sample(vocabulary, rng.randint(0, 3))
+        mode = rng.choice(["any", "all"])
+        post = {
+            "text": " ".join(rng.choice(vocabulary).upper() for _ in range(rng.randint(0, 6))),
+            "hashtags": rng.sample(["ICT", "FVG", "MENTORSHIP"], rng.randint(0, 2)),
+        }
+        matcher = CompiledPostFilters(tag_filters=tags, text_filters=texts, match_mode=mode)
+        assert matcher.matches(post) == _legacy_matches(post, tags, texts, mode), (tags, texts, mode, post)
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.post_index import PostIdIndex
+from x_legal_stuff_webscrapper.storage import write_jsonl
+
+
+def test_post_index_bootstraps_and_skips_duplicates(tmp_path: Path) -> None:
+    raw_posts = tmp_path / "raw" / "posts.jsonl"
+    write_jsonl(raw_posts, [{"post_id": "1"}, {"post_id": "2"}])
+
+    with PostIdIndex(tmp_path / "index" / "post_ids.sqlite") as index:
+        assert index.ensure_bootstrapped("raw", raw_posts) == 2
+        assert index.ensure_bootstrapped("raw", raw_posts) == 0
+        new_rows = index.filter_new("raw", [{"post_id": "2"}, {"post_id": "3"}, {"post_id": "3"}])
+        assert [row["post_id"] for row in new_rows] == ["3"]
+        assert index.filter_new("processed", [{"post_id": "2"}]) == [{"post_id": "2"}]
+
+    reopened = PostIdIndex(tmp_path / "index" / "post_ids.sqlite")
+    assert reopened.contains("raw", "3")
+    assert reopened.count("raw") == 3
+    reopened.close()
+
+
+def test_post_index_rollback_releases_claimed_ids(tmp_path: Path) -> None:
+    index = PostIdIndex(tmp_path / "post_ids.sqlite")
+    index.filter_new("raw", [{"post_id": "9"}])
+    index.rollback()
+
+    assert not index.contains("raw", "9")
+    index.close()
+
+
+def test_post_index_follows_appends_and_rewrites_of_the_jsonl_file(tmp_path: Path) -> None:
+    import os
+
+    raw_posts = tmp_path / "posts.jsonl"
+    write_jsonl(raw_posts, [{"post_id": "1"}, {"post_id": "2"}])
+    index = PostIdIndex(tmp_path / "post_ids.sqlite")
+    assert index.ensure_bootstrapped("raw", raw_posts) == 2
+
+    # Rows appended by another tool are indexed from the last indexed byte.
+    with raw_posts.open("a", encoding="utf-8") as handle:
+        handle.write('{"post_id": "3"}\n{"post_id": "4"')
+    assert index.ensure_bootstrapped("raw", raw_posts) == 1
+    with raw_posts.open("a", encoding="utf-8") as handle:
+        handle.write("}\n")
+    assert index.ensure_bootstrapped("raw", raw_posts) == 1
+    assert index.filter_new("raw", [{"post_id": "3"}, {"post_id": "4"}]) == []
+
+    # A rewritten (shorter) file is re-indexed from scratch.
+    write_jsonl(raw_posts, [{"post_id": "2"}])
+    os.utime(raw_posts, ns=(1, 1))
+    assert index.ensure_bootstrapped("raw", raw_posts) == 1
+    assert index.count("raw") == 1
+    assert not index.contains("raw", "1")
+    index.close()
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.storage import JsonlAppender, read_jsonl
+
+
+def test_jsonl_appender_flushes_batches_and_skips_empty_files(tmp_path: Path) -> None:
+    path = tmp_path / "raw" / "posts.jsonl"
+    unused = tmp_path / "index" / "unused.jsonl"
+    with JsonlAppender(path, flush_every_rows=2) as writer, JsonlAppender(unused) as unused_writer:
+        writer.write_many([{"post_id": "1"}, {"post_id": "2"}])
+        assert len(read_jsonl(path)) == 2
+        writer.write_many([{"post_id": "3"}])
+        unused_writer.write_many([])
+
+    assert [row["post_id"] for row in read_jsonl(path)] == ["1", "2", "3"]
+    assert writer.count == 3
+    assert not unused.exists()
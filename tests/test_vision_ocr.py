@@ -20,3 +20,51 @@ def test_extract_openai_chat_text_from_list_content() -> None:
         ]
     }
     assert _extract_openai_chat_text(payload) == "Hello\nWorld"
+
+
+def test_ocr_reuses_text_for_identical_and_near_duplicate_images(tmp_path, monkeypatch) -> None:
+    from x_legal_stuff_webscrapper import vision_ocr
+
+    (tmp_path / "img.png").write_bytes(b"png")
+    calls: list[str] = []
+
+    def fake_ocr(*, image_path, **_: object) -> dict:
+        calls.append(str(image_path))
+        return {"ocr_text": f"text {len(calls)}"}
+
+    monkeypatch.setattr(vision_ocr, "_openai_vision_ocr", fake_ocr)
+
+    def image(image_id: str, sha256: str, dhash: str) -> dict:
+        return {"image_id": image_id, "file_path": "img.png", "sha256": sha256, "dhash": dhash}
+
+    posts = [
+        {"post_id": "1", "images": [image("a", "s1", "00000000000000ff"), image("b", "s1", "0000000000000000")]},
+        {"post_id": "2", "images": [image("c", "s2", "00000000000000fe"), image("d", "s3", "ffffffffffff0000")]},
+    ]
+    previous = [{"image_id": "old", "engine": "openai-vision", "status": "processed", "ocr_text": "old", "dhash": "ffffffffffff0001"}]
+
+    results = vision_ocr.process_posts_for_ocr(
+        posts,
+        data_dir=tmp_path,
+        backend="openai-vision",
+        openai_api_key="k",
+        previous_results=previous,
+        reuse_near_duplicates=True,
+    )
+
+    assert len(calls) == 1
+    assert [(row["image_id"], row["ocr_text"], row.get("reused_from")) for row in results] == [
+        ("a", "text 1", None),
+        ("b", "text 1", "a"),
+        ("c", "text 1", "a"),
+        ("d", "old", "old"),
+    ]
+    assert all(row["status"] == "processed" for row in results)
+
+    # By default only byte-identical images share OCR text.
+    calls.clear()
+    exact_only = vision_ocr.process_posts_for_ocr(
+        posts, data_dir=tmp_path, backend="openai-vision", openai_api_key="k", previous_results=previous
+    )
+    assert len(calls) == 3
+    assert [row.get("reused_from") for row in exact_only] == [None, "a", None, None]
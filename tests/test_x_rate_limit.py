@@ -0,0 +1,85 @@
+import threading
+import time
+
+from x_legal_stuff_webscrapper.x_rate_limit import RateLimitScheduler, endpoint_family
+
+
+def test_endpoint_family_groups_x_api_paths() -> None:
+    assert endpoint_family("https://api.x.com/2/tweets/search/recent?query=x") == "/tweets/search/recent"
+    assert endpoint_family("https://api.x.com/2/tweets/search/all?query=x") == "/tweets/search/all"
+    assert endpoint_family("https://api.x.com/2/users/12345/tweets?max_results=10") == "/users/{id}/tweets"
+    assert endpoint_family("https://api.x.com/2/users/by/username/demo?user.fields=id") == "/users/by/username"
+    assert endpoint_family("https://api.x.com/2/users/by?usernames=a,b") == "/users/by"
+
+
+def test_scheduler_blocks_until_reset_when_budget_exhausted() -> None:
+    scheduler = RateLimitScheduler(reset_margin_seconds=0.0)
+    family = "/tweets/search/recent"
+    scheduler.acquire(family)
+    scheduler.release(
+        family,
+        {"x-rate-limit-limit": "450", "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(int(time.time()) + 1)},
+    )
+
+    started = time.monotonic()
+    waited = scheduler.acquire(family)
+    scheduler.release(family)
+
+    assert waited > 0
+    assert time.monotonic() - started >= waited
+    assert scheduler.snapshot()[family]["requests"] == 2
+
+
+def test_scheduler_counts_in_flight_requests_against_remaining() -> None:
+    scheduler = RateLimitScheduler(reset_margin_seconds=0.0)
+    family = "/users/{id}/tweets"
+    scheduler.acquire(family)
+    scheduler.release(
+        family,
+        {"x-rate-limit-remaining": "1", "x-rate-limit-reset": str(int(time.time()) + 60)},
+    )
+    scheduler.acquire(family)
+
+    blocked = threading.Event()
+
+    def second_request() -> None:
+        scheduler.acquire(family)
+        blocked.set()
+
+    worker = threading.Thread(target=second_request, daemon=True)
+    worker.start()
+    assert not blocked.wait(0.1)
+
+    scheduler.release(family, {"x-rate-limit-remaining": "5", "x-rate-limit-reset": str(int(time.time()) + 60)})
+    assert blocked.wait(1.0)
+
+
+def test_token_pool_prefers_token_with_most_remaining_quota() -> None:
+    from x_legal_stuff_webscrapper.x_rate_limit import BearerTokenPool
+
+    family = "/tweets/search/all"
+    pool = BearerTokenPool(["token-aaaa-1111", "token-bbbb-2222"], schedulers=[RateLimitScheduler(), RateLimitScheduler()])
+    reset = str(int(time.time()) + 60)
+
+    first = pool.acquire(family)
+    first.scheduler.release(family, {"x-rate-limit-remaining": "3", "x-rate-limit-reset": reset})
+    second = pool.acquire(family)
+    assert second.token != first.token
+    second.scheduler.release(family, {"x-rate-limit-remaining": "250", "x-rate-limit-reset": reset})
+
+    assert pool.acquire(family).token == "token-bbbb-2222"
+
+
+def test_token_pool_rotates_after_rate_limit() -> None:
+    from x_legal_stuff_webscrapper.x_rate_limit import BearerTokenPool
+
+    family = "/users/{id}/tweets"
+    pool = BearerTokenPool(["token-aaaa-1111", "token-bbbb-2222"], schedulers=[RateLimitScheduler(), RateLimitScheduler()])
+    lease = pool.acquire(family)
+    lease.scheduler.release(family)
+    pool.record_rate_limited(lease, family, retry_after_seconds=60)
+
+    assert pool.acquire(family).token != lease.token
+    usage = {item["token"]: item for item in pool.usage()}
+    assert usage[lease.label]["rate_limited"] == 1
+    assert all("aaaa-1111" not in label for label in usage)
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from x_legal_stuff_webscrapper import collector_x
+from x_legal_stuff_webscrapper.x_rate_limit import BearerTokenPool, RateLimitScheduler
+from x_legal_stuff_webscrapper.x_replay import CassetteRecorder, ReplayServer, load_cassette
+
+
+def _page(post_ids: list[str], next_token: str | None) -> dict:
+    meta = {"newest_id": post_ids[0]}
+    if next_token:
+        meta["next_token"] = next_token
+    return {
+        "data": [{"id": post_id, "text": f"post {post_id}", "author_id": "1"} for post_id in post_ids],
+        "includes": {"users": [{"id": "1", "username": "demo", "name": "Demo"}]},
+        "meta": meta,
+    }
+
+
+def _collect(base_url: str, monkeypatch) -> list[dict]:
+    monkeypatch.setattr(collector_x, "X_API_BASE_URL", base_url)
+    token_pool = BearerTokenPool(["replay-token"], schedulers=[RateLimitScheduler(reset_margin_seconds=0)])
+    return collector_x.collect_public_posts(["demo"], limit_per_account=20, backend="recent", token_pool=token_pool)
+
+
+def test_replay_server_paginates_retries_failures_and_records_cassette(tmp_path: Path, monkeypatch) -> None:
+    entries = [
+        {"path": "/2/tweets/search/recent", "params": {"query": "from:demo"}, "body": _page(["30", "29"], "p2")},
+        {"path": "/2/tweets/search/recent", "params": {"query": "from:demo", "next_token": "p2"}, "body": _page(["28"], None)},
+    ]
+    recorder = CassetteRecorder(tmp_path / "cassette.jsonl")
+    monkeypatch.setattr(collector_x, "_CASSETTE_RECORDER", recorder)
+
+    with ReplayServer(entries, rate_limit=10, fail_every=2) as server:
+        rows = _collect(server.base_url, monkeypatch)
+
+    assert [row["post_id"] for row in rows] == ["30", "29", "28"]
+    assert server.stats["injected_failures"] == 1
+    assert server.stats["served"] == 2
+    recorded = load_cassette(recorder.path)
+    assert [entry["params"] for entry in recorded] == [entry["params"] for entry in entries]
+    assert recorded[0]["headers"]["x-rate-limit-limit"] == "10"
+
+    monkeypatch.setattr(collector_x, "_CASSETTE_RECORDER", None)
+    with ReplayServer(recorded) as replay:
+        replayed = _collect(replay.base_url, monkeypatch)
+    assert [row["post_id"] for row in replayed] == ["30", "29", "28"]
+
+
+def test_replay_server_enforces_rate_limit_window() -> None:
+    server = ReplayServer([], rate_limit=2, window_seconds=60)
+    try:
+        statuses = [server._respond("/2/tweets/search/recent?query=x", "Bearer a")[0] for _ in range(3)]
+        other_token = server._respond("/2/tweets/search/recent?query=x", "Bearer b")
+    finally:
+        server.stop()
+
+    assert statuses == [404, 404, 429]
+    assert other_token[0] == 404
+    assert other_token[1]["x-rate-limit-remaining"] == "1"
@@ -0,0 +1,28 @@
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from x_legal_stuff_webscrapper.x_user_cache import XUserCache
+
+
+def test_user_cache_persists_case_insensitive_entries(tmp_path: Path) -> None:
+    path = tmp_path / "x_users.json"
+    cache = XUserCache(path)
+    cache.put("Demo", {"id": 42, "username": "Demo", "name": "Demo Name"})
+    cache.save()
+
+    reloaded = XUserCache(path)
+    assert reloaded.get("demo") == {"id": "42", "username": "Demo", "name": "Demo Name"}
+    assert reloaded.missing(["DEMO", "other"]) == ["other"]
+
+
+def test_user_cache_expires_entries_after_ttl(tmp_path: Path) -> None:
+    path = tmp_path / "x_users.json"
+    stale = (datetime.now(UTC) - timedelta(hours=2)).isoformat()
+    path.write_text(
+        json.dumps({"version": 1, "users": {"demo": {"user_id": "1", "username": "demo", "fetched_at": stale}}}),
+        encoding="utf-8",
+    )
+
+    assert XUserCache(path, ttl_seconds=3 * 3600).get("demo") is not None
+    assert XUserCache(path, ttl_seconds=3600).get("demo") is None